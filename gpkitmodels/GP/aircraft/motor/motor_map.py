@@ -0,0 +1,92 @@
+" closed form off-design evaluation of a sized electric motor "
+import numpy as np
+
+RPM = np.pi/30.  # [rad/s] per [rpm]
+RTOL = 1e-6  # limits are exceeded by more than this, relative to them
+
+class MotorMap(object):
+    """ Vectorized MotorPerf for a sized Motor
+
+    Evaluates the MotorPerf relations with their inequalities taken as
+    equalities, which is how they are satisfied at an optimum:
+
+        i = Q*Kv + i0,  v = omega/Kv + i*R,  etam = Q*omega/(v*i)
+
+    Arguments
+    ---------
+    Kv : float
+        motor voltage constant [rpm/V]
+    R : float
+        internal resistance [ohms]
+    i0 : float
+        zero-load current [amps]
+    Qmax : float
+        max torque [N*m]
+    V_max : float
+        max voltage [V]
+
+    """
+    def __init__(self, Kv, R, i0, Qmax, V_max):
+        self.Kv = Kv
+        self.R = R
+        self.i0 = i0
+        self.Qmax = Qmax
+        self.V_max = V_max
+
+    @classmethod
+    def from_solution(cls, sol, motor):
+        " the MotorMap of `motor` sized in solution `sol` "
+        return cls(sol(motor.Kv).to("rpm/V").magnitude,
+                   sol(motor.R).to("ohm").magnitude,
+                   sol(motor.i0).to("A").magnitude,
+                   sol(motor.Qmax).to("N*m").magnitude,
+                   sol(motor.V_max).to("V").magnitude)
+
+    def __call__(self, Q, omega):
+        """ motor performance at arrays of torque [N*m] and speed [rpm]
+
+        Returns
+        -------
+        dict of arrays with the broadcast shape of Q and omega:
+        i [A], v [V], Pelec [W], Pshaft [W], etam [-], and the boolean
+        limit violations overtorque (Q > Qmax) and overvoltage (v > V_max),
+        up to the relative tolerance RTOL so that a sized design's own
+        operating point, with v on its bound, is within its limits
+        """
+        Q, omega = np.broadcast_arrays(np.asarray(Q, dtype=float),
+                                       np.asarray(omega, dtype=float))
+        w = omega*RPM
+        Kv = self.Kv*RPM
+        i = Q*Kv + self.i0
+        v = w/Kv + i*self.R
+        Pshaft = Q*w
+        Pelec = v*i
+        return {"i": i, "v": v, "Pelec": Pelec, "Pshaft": Pshaft,
+                "etam": Pshaft/Pelec,
+                "overtorque": Q > self.Qmax*(1 + RTOL),
+                "overvoltage": v > self.V_max*(1 + RTOL)}
+
+    def efficiency_map(self, Q, omega):
+        """ efficiency on the grid of 1-D arrays Q [N*m] and omega [rpm]
+
+        Returns etam with shape (len(Q), len(omega)), NaN where the motor
+        exceeds its torque or voltage limit.
+        """
+        perf = self(*np.meshgrid(Q, omega, indexing="ij"))
+        return np.where(perf["overtorque"] | perf["overvoltage"], np.nan,
+                        perf["etam"])
+
+    def match(self, propmap, V, T, rho, R):
+        """ motor performance driving a propeller map
+
+        Looks up the propeller torque and speed in a PropMap at arrays of
+        V, T, rho and R, as a Propulsor would link them, and evaluates the
+        motor there.  The returned dict also has the propeller efficiency
+        etap and the combined efficiency eta = etap*etam.
+        """
+        Q = propmap("Q", V, T, rho, R)
+        omega = propmap("omega", V, T, rho, R)
+        perf = self(Q, omega)
+        perf["etap"] = propmap("eta", V, T, rho, R)
+        perf["eta"] = perf["etap"]*perf["etam"]
+        return perf
@@ -1,16 +1,18 @@
 from gpkit import Model, parse_variables, SignomialsEnabled, SignomialEquality, units
 from motor import Propulsor, Motor, MotorPerf
+from motor_map import MotorMap
 from gpkitmodels.GP.aircraft.prop.propeller import Propeller, ActuatorProp
 from gpkitmodels.SP.aircraft.prop.propeller import BladeElementProp
 from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+from gpkitmodels.tools.fixtures import flight_state, propulsor, solved
 
 class Propulsor_Test(Model):
     """Propulsor Test Model
     """
 
     def setup(self):
-        fs = FlightState()
-        p = Propulsor()
+        fs = flight_state()
+        p = propulsor(ActuatorProp)
         pp = p.flight_model(p,fs)
         pp.substitutions[pp.prop.T] = 100
         self.cost = 1./pp.motor.etam + p.W/(1000*units('lbf')) + 1./pp.prop.eta
@@ -22,9 +24,8 @@ class Actuator_Propulsor_Test(Model):
     """
 
     def setup(self):
-        fs = FlightState()
-        Propulsor.prop_flight_model = ActuatorProp
-        p = Propulsor()
+        fs = flight_state()
+        p = propulsor(ActuatorProp)
         pp = p.flight_model(p,fs)
         pp.substitutions[pp.prop.T] = 100
         self.cost = pp.motor.Pelec/(1000*units('W')) + p.W/(1000*units('lbf'))
@@ -35,9 +36,8 @@ class BladeElement_Propulsor_Test(Model):
     """
 
     def setup(self):
-        fs = FlightState()
-        Propulsor.prop_flight_model = BladeElementProp
-        p = Propulsor()
+        fs = flight_state()
+        p = propulsor(BladeElementProp)
         pp = p.flight_model(p,fs)
         pp.substitutions[pp.prop.T] = 100
         self.cost = pp.motor.Pelec/(1000*units('W')) + p.W/(1000*units('lbf'))
@@ -62,6 +62,7 @@ class Motor_P_Test(Model):
         m  = Motor()
         mp = MotorPerf(m,fs)
         self.mp = mp
+        self.motor = m
         mp.substitutions[m.Qmax] = 100
         mp.substitutions[mp.Q]    = 10
         self.cost = 1./mp.etam + m.W/(100.*units('lbf'))
@@ -94,11 +95,21 @@ class hacker_q150_45_motor(Model):
         return self.mp, fs
 
 def motor_test():
-    test = Motor_P_Test()
-    test.solve()
+    solved(Motor_P_Test)
+
+def motor_map_test():
+    test, sol = solved(Motor_P_Test)
+    mm = MotorMap.from_solution(sol, test.motor)
+    perf = mm(sol(test.mp.Q).to("N*m").magnitude,
+              sol(test.mp.omega).to("rpm").magnitude)
+    assert abs(perf["etam"]/sol(test.mp.etam) - 1) < 1e-3
+    assert not perf["overtorque"] and not perf["overvoltage"]
+    etam = mm.efficiency_map([1, 10, 1000], [500, 1000])
+    assert etam.shape == (3, 2) and (etam[:2] < 1).all()
 
 def test():
     motor_test()
+    motor_map_test()
     actuator_propulsor_test()
     propulsor_test()
     ME_propulsor_test()
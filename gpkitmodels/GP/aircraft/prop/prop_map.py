@@ -0,0 +1,255 @@
+" precomputed propeller performance maps "
+from itertools import product
+from multiprocessing import Pool
+import numpy as np
+import pandas as pd
+from gpkit import Model, parse_variables, units
+from gpfit.fit import fit
+from gpfit.fit_constraintset import FitCS
+from gpkitmodels.GP.aircraft.prop.propeller import Propeller, ActuatorProp
+from gpkitmodels.SP.aircraft.prop.propeller import BladeElementProp
+from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+from gpkitmodels.tools.slim import slim_solve, label
+
+#pylint: disable=exec-used, undefined-variable, invalid-name, no-member
+
+AXES = ["V", "T", "rho", "R"]
+OUTPUTS = ["eta", "Q", "omega", "CP"]
+UNITS = {"V": "m/s", "T": "lbf", "rho": "kg/m^3", "R": "ft",
+         "eta": "-", "Q": "N*m", "omega": "rpm", "CP": "-"}
+FLIGHT_MODELS = {"ActuatorProp": ActuatorProp,
+                 "BladeElementProp": BladeElementProp}
+
+_WORKER_MODELS = {}
+
+def map_model(flight_model="ActuatorProp", N=5):
+    """ propeller model solved at each map point
+
+    Returns the model and the flight state, propeller and propeller
+    performance models whose variables the map substitutes and reads.
+    The propeller weight is in the cost, as in prop_test, so that every
+    variable is bounded.
+    """
+    fs = FlightState()
+    p = Propeller(N=N)
+    if flight_model == "BladeElementProp":
+        pp = BladeElementProp(p, fs, N=N)
+        cost = (1./pp.eta + pp.Q/(1000.*units("N*m"))
+                + p.T_m/(1000*units("N")) + p.W/(100.*units("lbf")))
+    else:
+        pp = FLIGHT_MODELS[flight_model](p, fs)
+        cost = (1./pp.eta + pp.Q/(100.*units("N*m"))
+                + p.W/(100.*units("lbf")))
+    return Model(cost, [fs, p, pp]), fs, p, pp
+
+def power_coefficient(Q, omega, rho, R):
+    " CP as defined in ActuatorProp, from Q [N*m], omega [rpm], R [ft] "
+    omega = np.asarray(omega)*np.pi/30.
+    R = np.asarray(R)*0.3048
+    return Q*omega/(0.5*rho*(omega*R)**3*np.pi*R**2)
+
+def solve_point(args):
+    """ solve the propeller at one (V, T, rho, R) point
+
+    Each worker process builds one model per flight model and reuses it,
+    only updating the substitutions.  Returns the OUTPUTS and None, or,
+    if the solver fails, NaNs and its error message.
+    """
+    flight_model, N, V, T, rho, R = args
+    if (flight_model, N) not in _WORKER_MODELS:
+        _WORKER_MODELS[(flight_model, N)] = map_model(flight_model, N)
+    m, fs, p, pp = _WORKER_MODELS[(flight_model, N)]
+    m.substitutions.update({fs.V: V, fs.rho: rho, pp.T: T, p.R: R})
+    outputs = [pp.eta, pp.Q, pp.omega]
+    solveargs = {"units": {pp.Q: UNITS["Q"], pp.omega: UNITS["omega"]}}
+    if flight_model == "BladeElementProp":
+        solveargs.update(localsolve=True, iteration_limit=400)
+    try:
+        res = slim_solve(m, outputs, **solveargs)
+    except RuntimeWarning as e:  # gpkit's solver failures
+        return [np.nan]*len(OUTPUTS), str(e)
+    eta, Q, omega = [float(res[label(v)]) for v in outputs]
+    return [eta, Q, omega, power_coefficient(Q, omega, rho, R)], None
+
+class PropMap(object):
+    """ grid of propeller solutions over V, T, rho and R
+
+    Arguments
+    ---------
+    flight_model : str
+        "ActuatorProp" or "BladeElementProp"
+    N : int
+        number of blade elements for BladeElementProp
+    **axes : array_like
+        grid values of V [m/s], T [lbf], rho [kg/m^3] and R [ft]
+
+    Results are stored as one float array per output with the grid shape;
+    points that have not been solved yet are NaN with `solved` False, and
+    points whose solve failed are NaN with `solved` True and the solver's
+    message in `errors`, by grid index.
+    """
+    def __init__(self, flight_model="ActuatorProp", N=5, **axes):
+        self.flight_model = flight_model
+        self.N = N
+        self.axes = [np.unique(np.asarray(axes[a], dtype=float))
+                     for a in AXES]
+        self.data = dict((o, np.full(self.shape, np.nan)) for o in OUTPUTS)
+        self.solved = np.zeros(self.shape, dtype=bool)
+        self.errors = {}
+
+    @property
+    def shape(self):
+        " grid shape, ordered as AXES "
+        return tuple(len(a) for a in self.axes)
+
+    def extend(self, **axes):
+        " add grid values, keeping every result already computed "
+        new = [np.union1d(old, np.asarray(axes.get(a, []), dtype=float))
+               for a, old in zip(AXES, self.axes)]
+        idx = np.ix_(*[np.searchsorted(n, o) for n, o in zip(new, self.axes)])
+        self.axes = new
+        for o in OUTPUTS:
+            old, self.data[o] = self.data[o], np.full(self.shape, np.nan)
+            self.data[o][idx] = old
+        old, self.solved = self.solved, np.zeros(self.shape, dtype=bool)
+        self.solved[idx] = old
+        self.errors = dict((tuple(int(i.ravel()[k]) for i, k in
+                                  zip(idx, ind)), msg)
+                           for ind, msg in self.errors.items())
+
+    def generate(self, processes=None, chunksize=4):
+        """ solve every grid point not solved yet in a process pool
+
+        Returns the number of points solved.
+        """
+        todo = np.argwhere(~self.solved)
+        jobs = [(self.flight_model, self.N) + tuple(
+            a[i] for a, i in zip(self.axes, ind)) for ind in todo]
+        if not jobs:
+            return 0
+        pool = Pool(processes)
+        try:
+            results = pool.map(solve_point, jobs, chunksize)
+        finally:
+            pool.close()
+            pool.join()
+        for ind, (res, error) in zip(map(tuple, todo), results):
+            for o, r in zip(OUTPUTS, res):
+                self.data[o][ind] = r
+            self.solved[ind] = True
+            if error is not None:
+                self.errors[ind] = error
+        return len(jobs)
+
+    def __call__(self, output, V, T, rho, R):
+        """ interpolate output at arrays of V, T, rho and R
+
+        Interpolation is multilinear in log space; inputs outside the grid
+        are clipped to its edges.
+        """
+        pts = np.broadcast_arrays(*[np.log(np.asarray(x, dtype=float))
+                                    for x in [V, T, rho, R]])
+        lvals = np.log(self.data[output])
+        ind, wts = [], []
+        for ax, x in zip(self.axes, pts):
+            lx = np.log(ax)
+            if len(lx) == 1:
+                ind.append(np.zeros(x.shape, dtype=int))
+                wts.append(np.zeros(x.shape))
+                continue
+            x = np.clip(x, lx[0], lx[-1])
+            i = np.clip(np.searchsorted(lx, x, side="right") - 1,
+                        0, len(lx) - 2)
+            ind.append(i)
+            wts.append((x - lx[i])/(lx[i+1] - lx[i]))
+        out = np.zeros(pts[0].shape)
+        for corner in product([0, 1], repeat=len(AXES)):
+            if any(c and len(a) == 1 for c, a in zip(corner, self.axes)):
+                continue
+            w = np.ones(out.shape)
+            for c, wt in zip(corner, wts):
+                w = w*(wt if c else 1 - wt)
+            out += w*lvals[tuple(i + c for i, c in zip(ind, corner))]
+        return np.exp(out)
+
+    def fit(self, output, K=2, ftype="SMA", path=None):
+        """ GP fit of output as a function of V, T, rho and R
+
+        Returns the fit DataFrame, in the csv format read by FitCS, and
+        writes it to path if one is given.
+        """
+        grid = np.meshgrid(*self.axes, indexing="ij")
+        y = self.data[output]
+        ok = np.isfinite(y) & (y > 0)
+        x = np.log([g[ok] for g in grid])
+        cn, _ = fit(x, np.log(y[ok]), K, ftype)
+        df = cn.get_dataframe()
+        if path:
+            df.to_csv(path, index=False)
+        return df
+
+    def save(self, path):
+        " write the map to a compressed npz file "
+        arrays = dict(("axis_" + a, ax) for a, ax in zip(AXES, self.axes))
+        arrays.update(self.data)
+        errors = sorted(self.errors.items())
+        np.savez_compressed(path, solved=self.solved,
+                            flight_model=self.flight_model, N=self.N,
+                            error_index=np.array([i for i, _ in errors],
+                                                 dtype=int).reshape(-1, 4),
+                            error_message=np.array([e for _, e in errors]
+                                                   or [""])[:len(errors)],
+                            **arrays)
+
+    @classmethod
+    def load(cls, path):
+        " read a map written by save "
+        f = np.load(path)
+        pm = cls(str(f["flight_model"]), int(f["N"]),
+                 **dict((a, f["axis_" + a]) for a in AXES))
+        for o in OUTPUTS:
+            pm.data[o] = f[o]
+        pm.solved = f["solved"]
+        if "error_index" in f:
+            pm.errors = dict((tuple(int(i) for i in ind), str(msg)) for
+                             ind, msg in zip(f["error_index"],
+                                             f["error_message"]))
+        return pm
+
+class MapProp(Model):
+    """ Propeller performance from GP fits to a PropMap
+
+    Set `fitdata` to the csv paths written by PropMap.fit for Q and omega,
+    then use as `Propulsor.prop_flight_model = MapProp`.
+
+    Variables
+    ---------
+    T                       [lbf]       thrust
+    eta                     [-]         overall efficiency
+    Q                       [N*m]       torque
+    omega                   [rpm]       propeller rotation rate
+
+    """
+    fitdata = {"Q": None, "omega": None}
+
+    def setup(self, static, state):
+        exec parse_variables(MapProp.__doc__)
+
+        missing = [k for k, v in sorted(self.fitdata.items()) if v is None]
+        if missing:
+            raise ValueError("MapProp.fitdata has no fit csv for %s; set it"
+                             " to the paths written by PropMap.fit"
+                             % ", ".join(missing))
+
+        V = state.V
+        rho = state.rho
+        R = static.R
+        dvars = [V/units(UNITS["V"]), T/units(UNITS["T"]),
+                 rho/units(UNITS["rho"]), R/units(UNITS["R"])]
+
+        return [FitCS(pd.read_csv(self.fitdata["Q"]).to_dict(
+                    orient="records")[0], Q/units(UNITS["Q"]), dvars),
+                FitCS(pd.read_csv(self.fitdata["omega"]).to_dict(
+                    orient="records")[0], omega/units(UNITS["omega"]), dvars),
+                eta*Q*omega <= V*T,
+                static.T_m >= T]
@@ -1,6 +1,7 @@
 " propeller tests "
 from gpkitmodels.GP.aircraft.prop.propeller import Propeller, ActuatorProp
 from gpkitmodels.SP.aircraft.prop.propeller import BladeElementProp
+from gpkitmodels.GP.aircraft.prop.prop_map import PropMap, MapProp
 
 from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
 from gpkit import units, Model
@@ -26,11 +27,54 @@ def ME_eta_test():
     pp.cost = 1./pp.eta + pp.Q/(1000.*units("N*m")) + p.T_m/(1000*units('N'))
     sol = pp.localsolve(iteration_limit = 400)
 
+def propmap_test():
+    " test incremental map generation and interpolation "
+    pm = PropMap("ActuatorProp", V=[40, 50], T=[100], rho=[1.225], R=[1])
+    assert pm.generate(processes=2) == 2
+    pm.extend(T=[150])
+    assert pm.generate(processes=2) == 2
+    eta = pm("eta", [45, 45], [100, 125], 1.225, 1)
+    assert eta.shape == (2,) and (eta > 0).all() and (eta < 1).all()
+    assert pm.solved.all() and not pm.errors
+
+def mapprop_test():
+    " test MapProp on fits of a propeller map "
+    from tempfile import mkdtemp
+    from shutil import rmtree
+    import os
+    try:
+        MapProp(Propeller(), FlightState())
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("MapProp built without fit data")
+    pm = PropMap("ActuatorProp", V=[30, 40, 50], T=[80, 100, 120],
+                 rho=[1.0, 1.225], R=[0.8, 1])
+    pm.generate(processes=2)
+    path = mkdtemp()
+    try:
+        MapProp.fitdata = dict((o, os.path.join(path, o + ".csv"))
+                               for o in ["Q", "omega"])
+        for o, csv in MapProp.fitdata.items():
+            pm.fit(o, path=csv)
+        fs = FlightState()
+        p = Propeller()
+        pp = MapProp(p, fs)
+    finally:
+        MapProp.fitdata = {"Q": None, "omega": None}
+        rmtree(path)
+    m = Model(1/pp.eta + p.W/(100.*units("lbf")), [fs, p, pp])
+    m.substitutions.update({fs.V: 40, fs.rho: 1.225, pp.T: 100, p.R: 1})
+    sol = m.solve(verbosity=0)
+    eta = pm("eta", 40, 100, 1.225, 1)
+    assert abs(sol("eta")/eta - 1) < 0.1
 
 def test():
     "tests"
     simpleprop_test()
     ME_eta_test()
+    propmap_test()
+    mapprop_test()
 if __name__ == "__main__":
     test()
 
@@ -1,10 +1,10 @@
 " test tail models "
-from gpkitmodels.GP.aircraft.tail.horizontal_tail import HorizontalTail
-from gpkitmodels.GP.aircraft.tail.vertical_tail import VerticalTail
 from gpkitmodels.GP.aircraft.tail.empennage import Empennage
-from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
 from gpkitmodels.GP.aircraft.wing.boxspar import BoxSpar
 from gpkitmodels.GP.aircraft.tail.tail_boom import TailBoom
+from gpkitmodels.tools.fixtures import (horizontal_tail, vertical_tail,
+                                        empennage, flight_state)
+from gpkitmodels.tools.serialization import dumps, loads
 from gpkit import Model, Variable, units
 
 #pylint: disable=no-member
@@ -13,8 +13,8 @@ def test_htail():
 
     Sw = Variable("S_w", 50, "ft**2", "wing area")
     cmac = Variable("cmac", 15, "in", "wing MAC")
-    ht = HorizontalTail()
-    fs = FlightState()
+    ht = horizontal_tail()
+    fs = flight_state()
     ht.substitutions.update({ht.W: 5, ht.mh: 0.01, ht.planform.AR: 4,
                              ht.Vh: 0.5, ht.lh: 10, ht.planform.tau: 0.08})
     perf = ht.flight_model(ht, fs)
@@ -27,8 +27,8 @@ def test_vtail():
 
     Sw = Variable("S_w", 50, "ft**2", "wing area")
     bw = Variable("b_w", 20, "ft", "wing span")
-    vt = VerticalTail()
-    fs = FlightState()
+    vt = vertical_tail()
+    fs = flight_state()
     vt.substitutions.update({vt.W: 5, vt.planform.AR: 3, vt.Vv: 0.04,
                              vt.lv: 10, vt.planform.tau: 0.08})
     perf = vt.flight_model(vt, fs)
@@ -36,13 +36,14 @@ def test_vtail():
     m = Model(perf.Cd, [vt.Vv <= vt.planform.S*vt.lv/Sw/bw, vt, fs, perf])
     m.solve(verbosity=0)
 
-def test_emp():
+def test_emp(emp=None):
 
     Sw = Variable("S_w", 50, "ft**2", "wing area")
     bw = Variable("b_w", 20, "ft", "wing span")
     cmac = Variable("cmac", 15, "in", "wing MAC")
-    emp = Empennage()
-    fs = FlightState()
+    if emp is None:
+        emp = empennage()
+    fs = flight_state()
     emp.substitutions.update({emp.W: 10, emp.tailboom.l: 5,
                               emp.htail.planform.AR: 4,
                               emp.vtail.planform.AR: 4,
@@ -81,7 +82,7 @@ def test_tailboom_mod():
     TailBoom.__bases__ = (BoxSpar,)
     TailBoom.secondaryWeight = True
     emp = Empennage(N=5)
-    fs = FlightState()
+    fs = flight_state()
     emp.substitutions.update({emp.W: 10, emp.tailboom.l: 5,
                               emp.htail.planform.AR: 4,
                               emp.vtail.planform.AR: 4,
@@ -113,10 +114,14 @@ def test_tailboom_mod():
 
     m.solve(verbosity=0)
 
+def test_pickle():
+    test_emp(loads(dumps(empennage(), compress=True)))
+
 def test():
     test_htail()
     test_vtail()
     test_emp()
+    test_pickle()
     test_tailboom_mod()
 
 if __name__ == "__main__":
@@ -37,9 +37,12 @@ class TubeSpar(Model):
 
     """
 
-    minusk2 = lambda self, c: 1-c(self.k)/2.
     material = cfrpfabric
 
+    def minusk2(self, c):
+        " return 1-k/2 "
+        return 1-c(self.k)/2.
+
     def setup(self, N, surface):
         exec parse_variables(TubeSpar.__doc__)
 
@@ -76,9 +76,14 @@ class Planform(Model):
         den = sum([(cbar[i] + cbar[i+1])/2*deta[i] for i in range(len(deta))])
         return num/den/cbar[0]
 
-    return_avg = lambda self, c: (self.return_c(c)[:-1]
-                                  + self.return_c(c)[1:])/2.
-    return_deta = lambda self, c: np.diff(c(self.eta))
+    def return_avg(self, c):
+        " return normalized mid section chords "
+        cbar = self.return_c(c)
+        return (cbar[:-1] + cbar[1:])/2.
+
+    def return_deta(self, c):
+        " return normalized section lengths "
+        return np.diff(c(self.eta))
 
     def setup(self, N):
         exec parse_variables(Planform.__doc__)
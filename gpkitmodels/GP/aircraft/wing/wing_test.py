@@ -1,8 +1,9 @@
 " wing test "
-from gpkitmodels.GP.aircraft.wing.wing import Wing
 from gpkitmodels.GP.aircraft.wing.wing_skin import WingSkin
 from gpkitmodels.GP.aircraft.wing.wing_core import WingCore
 from gpkitmodels.GP.aircraft.wing.boxspar import BoxSpar
+from gpkitmodels.tools.fixtures import wing, flight_state
+from gpkitmodels.tools.serialization import dumps, loads
 from gpkit import Model, parse_variables
 
 #pylint: disable=no-member, exec-used
@@ -23,13 +24,14 @@ class FlightState(Model):
 
         return [qne == V**2*rho*1.2]
 
-def wing_test():
+def wing_test(W=None):
     " test wing models "
 
-    W = Wing()
+    if W is None:
+        W = wing()
     W.substitutions[W.W] = 50
     W.substitutions[W.planform.tau] = 0.115
-    fs = FlightState()
+    fs = flight_state()
     perf = W.flight_model(W, fs)
     loading = [W.spar.loading(W, fs)]
     loading[0].substitutions["W"] = 100
@@ -53,11 +55,10 @@ def wing_test():
 def box_spar():
     " test wing models "
 
-    Wing.sparModel = BoxSpar
-    W = Wing()
+    W = wing(BoxSpar)
     W.substitutions[W.W] = 50
     W.substitutions[W.planform.tau] = 0.115
-    fs = FlightState()
+    fs = flight_state()
     perf = W.flight_model(W, fs)
     loading = [W.spar.loading(W, fs)]
     loading[0].substitutions["W"] = 100
@@ -78,10 +79,15 @@ def box_spar():
         W, fs, perf, loading])
     m.solve(verbosity=0)
 
+def pickle_test():
+    " test wing models sent through pickle "
+    wing_test(loads(dumps(wing())))
+
 def test():
     " tests "
     wing_test()
     box_spar()
+    pickle_test()
 
 if __name__ == "__main__":
     test()
@@ -2,13 +2,14 @@ import numpy as np
 from gpkit import Model, Variable, SignomialsEnabled, SignomialEquality, VarKey, units,Vectorize
 from gpkit.constraints.bounded import Bounded
 from gpkit.constraints.tight import Tight
+from gpkitmodels.tools.varindex import IndexedModel
 
 # Importing models
 from gpkitmodels.SP.atmosphere.atmosphere import Atmosphere
 
 # SimPleAC with mission design and flight segments, and lapse rate and BSFC model (3.4.2)
 
-class SimPleAC(Model):
+class SimPleAC(IndexedModel, Model):
     def setup(self):
         self.engine = Engine()
         self.wing = Wing()
@@ -41,7 +42,7 @@ class SimPleAC(Model):
     def dynamic(self,state):
         return SimPleACP(self,state)
 
-class SimPleACP(Model):
+class SimPleACP(IndexedModel, Model):
     def setup(self,aircraft,state):
         self.aircraft = aircraft
         self.engineP  = aircraft.engine.dynamic(state)
@@ -66,7 +67,7 @@ class SimPleACP(Model):
 
         return constraints, self.Pmodels
 
-class Fuselage(Model):
+class Fuselage(IndexedModel, Model):
     def setup(self):
         # Free Variables
         CDA0      = Variable("(CDA0)", "m^2", "fuselage drag area") #0.035 originally
@@ -80,7 +81,7 @@ class Fuselage(Model):
 
         return constraints
 
-class Wing(Model):
+class Wing(IndexedModel, Model):
     def setup(self):
         # Non-dimensional constants
         C_Lmax     = Variable("C_{L,max}", 1.6, "-", "lift coefficient at stall", pr=5.)
@@ -118,7 +119,7 @@ class Wing(Model):
     def dynamic(self,state):
         return WingP(self,state)
 
-class WingP(Model):
+class WingP(IndexedModel, Model):
     def setup(self,wing,state):
         self.wing = wing
         # Free Variables
@@ -135,7 +136,7 @@ class WingP(Model):
 
         return constraints
 
-class Engine(Model):
+class Engine(IndexedModel, Model):
     def setup(self):
         # Dimensional constants
         BSFC_ref    = Variable("BSFC_{ref}", 0.32, "lbf/(hp*hr)", "reference brake specific fuel consumption")
@@ -156,7 +157,7 @@ class Engine(Model):
     def dynamic(self,state):
         return EngineP(self,state)
 
-class EngineP(Model):
+class EngineP(IndexedModel, Model):
     def setup(self,engine,state):
         self.engine = engine
         # Dimensional constants
@@ -181,7 +182,7 @@ class EngineP(Model):
         return constraints
 
 
-class Mission(Model):
+class Mission(IndexedModel, Model):
     def setup(self,aircraft,Nsegments):
         self.aircraft = aircraft
         W_f_m   = Variable('W_{f_m}','N','total mission fuel')
@@ -1,12 +1,13 @@
 import numpy as np
 from gpkit import Model, Variable, SignomialsEnabled, SignomialEquality, VarKey, units,Vectorize
 from gpkit.constraints.bounded import Bounded
+from gpkitmodels.tools.varindex import IndexedModel
 from SimPleAC_mission import Mission, SimPleAC
 from gpkitmodels.SP.atmosphere.atmosphere import Atmosphere
 
 # SimPleAC with multimission design (3.5)
 
-class Multimission(Model):
+class Multimission(IndexedModel, Model):
     def setup(self,aircraft,Nmissions,Nsegments):
         self.aircraft = aircraft
         self.missions = []
@@ -47,6 +48,17 @@ class Multimission(Model):
 
         return constraints, self.aircraft, self.missions
 
+def index_test():
+    " name lookups through the VarIndex match Model's own "
+    mission = Mission(SimPleAC(), 4)
+    mm = Multimission(SimPleAC(), 2, 4)
+    for m, names in [(mission, ['W_{f_m}', 'W_{avg}', 'S']),
+                     (mm, ['W_{f_{mm}}', 'Range_{mm}', 'S'])]:
+        for name in names:
+            var = m[name]
+            assert var is m[name]
+            assert str(var) == str(Model.__getitem__(m, name))
+
 def test():
     Nmissions = 2
     Nsegments = 4
@@ -61,6 +73,7 @@ def test():
     #m.cost = m['W_{f_{mm}}']*units('1/N') + sum(m.missions[i]['C_m']*m.missions[i]['t_m'] for i in range(0,Nmissions))
     m.cost = (m.missions[0]['W_{f_m}']*units('1/N') + m.missions[1]['C_m']*m.missions[1]['t_m'])
     sol = m.localsolve(verbosity = 2)
+    index_test()
 
 if __name__ == "__main__":
     Nmissions = 2
@@ -0,0 +1,177 @@
+from multiprocessing import Pool
+from tempfile import mkdtemp
+from shutil import rmtree
+import numpy as np
+from gpkit import units
+from gpkitmodels.tools.result_store import (ResultStore, model_hash,
+                                             unitstr)
+from gpkitmodels.tools.slim import slim_solve
+from SimPleAC_mission import Mission, SimPleAC
+
+# SimPleAC off-design performance: the sizing variables tagged fix=True are
+# frozen at a solved design and missions are flown in parallel
+
+DEFAULTS = {
+    'C_m'            :120*units('1/hr'),
+    'V_{min_m}'      :25*units('m/s'),
+    'T/O factor_m'   :2,
+}
+
+OUTPUTS = ['W_{f_m}', 't_m', 'W']
+
+def fixed_values(model, sol):
+    """ values of every fix=True variable of model in sol, by name """
+    fixed = {}
+    for vk in model.varkeys:
+        if vk.descr.get("fix"):
+            if vk.name in fixed:
+                raise ValueError("fixed variable name '%s' is not unique"
+                                 % vk.name)
+            fixed[vk.name] = sol["variables"][vk]
+    return fixed
+
+def mission_model(Nsegments=4):
+    """ Mission with the cost and constants used in SimPleAC_mission.test """
+    m = Mission(SimPleAC(), Nsegments)
+    m.substitutions.update(DEFAULTS)
+    m.cost = m['W_{f_m}']*units('1/N') + m['C_m']*m['t_m']
+    return m
+
+def mission_substitutions(Range, payload, altitude, speed=None, Nsegments=4):
+    """ substitutions for one mission [km, N, m, m/s]
+
+    If speed is None the cruise speed is left free.
+    """
+    subs = {'Range_m': Range, 'W_{p_m}': payload, 'h_{cruise_m}': altitude}
+    if speed is not None:
+        subs['V'] = [speed]*Nsegments
+    return subs
+
+_WORKER = {}
+
+def _init_worker(factory, args, fixed):
+    " build the performance model once per worker process "
+    m = factory(*args)
+    m.substitutions.update(fixed)
+    _WORKER["model"] = m
+    _WORKER["subbed"] = set()
+
+def _evaluate(job):
+    """ fly one mission with the worker's model
+
+    Returns (result, None), or (None, message) if the solver fails.
+    """
+    subs, outputs = job
+    m = _WORKER["model"]
+    for name in _WORKER["subbed"].difference(subs):
+        del m.substitutions[name]
+    m.substitutions.update(subs)
+    _WORKER["subbed"] = set(subs)
+    try:
+        return slim_solve(m, outputs, localsolve=True), None
+    # gpkit's solver failures; localsolve raises ValueError when its
+    # fallback for an infeasible iteration cannot be bounded
+    except (RuntimeWarning, ValueError) as e:
+        return None, str(e)
+
+class OffDesign(object):
+    """ Batch off-design evaluation of a sized aircraft
+
+    Arguments
+    ---------
+    fixed : dict
+        frozen design variables by name, e.g. from fixed_values
+    factory : callable
+        module level function returning the performance model
+    args : tuple
+        arguments to factory
+    outputs : list
+        names of the variables returned for each mission
+    processes : int
+        number of worker processes, each holding one performance model
+
+    """
+    def __init__(self, fixed, factory=mission_model, args=(4,),
+                 outputs=OUTPUTS, processes=None):
+        self.outputs = outputs
+        self.fixed = fixed
+        self.factory, self.args = factory, args
+        self.errors = {}
+        self.pool = Pool(processes, _init_worker, (factory, args, fixed))
+
+    def store(self, path, metadata=None):
+        """ ResultStore at path for this sweep's results
+
+        Records the performance model's hash, the outputs' units and the
+        fixed design in its metadata, and refuses an existing store of a
+        different model.
+        """
+        m = self.factory(*self.args)
+        colunits = {"cost": unitstr(m.cost.units) or "-"}
+        for name in self.outputs:
+            vk = sorted(m.varkeys[name], key=str)[0]
+            colunits[name] = unitstr(vk.units) or "-"
+        meta = {"fixed": dict((k, np.asarray(getattr(v, "magnitude", v),
+                                             dtype=float).tolist())
+                              for k, v in self.fixed.items())}
+        meta.update(metadata or {})
+        return ResultStore(path, model_hash(m), colunits, meta)
+
+    def evaluate(self, missions, chunksize=1, store=None, batch=256):
+        """ solve each mission's substitutions
+
+        Returns a list of dicts of the outputs and cost for each mission,
+        with None for missions the solver fails on, e.g. those infeasible
+        for the frozen design; their solver messages are kept in errors by
+        mission index.  If store is a ResultStore, e.g. from store(),
+        results are also appended to it in chunks of batch missions as they
+        finish, with failed missions NaN.
+        """
+        jobs = [(subs, self.outputs) for subs in missions]
+        self.errors = {}
+        res = []
+        for r, error in self.pool.imap(_evaluate, jobs, chunksize):
+            if error is not None:
+                self.errors[len(res)] = error
+            res.append(r)
+            if store is not None and len(res) % batch == 0:
+                store.append_rows(res[-batch:], store.meta["units"])
+        if store is not None and len(res) % batch:
+            store.append_rows(res[-(len(res) % batch):], store.meta["units"])
+        return res
+
+    def close(self):
+        " shut down the worker processes "
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def test():
+    m = mission_model(4)
+    m.substitutions.update(mission_substitutions(3000, 6250, 5000))
+    sol = m.localsolve(verbosity=0)
+    fixed = fixed_values(m, sol)
+    missions = [mission_substitutions(3000, 6250, 5000),
+                mission_substitutions(2000, 5000, 5000),
+                mission_substitutions(1000, 6250, 3000, speed=80)]
+    with OffDesign(fixed, processes=2) as od:
+        store = od.store(mkdtemp())
+        res = od.evaluate(missions, store=store, batch=2)
+    assert store.meta["model_hash"] == model_hash(mission_model(4))
+    assert store.units('W_{f_m}') == "N"
+    assert abs(res[0]['W_{f_m}']/sol["variables"]['W_{f_m}'] - 1) < 1e-2
+    assert res[1]['W_{f_m}'] < res[0]['W_{f_m}']
+    # 80 m/s is too slow for the frozen wing
+    assert res[2] is None and list(od.errors) == [2]
+    assert len(store) == 3 and len(store.chunks()) == 2
+    store.compact()
+    assert store['cost'][1] == res[1]['cost']
+    rmtree(store.path)
+
+if __name__ == "__main__":
+    test()
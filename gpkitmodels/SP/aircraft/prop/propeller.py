@@ -6,7 +6,14 @@ from gpfit.fit_constraintset import XfoilFit
 import os
 import pandas as pd
 
+DAE51_FITDATA = os.path.dirname(__file__) + os.sep + "dae51_fitdata.csv"
+_FITDATA = {}
 
+def fitdata(path=DAE51_FITDATA):
+    " return fit coefficients in path, reading each csv only once "
+    if path not in _FITDATA:
+        _FITDATA[path] = pd.read_csv(path).to_dict(orient="records")[0]
+    return _FITDATA[path]
 
 class BladeElementPerf(Model):
     """ Single element of a propeller blade
@@ -48,9 +55,7 @@ class BladeElementPerf(Model):
         rho     = state.rho
         R       = static.R
         mu      = state.mu
-        path = os.path.dirname(__file__)
-        fd = pd.read_csv(path + os.sep + "dae51_fitdata.csv").to_dict(
-            orient="records")[0]
+        fd = fitdata()
         c = static.c
         constraints = [TCS([Wa>=V + va]),
                         TCS([Wt + vt<=omega*r]),
@@ -101,12 +106,11 @@ class BladeElementProp(Model):
                         blade.omega == omega,
                         blade.r[0] == static.R/(2.*N)]
 
-        for n in range(1,N):
-            constraints += [TCS([blade.r[n] >= blade.r[n-1] + static.R/N]),
-                            blade.eta_i[n] == blade.eta_i[n-1],
-                            ]
+        if N > 1:
+            constraints += [TCS([blade.r[1:] >= blade.r[:-1] + static.R/N]),
+                            blade.eta_i[1:] == blade.eta_i[:-1]]
 
-        constraints += [TCS([Q >= sum(blade.dQ)]),
+        constraints += [TCS([Q >= blade.dQ.sum()]),
                         eta == state.V*T/(omega*Q),
                         blade.M[-1] <= Mtip,
                         static.T_m >= T,
@@ -114,7 +118,7 @@ class BladeElementProp(Model):
                         ]
 
         with SignomialsEnabled():
-            constraints += [TCS([T <= sum(blade.dT)])] 
+            constraints += [TCS([T <= blade.dT.sum()])]
 
         return constraints, blade 
 
@@ -1,11 +1,12 @@
 from gpkit import Model, Variable, SignomialsEnabled, SignomialEquality, VarKey, units
 from gpkit.constraints.bounded import Bounded
 from gpkit import Vectorize
+from gpkitmodels.tools.varindex import IndexedModel
 import numpy as np
 import matplotlib.pyplot as plt
 
 
-class Atmosphere(Model):
+class Atmosphere(IndexedModel, Model):
     """
     Atmosphere models borrowed from Tony Tao, 2017.
     Fits included for all variables. Density and viscosity are demonstrated. 
@@ -0,0 +1,32 @@
+" batched block-diagonal solves vs serial solves of a wing weight sweep "
+from __future__ import print_function
+import numpy as np
+from gpkitmodels.tools.batch import batch_solve, sweep_programs
+from gpkitmodels.benchmarks.bench_slim import gust_wing
+from gpkitmodels.benchmarks.timing import timed, table
+
+def run(counts=(10, 100, 300), size=None):
+    """ time solving `count` gust-loaded wings of varying weight
+
+    Serial solves each program with its own solver call; batched stacks
+    up to `size` of them per call.  Program generation is timed apart.
+    """
+    m, outputs, _ = gust_wing(N=5)
+    W = outputs[0]
+    rows = []
+    for count in counts:
+        subs = [{W: w} for w in np.linspace(40, 80, count)]
+        gps, tgen = timed(sweep_programs, m, subs)
+        serial, tserial = timed(lambda: [gp.solve(verbosity=0)["cost"]
+                                         for gp in gps])
+        batched, tbatch = timed(batch_solve, gps, None, size)
+        costs = np.array([r["cost"] for r in batched], dtype=float)
+        rows.append({"wings": count, "generate": tgen, "serial": tserial,
+                     "batched": tbatch, "speedup": tserial/tbatch,
+                     "max cost diff": float(np.max(np.abs(
+                         costs/np.array(serial, dtype=float) - 1)))})
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["wings", "generate", "serial", "batched", "speedup",
+                        "max cost diff"]))
@@ -0,0 +1,44 @@
+" loading saved compiled programs vs building the models "
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+from gpkitmodels.tools.compiled import CompiledGP, load
+from gpkitmodels.tools.screen import Screener
+from gpkitmodels.benchmarks.bench_slim import gust_wing, mission
+from gpkitmodels.benchmarks.timing import timed, table
+
+def run(wingN=50, segments=20):
+    """ build and compile, save, then load, each model
+
+    The gust-loaded wing is a GP, saved as a CompiledGP and resolved after
+    loading; the SimPleAC mission is a signomial program, saved as a
+    Screener.
+    """
+    cases = [("wing N=%d" % wingN, lambda: gust_wing(N=wingN)[0], CompiledGP),
+             ("mission N=%d" % segments, lambda: mission(N=segments)[0],
+              Screener)]
+    directory = tempfile.mkdtemp()
+    rows = []
+    try:
+        for name, factory, cls in cases:
+            m, tbuild = timed(factory)
+            compiled, tcompile = timed(cls, m)
+            path = os.path.join(directory, "program.npz")
+            _, tsave = timed(compiled.save, path)
+            loaded, tload = timed(load, path)
+            row = {"model": name, "build": tbuild, "compile": tcompile,
+                   "save": tsave, "load": tload,
+                   "speedup": (tbuild + tcompile)/tload,
+                   "MB": os.path.getsize(path)/1e6}
+            if cls is CompiledGP:
+                row["cost diff"] = abs(loaded.resolve()["cost"]
+                                       / compiled.resolve()["cost"] - 1)
+            rows.append(row)
+    finally:
+        shutil.rmtree(directory)
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["model", "build", "compile", "save", "load",
+                        "speedup", "MB", "cost diff"]))
@@ -0,0 +1,56 @@
+" notebook import time with and without the compiled code cache "
+from __future__ import print_function
+import os
+import sys
+import json
+from shutil import rmtree
+from tempfile import mkdtemp
+import gpkitmodels
+from gpkitmodels.tools import ipynb2module
+from gpkitmodels.benchmarks.timing import timed, table
+
+XFOIL_BWB = os.path.join(os.path.dirname(gpkitmodels.__file__), "misc",
+                         "Raymer Weights", "Blended Wing-Body",
+                         "XFOIL_BWB.ipynb")
+
+def write_notebook(path, ncells):
+    " a notebook of ncells small code cells "
+    cells = [{"cell_type": "code", "execution_count": None, "metadata": {},
+              "outputs": [], "source": "x%d = %d\ny%d = [x%d*i for i in "
+                                       "range(10)]" % (i, i, i, i)}
+             for i in range(ncells)]
+    with open(path, "w") as f:
+        json.dump({"cells": cells, "metadata": {}, "nbformat": 4,
+                   "nbformat_minor": 2}, f)
+
+def load(path):
+    " import the notebook at path as a fresh module "
+    sys.modules.pop("bench_notebook", None)
+    return ipynb2module.NotebookLoader([os.path.dirname(path)]).load_module(
+        "bench_notebook")
+
+def run(ncells=(10, 100), repeat=5):
+    " cold (compiling) and cached import times [s] "
+    rows = []
+    tmp = mkdtemp()
+    for n in ncells:
+        path = os.path.join(tmp, "bench_notebook.ipynb")
+        write_notebook(path, n)
+        if os.path.exists(ipynb2module.cache_path(path)):
+            os.remove(ipynb2module.cache_path(path))
+        _, tcold = timed(load, path)
+        thit = min(timed(load, path)[1] for _ in range(repeat))
+        rows.append({"notebook": "%d cells" % n, "miss": tcold, "hit": thit})
+    rmtree(tmp)
+    # the BWB notebook needs its model to run, so only time its code
+    if os.path.exists(ipynb2module.cache_path(XFOIL_BWB)):
+        os.remove(ipynb2module.cache_path(XFOIL_BWB))
+    _, tcold = timed(ipynb2module.notebook_code, XFOIL_BWB)
+    thit = min(timed(ipynb2module.notebook_code, XFOIL_BWB)[1]
+               for _ in range(repeat))
+    rows.append({"notebook": "XFOIL_BWB (code only)", "miss": tcold,
+                 "hit": thit})
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["notebook", "miss", "hit"]))
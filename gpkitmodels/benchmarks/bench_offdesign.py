@@ -0,0 +1,53 @@
+" SimPleAC off-design evaluation vs full resizing benchmark "
+from __future__ import print_function
+from multiprocessing import Pool
+import numpy as np
+from gpkitmodels.SP.SimPleAC.SimPleAC_offdesign import (
+    OffDesign, fixed_values, mission_model, mission_substitutions, OUTPUTS)
+from gpkitmodels.benchmarks.timing import timed, table
+
+def missions(n, seed=0):
+    " n random missions around the SimPleAC_mission.test design point "
+    rng = np.random.RandomState(seed)
+    return [mission_substitutions(R, Wp, h) for R, Wp, h in zip(
+        rng.uniform(1000, 3000, n), rng.uniform(4000, 6250, n),
+        rng.uniform(3000, 5000, n))]
+
+def resize(subs):
+    """ build and solve a new design for one mission
+
+    Returns (outputs, None), or (None, message) if the solver fails.
+    """
+    m = mission_model(4)
+    m.substitutions.update(subs)
+    try:
+        sol = m.localsolve(verbosity=0)
+    # as in SimPleAC_offdesign._evaluate
+    except (RuntimeWarning, ValueError) as e:
+        return None, str(e)
+    return dict((name, sol["variables"][name]) for name in OUTPUTS), None
+
+def run(n=64, processes=4):
+    " time n missions flown off-design and resized, on the same pool size "
+    design = mission_model(4)
+    design.substitutions.update(mission_substitutions(3000, 6250, 5000))
+    sol = design.localsolve(verbosity=0)
+    batch = missions(n)
+
+    with OffDesign(fixed_values(design, sol), processes=processes) as od:
+        _, tstart = timed(od.evaluate, batch[:processes])
+        res, toff = timed(od.evaluate, batch)
+    pool = Pool(processes)
+    resized, tresize = timed(pool.map, resize, batch)
+    pool.close()
+    pool.join()
+    return [{"mode": "off-design", "missions": n, "total": toff,
+             "per mission": toff/n, "startup": tstart,
+             "failed": sum(r is None for r in res)},
+            {"mode": "resizing", "missions": n, "total": tresize,
+             "per mission": tresize/n,
+             "failed": sum(error is not None for _, error in resized)}]
+
+if __name__ == "__main__":
+    print(table(run(), ["mode", "missions", "total", "per mission",
+                        "startup", "failed"]))
@@ -0,0 +1,42 @@
+" size and time of sending built models to worker processes "
+from __future__ import print_function
+from multiprocessing import Pool
+from gpkitmodels.GP.aircraft.wing.wing import Wing
+from gpkitmodels.GP.aircraft.tail.empennage import Empennage
+from gpkitmodels.SP.SimPleAC.SimPleAC_mission import SimPleAC
+from gpkitmodels.tools.serialization import enable, dumps, loads
+from gpkitmodels.benchmarks.timing import timed, table
+
+def nvars(model):
+    " number of variables of model, computed in a worker "
+    return len(model.varkeys)
+
+def run(models=(("Wing(N=20)", lambda: Wing(N=20)),
+                ("Empennage(N=20)", lambda: Empennage(N=20)),
+                ("SimPleAC", SimPleAC))):
+    """ pickle size and time of each model, and its round trip to a worker
+
+    The round trip sends the model to a pool worker, which unpickles it
+    and returns its variable count.
+    """
+    enable()
+    rows = []
+    pool = Pool(1)
+    try:
+        for name, factory in models:
+            m, tbuild = timed(factory)
+            data, tdump = timed(dumps, m)
+            _, tload = timed(loads, data)
+            compressed = dumps(m, compress=True)
+            _, tsend = timed(pool.apply, nvars, (m,))
+            rows.append({"model": name, "build": tbuild, "dumps": tdump,
+                         "loads": tload, "kB": len(data)/1e3,
+                         "kB zlib": len(compressed)/1e3, "to worker": tsend})
+    finally:
+        pool.close()
+        pool.join()
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["model", "build", "dumps", "loads", "kB", "kB zlib",
+                        "to worker"]))
@@ -0,0 +1,32 @@
+" blade element propeller discretization benchmark "
+from __future__ import print_function
+from gpkit import units
+from gpkitmodels.GP.aircraft.prop.propeller import Propeller
+from gpkitmodels.SP.aircraft.prop.propeller import BladeElementProp
+from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+from gpkitmodels.benchmarks.timing import benchmark, table
+
+NS = [5, 10, 20, 50]
+
+def blade_element_prop(N):
+    " BladeElementProp with N radial stations, as in prop_test "
+    fs = FlightState()
+    p = Propeller(N=N)
+    pp = BladeElementProp(p, fs, N=N)
+    pp.substitutions[pp.T] = 100
+    pp.cost = (1./pp.eta + pp.Q/(1000.*units("N*m"))
+               + p.T_m/(1000*units("N")))
+    return pp
+
+def run(Ns=NS):
+    " benchmark build, solve and SP iterations for each discretization "
+    rows = []
+    for N in Ns:
+        res = benchmark(lambda: blade_element_prop(N), localsolve=True,
+                        iteration_limit=400)
+        res["N"] = N
+        rows.append(res)
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["N", "build", "solve", "iterations", "cost"]))
@@ -0,0 +1,41 @@
+" re-solving a compiled GP vs solving the model, over a weight sweep "
+from __future__ import print_function
+import numpy as np
+from gpkitmodels.tools.compiled import CompiledGP
+from gpkitmodels.benchmarks.bench_slim import gust_wing
+from gpkitmodels.benchmarks.timing import timed, table
+
+def run(points=1000, N=5):
+    """ time a `points` point sweep of the gust-loaded wing's weight
+
+    The model is solved after each change to its substitutions; the
+    compiled GP only recomputes its coefficients.
+    """
+    m, outputs, _ = gust_wing(N=N)
+    W = outputs[0]
+    weights = np.linspace(40, 80, points)
+
+    def solve_all():
+        costs = []
+        for w in weights:
+            m.substitutions[W] = w
+            costs.append(float(m.solve(verbosity=0)["cost"]))
+        return costs
+
+    def resolve_all():
+        return [cgp.resolve({W: w})["cost"] for w in weights]
+
+    cgp, tcompile = timed(CompiledGP, m)
+    solved, tsolve = timed(solve_all)
+    resolved, tresolve = timed(resolve_all)
+    diff = np.max(np.abs(np.array(resolved)/np.array(solved) - 1))
+    return [{"points": points, "compile": tcompile, "solve": tsolve,
+             "resolve": tresolve, "points/s solve": points/tsolve,
+             "points/s resolve": points/tresolve,
+             "speedup": tsolve/(tresolve + tcompile),
+             "max cost diff": float(diff)}]
+
+if __name__ == "__main__":
+    print(table(run(), ["points", "compile", "solve", "resolve",
+                        "points/s solve", "points/s resolve", "speedup",
+                        "max cost diff"]))
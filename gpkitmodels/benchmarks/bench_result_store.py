@@ -0,0 +1,51 @@
+" ResultStore vs pickled result dicts for a large synthetic sweep "
+from __future__ import print_function
+import os
+import pickle
+from shutil import rmtree
+from tempfile import mkdtemp
+import numpy as np
+from gpkitmodels.tools.result_store import ResultStore
+from gpkitmodels.benchmarks.timing import timed, table
+
+def results(nruns, ncols, seed=0):
+    " nruns result dicts of ncols scalar variables and sensitivities "
+    rng = np.random.RandomState(seed)
+    names = ["var:x%d" % i for i in range(ncols//2)]
+    names += ["sens:x%d" % i for i in range(ncols - ncols//2)]
+    data = rng.rand(nruns, ncols)
+    return [dict(zip(names, row)) for row in data]
+
+def write_store(path, rows, chunk):
+    " append rows in chunks, as workers would "
+    store = ResultStore(path)
+    for i in range(0, len(rows), chunk):
+        store.append_rows(rows[i:i+chunk])
+    return store
+
+def write_pickle(path, rows):
+    with open(path, "wb") as f:
+        pickle.dump(rows, f, 2)
+
+def read_pickle(path, name):
+    with open(path, "rb") as f:
+        return np.array([r[name] for r in pickle.load(f)])
+
+def run(nruns=100000, ncols=50, chunk=10000):
+    " time writing everything and reading back one column "
+    rows = results(nruns, ncols)
+    tmp = mkdtemp()
+    pkl = os.path.join(tmp, "results.pkl")
+    _, tpw = timed(write_pickle, pkl, rows)
+    _, tpr = timed(read_pickle, pkl, "var:x0")
+    store, tsw = timed(write_store, os.path.join(tmp, "store"), rows, chunk)
+    _, tsr = timed(lambda: np.asarray(store["var:x0"]))
+    _, tc = timed(store.compact)
+    _, tcr = timed(lambda: store["var:x0"].sum())
+    rmtree(tmp)
+    return [{"format": "pickle", "write": tpw, "read column": tpr},
+            {"format": "store", "write": tsw, "read column": tsr},
+            {"format": "compacted", "write": tc, "read column": tcr}]
+
+if __name__ == "__main__":
+    print(table(run(), ["format", "write", "read column"]))
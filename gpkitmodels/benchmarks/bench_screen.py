@@ -0,0 +1,79 @@
+" screening random designs with constraint slacks vs solving them "
+from __future__ import print_function
+import numpy as np
+from gpkit import units
+from gpkitmodels.SP.SimPleAC.SimPleAC import SimPleAC
+from gpkitmodels.tools.screen import Screener
+from gpkitmodels.benchmarks.bench_slim import gust_wing
+from gpkitmodels.benchmarks.timing import timed, table
+
+def simpleac():
+    " SimPleAC minimizing fuel weight, a signomial program "
+    m = SimPleAC()
+    m.cost = m["W_f"]
+    return m, True
+
+def wing():
+    " the gust-loaded wing, with its CapSpar, Planform and SparLoading "
+    m, _, _ = gust_wing(N=5)
+    return m, False
+
+def optimum(screener, sol):
+    " the design of sol: each free variable's value in its units "
+    design = {}
+    for j in screener.free:
+        vk = screener.varkeys[j]
+        value = sol["variables"][vk]
+        if hasattr(value, "to"):
+            value = value.to(vk.units or units("")).magnitude
+        design[vk] = float(value)
+    return design
+
+def perturbed(screener, sol, n, spread, least=1e-8, seed=0):
+    """ n designs scattering each free variable of sol by up to spread
+
+    Each design's scatter is log-uniform between factors of 1 + least
+    and spread, so the designs range from within the screen's tolerance
+    of the optimum, and feasible, to far enough from it that some tight
+    constraint is violated.
+    """
+    rng = np.random.RandomState(seed)
+    scatter = np.exp(rng.uniform(np.log(least), np.log(np.log(spread)), n))
+    return dict((vk, value*np.exp(scatter*rng.uniform(-1, 1, n)))
+                for vk, value in optimum(screener, sol).items())
+
+def run(n=100000, spread=1.05, factories=(simpleac, wing)):
+    """ screen n designs scattered around each model's optimum
+
+    Compared with the time of the single solve that found the optimum.
+    """
+    rows = []
+    for factory in factories:
+        m, localsolve = factory()
+        sol, tsolve = timed(m.localsolve if localsolve else m.solve,
+                            verbosity=0)
+        screener, tcompile = timed(Screener, m)
+        designs = perturbed(screener, sol, n, spread)
+        res, tscreen = timed(screener.screen, designs)
+        rows.append({"model": factory.__name__, "designs": n,
+                     "constraints": len(screener.constraints),
+                     "compile": tcompile, "screen": tscreen,
+                     "designs/s": n/tscreen, "one solve": tsolve,
+                     "feasible": float(res["feasible"].mean())})
+    return rows
+
+def test():
+    " the optimum screens feasible, a scaled-up design not, a scatter both "
+    m, _ = simpleac()
+    sol = m.localsolve(verbosity=0)
+    screener = Screener(m)
+    design = optimum(screener, sol)
+    assert screener.screen(design)["feasible"].all()
+    scaled = dict((vk, 2*value) for vk, value in design.items())
+    assert not screener.screen(scaled)["feasible"].any()
+    res = screener.screen(perturbed(screener, sol, 1000, 1.05))
+    assert 0 < res["feasible"].mean() < 1
+
+if __name__ == "__main__":
+    print(table(run(), ["model", "designs", "constraints", "compile",
+                        "screen", "designs/s", "one solve", "feasible"]))
@@ -0,0 +1,55 @@
+" time of returning solution arrays from workers by pipe and by shared memory "
+from __future__ import print_function
+from multiprocessing import Pool
+from gpkitmodels.tools.memprofile import wing, mission
+from gpkitmodels.tools.result_store import solution_columns
+from gpkitmodels.tools.shm import BlockPool, map_shared
+from gpkitmodels.benchmarks.timing import timed, table
+
+_COLUMNS = {}
+
+def columns(case):
+    """ every variable and sensitivity of a case's solution
+
+    Solved once per worker, when it starts, so that the timings below
+    are mostly of the transfer.
+    """
+    if case not in _COLUMNS:
+        factory, N = case
+        m, localsolve = factory(N)
+        sol = (m.localsolve if localsolve else m.solve)(verbosity=0)
+        _COLUMNS[case] = solution_columns(sol)[0]
+    return _COLUMNS[case]
+
+def by_pipe(case, njobs, processes):
+    " sum of the costs of njobs results sent through pipes "
+    pool = Pool(processes, columns, (case,))
+    try:
+        return sum(float(c["cost"]) for c in
+                   pool.imap_unordered(columns, [case]*njobs))
+    finally:
+        pool.terminate()
+        pool.join()
+
+def by_shm(case, njobs, processes):
+    " sum of the costs of njobs results returned in shared memory "
+    with BlockPool(nblocks=2*processes) as blocks:
+        return sum(float(c["cost"]) for _, c in
+                   map_shared(columns, [case]*njobs, blocks, processes,
+                              columns, (case,)))
+
+def run(cases=(("Wing(N=50)", (wing, 50)),
+               ("Mission(N=64)", (mission, 64))), njobs=2000, processes=4):
+    " time of njobs results of each case by each transfer "
+    rows = []
+    for name, case in cases:
+        nbytes = sum(a.nbytes for a in columns(case).values())
+        tpipe = timed(by_pipe, case, njobs, processes)[1]
+        tshm = timed(by_shm, case, njobs, processes)[1]
+        rows.append({"model": name, "kB/result": nbytes/1e3,
+                     "pipe": tpipe, "shm": tshm,
+                     "speedup": tpipe/tshm})
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["model", "kB/result", "pipe", "shm", "speedup"]))
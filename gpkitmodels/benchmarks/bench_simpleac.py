@@ -0,0 +1,16 @@
+" SimPleAC multimission build time benchmark "
+from __future__ import print_function
+from gpkitmodels.SP.SimPleAC.SimPleAC_mission import SimPleAC
+from gpkitmodels.SP.SimPleAC.SimPleAC_multimission import Multimission
+from gpkitmodels.benchmarks.timing import timed, table
+
+def run(Nmissions=(1, 10, 50), Nsegments=4):
+    " time building Multimission for each number of missions "
+    rows = []
+    for n in Nmissions:
+        _, t = timed(lambda: Multimission(SimPleAC(), n, Nsegments))
+        rows.append({"missions": n, "build": t, "per mission": t/n})
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["missions", "build", "per mission"]))
@@ -0,0 +1,71 @@
+" peak and retained memory of full vs slim solution extraction "
+from __future__ import print_function
+import gc
+from multiprocessing import Pool
+from gpkit import Model
+from gpkitmodels.GP.aircraft.wing.wing import Wing
+from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+from gpkitmodels.SP.SimPleAC.SimPleAC_offdesign import (
+    mission_model, mission_substitutions)
+from gpkitmodels.tools.slim import slim_solve
+from gpkitmodels.tools.memprofile import rss, peak_rss, reset_peak
+from gpkitmodels.benchmarks.timing import table
+
+def gust_wing(N=20):
+    " wing_test's gust-loaded wing with N sections "
+    W = Wing(N=N)
+    W.substitutions[W.W] = 50
+    W.substitutions[W.planform.tau] = 0.115
+    fs = FlightState()
+    perf = W.flight_model(W, fs)
+    gust = W.spar.gustloading(W, fs)
+    gust.substitutions["W"] = 100
+    m = Model(perf.Cd, [
+        gust.v == fs.V, gust.cl == perf.CL, gust.Ww == W.W,
+        gust.Ww <= 0.5*fs.rho*fs.V**2*perf.CL*W.planform.S,
+        W, fs, perf, gust])
+    return m, [W.W, W.planform.b, W.planform.S, perf.CL, perf.Cd], False
+
+def mission(N=20):
+    " SimPleAC flying N segments "
+    m = mission_model(N)
+    m.substitutions.update(mission_substitutions(3000, 6250, 5000))
+    return m, ["W_{f_m}", "t_m", "W", "S", "A"], True
+
+def measure(args):
+    """ memory [MB] at the peak of a solve and retained after `runs` solves
+
+    Run in a fresh process; only memory used after the model is built is
+    counted.
+    """
+    factory, slim, runs = args
+    m, outputs, sp = factory()
+    kept = []
+    gc.collect()
+    base = rss()
+    reset_peak()
+    for _ in range(runs):
+        if slim:
+            kept.append(slim_solve(m, outputs, localsolve=sp))
+        else:
+            kept.append((m.localsolve if sp else m.solve)(verbosity=0))
+    peak = peak_rss()
+    gc.collect()
+    return {"peak": peak - base, "retained/run": (rss() - base)/runs}
+
+def run(factories=(gust_wing, mission)):
+    " compare full solutions with slim_solve for each model "
+    rows = []
+    for factory in factories:
+        for slim in (False, True):
+            pool = Pool(1, maxtasksperchild=1)
+            row = pool.apply(measure, ((factory, slim, 3),))
+            pool.close()
+            pool.join()
+            row.update(model=factory.__name__,
+                       mode="slim" if slim else "full")
+            rows.append(row)
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["model", "mode", "peak", "retained/run"]))
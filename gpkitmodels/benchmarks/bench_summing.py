@@ -0,0 +1,37 @@
+" SummingConstraintSet scaling benchmark on a 20 component aircraft "
+from __future__ import print_function
+from gpkit import Variable
+from gpkitmodels.GP.aircraft.wing.wing import Wing
+from gpkitmodels.GP.aircraft.tail.empennage import Empennage
+from gpkitmodels.GP.aircraft.fuselage.elliptical_fuselage import Fuselage
+from gpkitmodels.GP.aircraft.motor.motor import Propulsor
+from gpkitmodels.GP.aircraft.engine.gas_engine import Engine
+from gpkitmodels.tools.summing_constraintset import SummingConstraintSet
+from gpkitmodels.benchmarks.timing import timed, table
+
+COMPONENTS = [Wing, Empennage, Fuselage, Propulsor, Engine]
+
+def components(n):
+    " n aircraft components, cycling through COMPONENTS "
+    return [COMPONENTS[i % len(COMPONENTS)]() for i in range(n)]
+
+def run(ns=(5, 10, 20)):
+    """ time summing component weights, with a cold and a warm index
+
+    The first SummingConstraintSet over new components builds each
+    component's index; later sums over the same components, e.g. one per
+    flight segment, reuse it.
+    """
+    rows = []
+    for n in ns:
+        comps, tbuild = timed(components, n)
+        W = Variable("W_{total}", "lbf", "total weight")
+        _, tcold = timed(SummingConstraintSet, W, "W", comps)
+        _, twarm = timed(SummingConstraintSet, W, "W", comps)
+        rows.append({"components": n, "build": tbuild, "cold": tcold,
+                     "warm": twarm, "warm/component": twarm/n})
+    return rows
+
+if __name__ == "__main__":
+    print(table(run(), ["components", "build", "cold", "warm",
+                        "warm/component"]))
@@ -0,0 +1,256 @@
+""" reference full-aircraft model for build, compile and solve benchmarks
+
+A small long-endurance aircraft composed from the library's components:
+Wing with a cap or box spar, its spar and gust loading, Empennage with
+tail boom bending, the elliptical Fuselage, and either a gas Engine with
+BreguetEndurance or an electric Propulsor with a battery, flown over
+Nsegments loiter segments.  Its size is set by the wing nodes, tail boom
+nodes and number of segments.
+"""
+from __future__ import print_function
+from gpkit import Model, Variable, Vectorize, parse_variables, units
+from gpkitmodels import g
+from gpkitmodels.GP.aircraft.wing.wing import Wing
+from gpkitmodels.GP.aircraft.wing.wing_test import (
+    FlightState as WingFlightState)
+from gpkitmodels.GP.aircraft.wing.capspar import CapSpar
+from gpkitmodels.GP.aircraft.wing.boxspar import BoxSpar
+from gpkitmodels.GP.aircraft.tail.empennage import Empennage
+from gpkitmodels.GP.aircraft.fuselage.elliptical_fuselage import Fuselage
+from gpkitmodels.GP.aircraft.engine.gas_engine import Engine
+from gpkitmodels.GP.aircraft.motor.motor import Propulsor
+from gpkitmodels.GP.aircraft.mission.breguet_endurance import BreguetEndurance
+from gpkitmodels.benchmarks.timing import timed, table
+
+#pylint: disable=exec-used, undefined-variable, invalid-name, no-member
+#pylint: disable=attribute-defined-outside-init, too-many-locals
+
+SPARS = {"cap": CapSpar, "box": BoxSpar}
+
+class FlightState(WingFlightState):
+    """ Flight State, with the altitude the gas engine's power lapse needs
+
+    Variables
+    ---------
+    h           15000   [ft]         altitude
+
+    """
+    def setup(self):
+        exec parse_variables(FlightState.__doc__)
+
+        return WingFlightState.setup(self)
+
+class Aircraft(Model):
+    """ Reference Aircraft
+
+    Variables
+    ---------
+    W                   [lbf]       zero fuel weight
+    Wpay        10      [lbf]       payload weight
+    Volpay      0.5     [ft^3]      payload volume
+
+    """
+    def setup(self, Nwing=5, Ntail=5, spar="cap", propulsion="gas"):
+        exec parse_variables(Aircraft.__doc__)
+
+        default, Wing.sparModel = Wing.sparModel, SPARS[spar]
+        try:
+            self.wing = Wing(N=Nwing)
+        finally:
+            Wing.sparModel = default
+        self.emp = Empennage(N=Ntail)
+        self.fuselage = Fuselage()
+        self.propulsion = propulsion
+        if propulsion == "gas":
+            self.engine = Engine()
+            Wengine = self.engine["W"]
+        else:
+            self.engine = Propulsor()
+            Wengine = self.engine.W
+        self.components = [self.wing, self.emp, self.fuselage, self.engine]
+
+        self.wing.substitutions[self.wing.planform.tau] = 0.115
+        htail, vtail = self.emp.htail, self.emp.vtail
+        self.emp.substitutions.update({
+            htail.planform.AR: 4, vtail.planform.AR: 4,
+            htail.planform.tau: 0.08, vtail.planform.tau: 0.08,
+            vtail.Vv: 0.04, htail.Vh: 0.4, htail.mh: 0.01})
+
+        Sw = self.wing.planform.S
+        constraints = [
+            W >= (self.wing.W + self.emp.W + self.fuselage.W + Wengine
+                  + Wpay),
+            vtail.lv == self.emp.tailboom.l, htail.lh == self.emp.tailboom.l,
+            htail.Vh <= htail.planform.S*htail.lh/Sw/self.wing.planform.cmac,
+            vtail.Vv <= vtail.planform.S*vtail.lv/Sw/self.wing.planform.b,
+            ]
+
+        return self.components, constraints
+
+    def flight_model(self, state):
+        " performance of this aircraft in state "
+        return AircraftPerf(self, state)
+
+class AircraftPerf(Model):
+    """ Reference Aircraft Performance
+
+    Variables
+    ---------
+    CD                  [-]         total drag coefficient
+    D                   [lbf]       total drag
+    mfac        1.05    [-]         drag margin factor
+    etaprop     0.8     [-]         propulsive efficiency (gas engine)
+
+    """
+    def setup(self, static, state):
+        exec parse_variables(AircraftPerf.__doc__)
+
+        self.Wstart = Variable("W_{start}", "lbf", "segment start weight")
+        self.Wend = Variable("W_{end}", "lbf", "segment end weight")
+
+        self.wing = static.wing.flight_model(static.wing, state)
+        emp = static.emp
+        self.htail = emp.htail.flight_model(emp.htail, state)
+        self.vtail = emp.vtail.flight_model(emp.vtail, state)
+        self.tailboom = emp.tailboom.flight_model(emp.tailboom, state)
+        self.fuselage = static.fuselage.flight_model(static.fuselage, state)
+        if static.propulsion == "gas":
+            self.engine = static.engine.flight_model(state)
+            thrust = [self.engine["P_{shaft}"] >= D*state.V/etaprop]
+        else:
+            self.engine = static.engine.flight_model(static.engine, state)
+            thrust = [self.engine.prop.T >= D]
+        self.components = [self.wing, self.htail, self.vtail, self.tailboom,
+                           self.fuselage, self.engine]
+
+        Sw = static.wing.planform.S
+        q = 0.5*state.rho*state.V**2
+        constraints = [
+            CD/mfac >= (self.wing.Cd + (
+                self.htail.Cd*emp.htail.planform.S
+                + self.vtail.Cd*emp.vtail.planform.S
+                + self.tailboom.Cf*emp.tailboom.S
+                + self.fuselage.Cd*static.fuselage.S)/Sw),
+            D >= q*CD*Sw,
+            (self.Wstart*self.Wend)**0.5 <= q*self.wing.CL*Sw,
+            ] + thrust
+
+        return self.components, constraints
+
+class ReferenceMission(Model):
+    """ Reference Mission, minimizing takeoff weight
+
+    Variables
+    ---------
+    Wmtow               [lbf]       max takeoff weight
+    Wfuel               [lbf]       total fuel weight (gas engine)
+    tloiter     3       [days]      loiter endurance (gas engine)
+    tbatt       6       [hr]        loiter endurance (electric)
+    E                   [kJ]        battery energy (electric)
+    hbatt       350     [W*hr/kg]   battery specific energy (electric)
+    Wbatt               [lbf]       battery weight (electric)
+
+    """
+    def setup(self, Nwing=5, Ntail=5, Nsegments=4, spar="cap",
+              propulsion="gas"):
+        exec parse_variables(ReferenceMission.__doc__)
+
+        self.aircraft = aircraft = Aircraft(Nwing, Ntail, spar, propulsion)
+        wing, emp = aircraft.wing, aircraft.emp
+
+        with Vectorize(Nsegments):
+            self.fs = fs = FlightState()
+            self.perf = perf = aircraft.flight_model(fs)
+            if propulsion == "gas":
+                self.breguet = BreguetEndurance(perf)
+                segments = [self.breguet]
+            else:
+                t = Variable("t", "days", "time per flight segment")
+                segments = []
+
+        # loads at the sizing condition
+        self.sizing = sizing = FlightState()
+        for state in [fs, sizing]:  # loiter at altitude
+            state.substitutions.update({state.V: 25, state.rho: 0.77})
+        self.loading = wing.spar.loading(wing, sizing)
+        self.gust = gust = wing.spar.gustloading(wing, sizing)
+        self.hbend = emp.tailboom.tailLoad(emp.tailboom, emp.htail, sizing)
+        self.vbend = emp.tailboom.tailLoad(emp.tailboom, emp.vtail, sizing)
+        loads = [self.loading, gust, self.hbend, self.vbend]
+
+        constraints = [
+            self.loading.W >= Wmtow, gust.W >= Wmtow, gust.Ww == wing.W,
+            gust.v == sizing.V, gust.cl == perf.wing.CL[0],
+            Wmtow >= perf.Wstart[0],
+            ]
+        if Nsegments > 1:
+            constraints += [perf.Wend[:-1] >= perf.Wstart[1:]]
+        if propulsion == "gas":
+            constraints += [
+                perf.Wend[-1] >= aircraft.W,
+                Wfuel >= self.breguet["W_{fuel}"].sum(),
+                aircraft.fuselage.Vol >= (aircraft.Volpay
+                                          + Wfuel/aircraft.fuselage.rhofuel),
+                self.breguet["t"] >= tloiter/Nsegments]
+        else:
+            constraints += [
+                perf.Wstart >= Wmtow, perf.Wend >= Wmtow,
+                Wmtow >= aircraft.W + Wbatt,
+                Wbatt >= E/hbatt*g, t >= tbatt/Nsegments,
+                E >= (perf.engine.motor.Pelec*t).sum(),
+                aircraft.fuselage.Vol >= aircraft.Volpay]
+
+        self.cost = Wmtow/units("lbf")
+
+        return aircraft, fs, perf, segments, sizing, loads, constraints
+
+def reference_mission(Nwing=5, Ntail=5, Nsegments=4, spar="cap",
+                      propulsion="gas"):
+    """ the ReferenceMission, built
+
+    With cvxopt the beams' tip and root boundary values are raised, as in
+    wing_test and tail_tests, for it to converge.
+    """
+    from gpkit import settings
+    m = ReferenceMission(Nwing, Ntail, Nsegments, spar, propulsion)
+    if settings["default_solver"] == "cvxopt":
+        for l in [m.loading, m.gust]:
+            for v in ["Mtip", "Stip", "wroot", "throot"]:
+                m.substitutions[l[v]] = 1e-1
+        for l in [m.hbend, m.vbend]:
+            for v in ["\\bar{M}_{tip}", "\\bar{\\delta}_{root}",
+                      "\\theta_{root}"]:
+                m.substitutions[l[v]] = 1e-3
+    return m
+
+SIZES = [(5, 5, 4), (10, 10, 8), (20, 20, 16), (40, 40, 32)]
+
+def run(sizes=SIZES, spar="cap", propulsion="gas"):
+    """ build, compile (GP generation) and solve times for each size
+
+    sizes are (wing nodes, tail boom nodes, segments).
+    """
+    rows = []
+    for Nwing, Ntail, Nsegments in sizes:
+        m, tbuild = timed(reference_mission, Nwing, Ntail, Nsegments, spar,
+                          propulsion)
+        gp, tcompile = timed(m.gp)
+        sol, tsolve = timed(m.solve, verbosity=0)
+        rows.append({"wing N": Nwing, "tail N": Ntail,
+                     "segments": Nsegments, "build": tbuild,
+                     "compile": tcompile, "solve": tsolve,
+                     "monomials": len(gp.cs), "cost": float(sol["cost"])})
+    return rows
+
+def test():
+    " build and solve the smallest mission with each propulsion option "
+    for propulsion in ["gas", "electric"]:
+        m = reference_mission(3, 3, 2, propulsion=propulsion)
+        assert m.sizing.qne.key in m.varkeys
+        assert m.substitutions[m.sizing.V] == 25
+        sol = m.solve(verbosity=0)
+        assert sol["cost"] > m.substitutions[m.aircraft.Wpay]
+
+if __name__ == "__main__":
+    print(table(run(), ["wing N", "tail N", "segments", "build", "compile",
+                        "solve", "monomials", "cost"]))
@@ -0,0 +1,286 @@
+""" benchmark regression tracking against a rolling baseline of past commits
+
+    python -m gpkitmodels.benchmarks.regress [--save] [--repeat 3]
+        [--window 10] [--trend] [MODEL ...]
+
+Each shipped model is built and solved in a fresh process, recording build
+and solve time [s], SP iterations and memory grown [MB].  Runs are saved
+per commit as .benchmarks/runs/<commit>.json.  A run is compared with the
+median of the last `window` saved commits, and a metric regresses when it
+exceeds that median by more than the larger of a multiple of the
+baseline's spread (median absolute deviation), a relative tolerance and an
+absolute floor, so that timer noise on small models does not fail it.  A
+model whose build or solve raises is reported as failed.  The exit status
+is the number of regressions and failed models.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import argparse
+import subprocess
+from time import time
+from multiprocessing import Pool
+import numpy as np
+from gpkitmodels.benchmarks.timing import timed, sp_iterations, table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+RUNS = os.path.join(ROOT, ".benchmarks", "runs")
+METRICS = ["build", "solve", "iterations", "memory"]
+# (relative tolerance, absolute floor) under which changes count as noise
+TOLERANCE = {"build": (0.1, 0.05), "solve": (0.1, 0.05),
+             "iterations": (0., 0.5), "memory": (0.1, 5.)}
+
+# models, each returning (model, localsolve); imports are deferred so that
+# each process only loads its own model's modules
+
+def wing():
+    " the gust- and spar-loaded Wing(N=5) "
+    from gpkitmodels.tools.memprofile import wing as loaded_wing
+    return loaded_wing(5)
+
+def empennage():
+    " the Empennage with tail boom bending, as tail_tests' test_emp "
+    from gpkitmodels.tools.memprofile import tailboom
+    return tailboom(5)
+
+def propulsor():
+    " motor_test's Propulsor_Test "
+    from gpkitmodels.GP.aircraft.motor.motor_test import Propulsor_Test
+    return Propulsor_Test(), False
+
+def simpleac():
+    " SimPleAC, minimizing fuel weight "
+    from gpkitmodels.SP.SimPleAC.SimPleAC import SimPleAC
+    m = SimPleAC()
+    m.cost = m["W_f"]
+    return m, True
+
+def mission():
+    " SimPleAC_mission's test mission "
+    from gpkitmodels.tools.memprofile import mission as missions
+    return missions(4)
+
+def multimission():
+    " SimPleAC_multimission's two-mission test "
+    from gpkit import units
+    from gpkitmodels.SP.SimPleAC.SimPleAC_mission import SimPleAC
+    from gpkitmodels.SP.SimPleAC.SimPleAC_multimission import Multimission
+    m = Multimission(SimPleAC(), 2, 4)
+    m.substitutions.update({
+        "h_{cruise_{mm}}": [5000*units("m"), 5000*units("m")],
+        "Range_{mm}": [3000*units("km"), 2000*units("km")],
+        "W_{p_{mm}}": [6250*units("N"), 8000*units("N")],
+        "C_{mm}": [120*units("1/hr"), 360*units("1/hr")]})
+    m.cost = (m.missions[0]["W_{f_m}"]*units("1/N")
+              + m.missions[1]["C_m"]*m.missions[1]["t_m"])
+    return m, True
+
+def reference():
+    " reference_aircraft's smallest gas powered ReferenceMission "
+    from gpkitmodels.benchmarks.reference_aircraft import reference_mission
+    return reference_mission(3, 3, 2), False
+
+MODELS = dict((f.__name__, f) for f in [wing, empennage, propulsor,
+                                         simpleac, mission, multimission,
+                                         reference])
+
+def measure(name):
+    " build and solve MODELS[name] once, in this process "
+    from gpkitmodels.tools.memprofile import rss, peak_rss, reset_peak
+    base = rss()
+    reset_peak()
+    (m, localsolve), tbuild = timed(MODELS[name])
+    _, tsolve = timed(m.localsolve if localsolve else m.solve, verbosity=0)
+    return {"build": tbuild, "solve": tsolve,
+            "iterations": sp_iterations(m), "memory": peak_rss() - base}
+
+def run(names, repeat=3):
+    """ the best of `repeat` fresh-process measurements of each model
+
+    Returns {model: {metric: value}}, each metric at its minimum, or
+    {model: {"error": message}} if any measurement raised.
+    """
+    results = {}
+    for name in names:
+        samples = []
+        for _ in range(repeat):
+            pool = Pool(1, maxtasksperchild=1)
+            try:
+                samples.append(pool.apply(measure, (name,)))
+            except Exception as e:  #pylint: disable=broad-except
+                results[name] = {"error": "%s: %s" % (type(e).__name__, e)}
+                break
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results[name] = dict((k, min(s[k] for s in samples))
+                                 for k in METRICS)
+    return results
+
+def failed(results):
+    " {model: error message} of the models of results that failed "
+    return dict((model, res["error"]) for model, res in results.items()
+                if "error" in res)
+
+def commit():
+    " short hash of HEAD, suffixed -dirty if tracked files are changed "
+    def git(*args):
+        return subprocess.check_output(("git",) + args, cwd=ROOT).decode()
+    try:
+        sha = git("rev-parse", "--short", "HEAD").strip()
+        dirty = git("status", "--porcelain", "--untracked-files=no").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return sha + ("-dirty" if dirty else "")
+
+def save(results, sha, directory=RUNS):
+    " add results to the runs saved for commit sha "
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    path = os.path.join(directory, sha + ".json")
+    runs = load_commit(path)
+    runs.append({"time": time(), "results": results})
+    tmp = "%s.%d" % (path, os.getpid())
+    with open(tmp, "w") as f:
+        json.dump(runs, f, indent=1, sort_keys=True)
+    os.rename(tmp, path)
+
+def load_commit(path):
+    " runs saved in the file at path, or [] "
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return []
+
+def history(directory=RUNS):
+    """ saved (commit, time, results) of each commit, oldest first
+
+    A commit's results are its latest run's.
+    """
+    out = []
+    if os.path.isdir(directory):
+        for fname in os.listdir(directory):
+            if fname.endswith(".json"):
+                runs = load_commit(os.path.join(directory, fname))
+                if runs:
+                    out.append((fname[:-5], runs[-1]["time"],
+                                runs[-1]["results"]))
+    return sorted(out, key=lambda h: h[1])
+
+def baseline(hist, model, metric, window=10, exclude=None):
+    " (median, median absolute deviation) of the last `window` commits "
+    values = [res[model][metric] for sha, _, res in hist
+              if sha != exclude and metric in res.get(model, {})][-window:]
+    if not values:
+        return None
+    values = np.array(values, dtype=float)
+    median = np.median(values)
+    return median, np.median(np.abs(values - median))
+
+def regressions(results, hist, window=10, exclude=None, spread=3.):
+    """ metrics of results beyond the noise of their baseline
+
+    A metric regresses when it exceeds the baseline median by more than
+    the largest of spread*1.4826*MAD (about `spread` standard deviations
+    for normal noise) and the metric's TOLERANCE.  Returns
+    {(model, metric): (baseline median, value)}.
+    """
+    out = {}
+    for model, res in results.items():
+        if "error" in res:
+            continue
+        for metric in METRICS:
+            base = baseline(hist, model, metric, window, exclude)
+            if base is None:
+                continue
+            median, mad = base
+            rel, floor = TOLERANCE[metric]
+            allowed = max(spread*1.4826*mad, rel*median, floor)
+            if res[metric] > median + allowed:
+                out[(model, metric)] = (median, res[metric])
+    return out
+
+def trend(hist, model, last=10):
+    " text table of a model's metrics over the last saved commits "
+    rows = [dict(res[model], commit=sha) for sha, _, res in hist[-last:]
+            if model in res and "error" not in res[model]]
+    return "%s\n%s" % (model, table(rows, ["commit"] + METRICS))
+
+def report(results, regressed, hist, window=10, exclude=None):
+    " text table of results against their baseline medians "
+    lines = ["%-14s %-10s %10s %10s %8s" % ("model", "metric", "baseline",
+                                             "now", "")]
+    for model in sorted(results):
+        if "error" in results[model]:
+            lines.append("%-14s FAILED %s" % (
+                model, results[model]["error"].splitlines()[0]))
+            continue
+        for metric in METRICS:
+            base = baseline(hist, model, metric, window, exclude)
+            lines.append("%-14s %-10s %10s %10.4g %8s" % (
+                model, metric, "%.4g" % base[0] if base else "-",
+                results[model][metric],
+                "REGRESSED" if (model, metric) in regressed else ""))
+    return "\n".join(lines)
+
+def main(argv=None):
+    """ command line entry point
+
+    Returns the number of regressions and failed models.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("models", nargs="*",
+                        help="of %s, default all" % ", ".join(sorted(MODELS)))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--window", type=int, default=10,
+                        help="number of past commits in the baseline")
+    parser.add_argument("--save", action="store_true",
+                        help="save this run under the current commit")
+    parser.add_argument("--trend", action="store_true",
+                        help="only print each model's saved history")
+    parser.add_argument("--runs", default=RUNS)
+    args = parser.parse_args(argv)
+    names = args.models or sorted(MODELS)
+    unknown = set(names) - set(MODELS)
+    if unknown:
+        parser.error("unknown models: %s" % ", ".join(sorted(unknown)))
+    hist = history(args.runs)
+    if args.trend:
+        for name in names:
+            print(trend(hist, name, args.window))
+            print()
+        return 0
+
+    sha = commit()
+    results = run(names, args.repeat)
+    regressed = regressions(results, hist, args.window, exclude=sha)
+    print(report(results, regressed, hist, args.window, exclude=sha))
+    if args.save:
+        save(results, sha, args.runs)
+    return len(regressed) + len(failed(results))
+
+def test():
+    " a run with a failing model, saved and compared with itself "
+    import shutil
+    from tempfile import mkdtemp
+    runs = mkdtemp()
+    MODELS["broken"] = lambda: 1/0  # measured in forked processes
+    try:
+        argv = ["simpleac", "broken", "--repeat", "1", "--runs", runs]
+        assert main(argv + ["--save"]) == 1
+        (_, _, results), = history(runs)
+        assert list(failed(results)) == ["broken"]
+        assert failed(results)["broken"].startswith("ZeroDivisionError")
+        assert results["simpleac"]["iterations"] > 0
+        assert not regressions(results, history(runs))
+        assert main(argv) == 1
+    finally:
+        del MODELS["broken"]
+        shutil.rmtree(runs)
+
+if __name__ == "__main__":
+    sys.exit(main())
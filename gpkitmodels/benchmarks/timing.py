@@ -0,0 +1,52 @@
+" timing helpers shared by the benchmark scripts "
+from time import time
+
+def timed(fn, *args, **kwargs):
+    " call fn and return its result and the elapsed wall time in seconds "
+    start = time()
+    out = fn(*args, **kwargs)
+    return out, time() - start
+
+def sp_iterations(model):
+    " number of GPs solved by the last solve of model (1 for a pure GP) "
+    return len(getattr(model.program, "gps", [None]))
+
+def benchmark(factory, localsolve=False, repeat=1, **solveargs):
+    """ build and solve a model, returning the best of `repeat` timings
+
+    Arguments
+    ---------
+    factory : callable
+        returns a built model with its cost set
+    localsolve : bool
+        solve as a signomial program
+
+    Returns
+    -------
+    dict with build and solve times [s], SP iteration count and the cost
+    """
+    solveargs.setdefault("verbosity", 0)
+    best = None
+    for _ in range(repeat):
+        m, tbuild = timed(factory)
+        solve = m.localsolve if localsolve else m.solve
+        sol, tsolve = timed(solve, **solveargs)
+        res = {"build": tbuild, "solve": tsolve,
+               "iterations": sp_iterations(m), "cost": float(sol["cost"])}
+        if best is None or res["build"] + res["solve"] < (best["build"]
+                                                         + best["solve"]):
+            best = res
+    return best
+
+def table(rows, columns):
+    " format a list of result dicts as a fixed width text table "
+    widths = [max(len(c), 10) for c in columns]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    for r in rows:
+        cells = []
+        for c, w in zip(columns, widths):
+            v = r.get(c, "")
+            cells.append(("%.4g" % v if isinstance(v, float) else
+                          str(v)).rjust(w))
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
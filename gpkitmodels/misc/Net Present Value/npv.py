@@ -1,3 +1,5 @@
 "get the python code from the markdown file"
-from gpkit.tools import mdparse
-exec mdparse("npv.md")
+import os
+from gpkitmodels.tools.mdcache import mdexec
+mdexec(os.path.join(os.path.dirname(os.path.abspath(__file__)), "README.md"),
+       globals())
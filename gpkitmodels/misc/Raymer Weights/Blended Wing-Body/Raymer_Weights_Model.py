@@ -365,9 +365,7 @@ objective = W_maximum_gross
 
 m=Model(objective, constraints)
 
-sol=m.solve()
-
-Weights_pie(sol)
-
-
+if __name__ == "__main__":
+    sol=m.solve()
 
+    Weights_pie(sol)
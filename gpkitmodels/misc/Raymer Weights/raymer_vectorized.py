@@ -0,0 +1,416 @@
+# Vectorized evaluation of the Raymer weight equations in Raymer_Exact.py and
+# Blended Wing-Body/Raymer_Weights_Model.py, for screening many configurations
+# without building a model per configuration.  Every input may be an array;
+# all inputs are broadcast together and are magnitudes in the units declared
+# in the gpkit models.
+
+import os
+import ast
+import numpy as np
+
+# The first 12 Euler numbers, for the secant expansion
+E2N = [1, 5, 61, 1385, 50521, 2702765, 199360981, 19391512145,
+       2404879675441, 370371188237525, 69348874393137901,
+       15514534163557086905]
+
+# The first 15 Bernoulli numbers, for the tangent expansion
+B2N = [1/6., -1/30., 1/42., -1/30., 5/66., -691/2730., 7/6., -3617/510.,
+       43867/798., -174611/330., 854513/138., -236364091/2730.,
+       8553103/6., -23749461029/870., 8615841276005/14322.]
+
+def secant_coeffs(nterm):
+    """ coefficients of x**(2i), i = 0..nterm, of the secant expansion
+
+    Same series as secant in Raymer_Weights_Model.py, including its
+    asymptotic Euler numbers past the first 12.
+    """
+    if nterm < 1:
+        raise ValueError("Unexpected number of terms, nterm=%s" % nterm)
+    E2n = [float(e) for e in E2N]
+    for n in range(13, nterm + 1):
+        E2n.append(8*np.sqrt(n/np.pi)*(4*n/(np.pi*np.exp(1)))**(2*n))
+    coeffs = [1.]
+    factorial_denom = 1.
+    for i in range(1, nterm + 1):
+        factorial_denom *= (2*i)*(2*i - 1)
+        coeffs.append(E2n[i-1]/factorial_denom)
+    return np.array(coeffs)
+
+def tangent_coeffs(nterm):
+    " coefficients of x**(2i-1), i = 1..nterm, of the tangent expansion "
+    if nterm < 1:
+        raise ValueError("Unexpected number of terms, nterm=%s" % nterm)
+    if nterm > 15:
+        raise ValueError("Tangent expansion not implemented above 15 terms")
+    coeffs = []
+    factorial_denom = 1.
+    for i in range(1, nterm + 1):
+        factorial_denom *= (2*i)*(2*i - 1)
+        coeffs.append((-1)**(i-1)*2**(2*i)*(2**(2*i) - 1)*B2N[i-1]
+                      /factorial_denom)
+    return np.array(coeffs)
+
+def secant(x, nterm=6):
+    " nterm Taylor expansion of sec(x) for an array x "
+    x2 = np.asarray(x, dtype=float)**2
+    return np.polyval(secant_coeffs(nterm)[::-1], x2)
+
+def tangent(x, nterm=6):
+    " nterm Taylor expansion of tan(x) for an array x "
+    x = np.asarray(x, dtype=float)
+    return x*np.polyval(tangent_coeffs(nterm)[::-1], x**2)
+
+def _inputs(inputs, defaults, required):
+    " broadcast inputs, filled in from defaults "
+    missing = set(required) - set(inputs)
+    if missing:
+        raise KeyError("missing inputs: %s" % ", ".join(sorted(missing)))
+    unknown = set(inputs) - set(required) - set(defaults)
+    if unknown:
+        raise KeyError("unknown inputs: %s" % ", ".join(sorted(unknown)))
+    values = dict(defaults)
+    values.update(inputs)
+    keys = sorted(values)
+    arrays = np.broadcast_arrays(*[np.asarray(values[k], dtype=float)
+                                   for k in keys])
+    return dict(zip(keys, arrays))
+
+# Raymer_Exact.py: the class factors default to their "1.0 otherwise" values
+EXACT_DEFAULTS = {"Ht_Hv": 0., "K_door": 1., "KLg": 1., "Kmp": 1., "Kng": 1.,
+                  "Knp": 1., "Kp": 1., "Kr": 1., "Ktp": 1., "Ktr": 1.,
+                  "Kuht": 1.}
+EXACT_INPUTS = ["Aw", "Ah", "Av", "Bh", "Bw", "D", "Fw", "Iy", "Ky", "Kz", "L",
+                "La", "Lec", "Lf", "Lm", "Ln", "Lt", "Nc", "Nen", "Nf", "Ngen",
+                "NLt", "Nl", "Nm", "Nmss", "Nmw", "Nnw", "Np", "Nt", "Nw",
+                "Nz", "Rkva", "Scs", "Scsw", "Se", "Sf", "S_floor", "Sht",
+                "Sn", "Svt", "Sw", "t_c_root_w", "t_c_root_v", "Vi", "Vp",
+                "Vpr", "V_stall", "Vt", "W_APU_uninstalled", "Wc", "Wdg",
+                "Wen", "Wl", "Wuav", "Lambda_w", "Lambda_ht", "Lambda_vt",
+                "lambda_w"]
+
+def raymer_exact(nterm=6, taylor=True, **inputs):
+    """ component weights [lbf] of Raymer_Exact.py for arrays of inputs
+
+    Inputs are named as the Variables of Raymer_Exact.py (Aw, Bw, L, Nz,
+    Sw, ...).  Its undefined names are read as Ktp (turboprop instrument
+    factor), Nnw (number of nose wheels), Lec (engine to cockpit length)
+    and Wen (engine weight).  The sweep terms use the nterm secant and
+    tangent expansions, or the exact functions if taylor is False.
+
+    Returns a dict of arrays keyed by the weight Variable names, with their
+    sum as "W_{components}".
+    """
+    x = _inputs(inputs, EXACT_DEFAULTS, EXACT_INPUTS)
+    sec = (lambda a: secant(a, nterm)) if taylor else (lambda a: 1/np.cos(a))
+    tan = (lambda a: tangent(a, nterm)) if taylor else np.tan
+    Kws = (0.75*(1 + 2*x["lambda_w"])/(1 + x["lambda_w"])*x["Bw"]
+           *tan(x["Lambda_w"])/x["L"])
+    Wec = 2.331*x["Wen"]**0.901*x["Kp"]*x["Ktr"]
+    W = {
+        "W_{wing}": (0.0051*(x["Wdg"]*x["Nz"])**0.557*x["Sw"]**0.649
+                     *x["Aw"]**0.5*x["t_c_root_w"]**-0.4
+                     *(1 + x["lambda_w"])**0.1*sec(x["Lambda_w"])
+                     *x["Scsw"]**0.1),
+        "W_{horizontal-tail}": (0.0379*x["Kuht"]*(1 + x["Fw"]/x["Bh"])**-0.25
+                                *x["Wdg"]**0.639*x["Nz"]**0.1
+                                *x["Sht"]**0.75/x["Lt"]*x["Ky"]**0.704
+                                *sec(x["Lambda_ht"])*x["Ah"]**0.166
+                                *(1 + x["Se"]/x["Sht"])**0.1),
+        "W_{vertical-tail}": (0.0026*(1 + x["Ht_Hv"])**0.225*x["Wdg"]**0.556
+                              *x["Nz"]**0.536*x["Lt"]**-0.5*x["Svt"]**0.5
+                              *x["Kz"]**0.875*sec(x["Lambda_vt"])
+                              *x["Av"]**0.35*x["t_c_root_v"]**-0.5),
+        "W_{fuselage}": (0.3280*x["K_door"]*x["KLg"]*(x["Wdg"]*x["Nz"])**0.5
+                         *x["L"]**0.25*x["Sf"]**0.302*(1 + Kws)**0.04
+                         *(x["L"]/x["D"])**0.10),
+        "W_{main-gear}": (0.0106*x["Kmp"]*x["Wl"]**0.888*x["Nl"]**0.25
+                          *x["Lm"]**0.4*x["Nmw"]**0.321*x["Nmss"]**-0.5
+                          *x["V_stall"]**0.1),
+        "W_{nose-gear}": (0.032*x["Knp"]*x["Wl"]**0.646*x["Nl"]**0.2
+                          *x["Ln"]**0.5*x["Nnw"]**0.45),
+        "W_{nacelle}": (0.6724*x["Kng"]*x["NLt"]**0.10*x["Nw"]**0.294
+                        *x["Nz"]**0.119*Wec**0.611*x["Nen"]**0.984
+                        *x["Sn"]**0.224),
+        "W_{engine-controls}": 5.0*x["Nen"] + 0.80*x["Lec"],
+        "W_{starter_{penumatic}}": 49.19*(x["Nen"]*x["Wen"]/1000.)**0.541,
+        "W_{fuel-system}": (2.405*x["Vt"]**0.606/(1 + x["Vi"]/x["Vt"])
+                            *(1 + x["Vp"]/x["Vt"])*x["Nt"]**0.5),
+        "W_{flight-controls}": (145.9*x["Nf"]**0.554/(1 + x["Nm"]/x["Nf"])
+                                *x["Scs"]**0.20*(x["Iy"]*1e-6)**0.07),
+        "W_{APU_{installed}}": 2.2*x["W_APU_uninstalled"],
+        "W_{instruments}": (4.509*x["Kr"]*x["Ktp"]*x["Nc"]**0.541*x["Nen"]
+                            *(x["Lf"] + x["Bw"])**0.5),
+        "W_{hydraulics}": 0.2673*x["Nf"]*(x["Lf"] + x["Bw"])**0.937,
+        "W_{electrical}": (7.291*x["Rkva"]**0.782*x["La"]**0.346
+                           *x["Ngen"]**0.10),
+        "W_{avionics}": 1.73*x["Wuav"]**0.983,
+        "W_{furnishings}": (0.0577*x["Nc"]**0.1*x["Wc"]**0.393
+                            *x["Sf"]**0.75),
+        "W_{air-conditioning}": (62.36*x["Np"]**0.25*(x["Vpr"]/1000.)**0.604
+                                 *x["Wuav"]**0.01),
+        "W_{handling-gear}": 0.002*x["Wdg"],
+        "W_{anti-ice}": 0.0003*x["Wdg"],
+        "W_{military-cargo-system}": 2.4*x["S_floor"],
+    }
+    W["W_{components}"] = sum(W.values())
+    return W
+
+# Blended Wing-Body/Raymer_Weights_Model.py fixed values
+BWB_DEFAULTS = {"Bref": 6.25, "Kieg": 0.575, "Kmp": 1.0, "Kng": 1.107,
+                "Knp": 1.0, "Kp": 1.0, "Ktr": 1.18, "Kw": 1.7e-3,
+                "Nc": 15., "Nen": 2., "Nf": 7., "Ngen": 2., "Nl": 4.5,
+                "Nmss": 2., "Nmw": 8., "Nnw": 2., "Np": 450., "Nt": 2.,
+                "Nz": 2.5, "Rkva": 50., "R": 8000., "V_stall": 120.,
+                "chord": 15.0, "W_APU_uninstalled": 2000., "Wc": 450*210.,
+                "Wen": 12000., "Wuav": 1400.}
+# inputs by the names of the Raymer_Weights_Model.py Variables
+BWB_NAMES = {"W_maximum_gross": "W_{maximum-gross}",
+             "W_landing_gross": "W_{landing_gross}", "Bw": "B_{w}",
+             "La": "L_{a}", "Lec": "L_{ec}", "Lf": "L_{f}", "Lm": "L_{m}",
+             "Ln": "L_{n}", "NLt": "N_{Lt}", "Nw": "N_{w}",
+             "Saft": "S_{aft}", "Scab": "S_{cab}", "Sn": "S_{n}",
+             "Sw": "S_{w}", "tau_w": "\\tau_w", "Vpr": "V_{pr}",
+             "Vt": "V_{t}", "lambda_aft": "\\lambda_{aft}"}
+
+# a representative Blended Wing-Body design, by the names of BWB_NAMES
+BWB_POINT = {"W_maximum_gross": 8e5, "Bw": 150., "La": 100., "Lec": 200.,
+             "Lf": 150., "Lm": 100., "Ln": 80., "NLt": 20., "Nw": 10.,
+             "Saft": 3000., "Scab": 8000., "Sn": 400., "Sw": 9000.,
+             "tau_w": 0.12, "Vpr": 5e4, "Vt": 2e4, "lambda_aft": 0.3}
+
+def raymer_bwb(newton_steps=8, **inputs):
+    """ component weights [lbf] of Raymer_Weights_Model.py for arrays of inputs
+
+    Inputs are named as in BWB_NAMES and BWB_DEFAULTS; W_landing_gross
+    defaults to 0.7*W_maximum_gross.  The instruments weight depends on
+    the operating empty weight, which is found with vectorized Newton
+    steps.
+
+    Returns a dict of arrays keyed by the weight Variable names, including
+    "W_{operating-empty}" (with Nen*Wen of engines).
+    """
+    if "W_maximum_gross" in inputs:
+        inputs.setdefault("W_landing_gross", 0.7*np.asarray(
+            inputs["W_maximum_gross"], dtype=float))
+    x = _inputs(inputs, BWB_DEFAULTS, BWB_NAMES)
+    Wmg = x["W_maximum_gross"]
+    Wec = 2.331*x["Wen"]**0.901*x["Kp"]*x["Ktr"]
+    W = {
+        "W_{centerbody}": 5.698865*0.316422*Wmg**0.166552*x["Scab"]**1.061158,
+        "W_{afterbody}": ((1.0 + 0.05*x["Nen"])*0.53*x["Saft"]*Wmg**0.2
+                          *(x["lambda_aft"] + 0.5)),
+        "W_{wing}": (Wmg*x["Kw"]*x["Bw"]**0.75*(1 + (x["Bref"]/x["Bw"])**0.5)
+                     *x["Nz"]**0.55*(x["Bw"]/(x["tau_w"]*x["chord"]))**0.3
+                     *(Wmg/(x["Sw"]*.2))**-0.3),
+        "W_{vertical-tail}": 12000.*np.ones_like(Wmg),
+        "W_{main-gear}": (0.0106*x["Kmp"]*x["W_landing_gross"]**0.888
+                          *x["Nl"]**0.25*x["Lm"]**0.4*x["Nmw"]**0.321
+                          *x["Nmss"]**-0.5*x["V_stall"]**0.1),
+        "W_{nose-gear}": (0.032*x["Knp"]*x["W_landing_gross"]**0.646
+                          *x["Nl"]**0.2*x["Ln"]**0.5*x["Nnw"]**0.45),
+        "W_{engine-contents}": Wec,
+        "W_{nacelle}": (0.6724*x["Kng"]*x["NLt"]**0.10*x["Nw"]**0.294
+                        *x["Nz"]**0.119*Wec**0.611*x["Nen"]**0.984
+                        *x["Sn"]**0.224),
+        "W_{engine-controls}": 5.0*x["Nen"] + 0.80*x["Lec"],
+        "W_{starter-penumatic}": 49.19*(x["Nen"]*x["Wen"]/1000.)**0.541,
+        "W_{fuel-system}": 2.405*(x["Vt"]*7.48052)**0.606*x["Nt"]**0.5,
+        "W_{flight-controls}": 0.005*Wmg,
+        "W_{APU_{installed}}": 2.2*x["W_APU_uninstalled"],
+        "W_{hydraulics}": 0.2673*x["Nf"]*(x["Lf"] + x["Bw"]),
+        "W_{electrical}": (7.291*x["Rkva"]**0.782*x["La"]**0.346
+                           *x["Ngen"]**0.10),
+        "W_{avionics}": 1.73*x["Wuav"]**0.983,
+        "W_{furnishings}": (0.0577*x["Nc"]**0.1*x["Wc"]**0.393
+                            *x["Scab"]**0.75),
+        "W_{air-conditioning}": (62.36*x["Np"]**0.25*(x["Vpr"]/1000.)**0.604
+                                 *x["Wuav"]**0.01),
+        "W_{handling-gear}": 0.002*Wmg,
+        "W_{anti-ice}": 0.0003*Wmg,
+        "W_{military-cargo-system}": 2.4*x["Scab"],
+    }
+    # OEW = rest + a*OEW**0.555, with the instruments weight a*OEW**0.555
+    rest = sum(W.values()) + x["Nen"]*x["Wen"]
+    a = x["Kieg"]*x["R"]**0.25
+    oew = rest.copy()
+    for _ in range(newton_steps):
+        f = oew - rest - a*oew**0.555
+        oew = oew - f/(1 - 0.555*a*oew**-0.445)
+    W["W_{instruments}"] = a*oew**0.555
+    W["W_{operating-empty}"] = oew
+    return W
+
+def _formulation(path):
+    """ Variables and weight constraints of a gpkit weights model file
+
+    The file is parsed rather than run, as Raymer_Exact.py is not a GP
+    compatible model.  Returns {python name: (Variable name, value, units)},
+    value None for free Variables, and the (python name, expression) of
+    each constraint of its first constraints list, in order.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    env = {"np": np}
+    variables = {}
+    constraints = None
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)):
+            continue
+        target, value = node.targets[0].id, node.value
+        if isinstance(value, ast.Num):
+            env[target] = value.n
+        elif (isinstance(value, ast.Call) and isinstance(value.func, ast.Name)
+              and value.func.id == "Variable"):
+            args = value.args
+            if isinstance(args[1], ast.Str):
+                variables[target] = (args[0].s, None, args[1].s)
+            else:
+                variables[target] = (args[0].s, _eval(args[1], path, env),
+                                     args[2].s)
+        elif target == "constraints" and constraints is None:
+            constraints = [(elt.left.id, elt.comparators[0])
+                           for elt in value.elts]
+    return variables, constraints
+
+def _eval(node, path, namespace):
+    " value of the expression node of the file at path "
+    return eval(compile(ast.Expression(node), path, "eval"), namespace)
+
+def _weights(path, inputs, units=None, aliases=None, functions=None):
+    """ {Variable name: value} of the weight constraints of a gpkit file
+
+    inputs are pint quantities (plain numbers if dimensionless) keyed by
+    the file's python names, converted to the units the file declares;
+    units gives those of names the file uses without declaring them.
+    Fixed Variables keep their values from the file.  aliases binds names
+    the file uses to inputs, and functions its secant and tangent.  Each
+    constraint is evaluated in order and binds its left hand side, as
+    later constraints use Kws and the engine contents weight.
+    """
+    from gpkit import ureg
+    variables, constraints = _formulation(path)
+    units = dict(units or {})
+    units.update((k, v[2]) for k, v in variables.items())
+    namespace = dict((k, v[1]) for k, v in variables.items()
+                     if v[1] is not None)
+    for k, q in inputs.items():
+        namespace[k] = (float(q) if units[k] == "-"
+                        else q.to(ureg(units[k])).magnitude)
+    namespace.update((alias, namespace[k])
+                     for alias, k in (aliases or {}).items())
+    namespace.update(functions or {})
+    weights = {}
+    for lhs, rhs in constraints:
+        namespace[lhs] = _eval(rhs, path, namespace)
+        weights[variables[lhs][0]] = namespace[lhs]
+    return weights, namespace
+
+def test():
+    """ check the evaluators against the gpkit formulations
+
+    The Taylor expansions are checked against gpkit's te_secant and
+    te_tangent, used by Raymer_Exact.py.  raymer_exact and raymer_bwb are
+    checked weight by weight against the constraints of Raymer_Exact.py
+    and Raymer_Weights_Model.py, evaluated at the same inputs in the units
+    those files declare.  Importing Raymer_Weights_Model.py disables gpkit
+    units for the process, so it is also solved with a gpkit that still
+    has disable_units, where every weight constraint is tight.
+    """
+    from runpy import run_path
+    import gpkit
+    from gpkit import Variable, ureg
+    from gpkit.tools.tools import te_secant, te_tangent
+
+    x = Variable("x")
+    sweeps = np.linspace(0, 0.6, 7)
+    for nterm in [1, 6, 13]:
+        sec = te_secant(x, nterm)
+        ref = [sum(c*s**exp.get(x.key, 0)
+                   for c, exp in zip(sec.cs, sec.exps)) for s in sweeps]
+        assert np.allclose(secant(sweeps, nterm), ref)
+    for nterm in [1, 6, 15]:
+        tan = te_tangent(x, nterm)
+        ref = [sum(c*s**exp.get(x.key, 0)
+                   for c, exp in zip(tan.cs, tan.exps)) for s in sweeps]
+        assert np.allclose(tangent(sweeps, nterm), ref)
+    assert np.allclose(secant(sweeps), 1/np.cos(sweeps), rtol=1e-4)
+
+    # a narrow-body transport, in units other than Raymer_Exact.py's
+    q = ureg.Quantity
+    point = {"Aw": 9.4, "Ah": 5.0, "Av": 1.8, "Bh": q(14., "m"),
+             "Bw": q(35.8, "m"), "D": q(3.8, "m"), "Fw": q(1.5, "m"),
+             "Iy": q(1.3e6, "kg*m^2"), "Ky": q(5., "m"), "Kz": q(16., "m"),
+             "L": q(36., "m"), "La": q(20., "m"), "Lec": q(25., "m"),
+             "Lf": q(39.5, "m"), "Lm": q(2.3, "m"), "Ln": q(1.8, "m"),
+             "Lt": q(17., "m"), "Nc": 6., "Nen": 2., "Nf": 6., "Ngen": 2.,
+             "NLt": q(4., "m"), "Nl": 4.5, "Nm": 1., "Nmss": 2., "Nmw": 4.,
+             "Nnw": 2., "Np": 180., "Nt": 3., "Nw": q(2., "m"), "Nz": 3.75,
+             "Rkva": q(50e3, "V*A"), "Scs": q(60., "m^2"),
+             "Scsw": q(40., "m^2"), "Se": q(8., "m^2"), "Sf": q(400., "m^2"),
+             "S_floor": q(80., "m^2"), "Sht": q(32., "m^2"),
+             "Sn": q(25., "m^2"), "Svt": q(26., "m^2"), "Sw": q(125., "m^2"),
+             "t_c_root_w": 0.15, "t_c_root_v": 0.12, "Vi": q(2.4e4, "l"),
+             "Vp": q(2e3, "l"), "Vpr": q(350., "m^3"),
+             "V_stall": q(130., "knot"), "Vt": q(2.6e4, "l"),
+             "W_APU_uninstalled": q(300., "kg"), "Wc": q(5e3, "kg"),
+             "Wdg": q(7.9e4, "kg"), "Wen": q(2.4e3, "kg"),
+             "Wl": q(6.6e4, "kg"), "Wuav": 1200., "Lambda_w": 0.436,
+             "Lambda_ht": 0.52, "Lambda_vt": 0.61, "lambda_w": 0.28,
+             "Ht_Hv": 0., "K_door": 1.06, "KLg": 1.12, "Kmp": 1.,
+             "Kng": 1.107, "Knp": 1., "Kp": 1., "Kr": 1., "Ktp": 1.,
+             "Ktr": 1.18, "Kuht": 1.}
+    # the names Raymer_Exact.py uses without declaring them
+    undeclared = {"Ktp": "-", "Lec": "ft", "Nnw": "-", "Wen": "lb"}
+    aliases = {"t_c_root_vt": "t_c_root_v", "W_en": "Wen", "K_p": "Kp",
+               "K_tr": "Ktr"}
+    ref, namespace = _weights(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                     "Raymer_Exact.py"), point, undeclared, aliases,
+        {"secant": te_secant, "tangent": lambda x, nterm=6: te_tangent(x,
+                                                                      nterm)})
+    W = raymer_exact(**dict((k, namespace[k]) for k in point))
+    assert set(W) - set(ref) == set(["W_{components}"])
+    for name, value in W.items():
+        if name in ref:
+            assert abs(value/ref[name] - 1) < 1e-9, name
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "Blended Wing-Body", "Raymer_Weights_Model.py")
+    variables, _ = _formulation(path)
+    for k, value in BWB_DEFAULTS.items():
+        assert variables[k][1] == value, k
+    if hasattr(gpkit, "disable_units"):
+        sol = run_path(path)["m"].solve(verbosity=0)
+        inputs = dict((k, sol["variables"][name])
+                      for k, name in BWB_NAMES.items())
+        W = raymer_bwb(**inputs)
+        for name, value in W.items():
+            assert abs(value/sol["variables"][name] - 1) < 1e-3, name
+    else:
+        inputs = BWB_POINT
+        W = raymer_bwb(**inputs)
+    parts = sum(v for k, v in W.items() if k != "W_{operating-empty}")
+    oew = parts + BWB_DEFAULTS["Nen"]*BWB_DEFAULTS["Wen"]
+    assert abs(W["W_{operating-empty}"]/oew - 1) < 1e-9
+    # W_landing_gross and W_operating_empty as raymer_bwb found them
+    W = raymer_bwb(**BWB_POINT)
+    bwb = dict((k, v if variables[k][2] == "-"
+                else ureg.Quantity(v, variables[k][2]))
+               for k, v in BWB_POINT.items())
+    bwb["W_landing_gross"] = 0.7*bwb["W_maximum_gross"]
+    bwb["W_operating_empty"] = ureg.Quantity(
+        float(W["W_{operating-empty}"]), "lbf")
+    ref, _ = _weights(path, bwb)
+    assert set(W) - set(ref) == set(["W_{operating-empty}"])
+    for name, value in W.items():
+        if name in ref:
+            assert abs(value/ref[name] - 1) < 1e-9, name
+
+    # 1000 configurations at once, scaled around the optimum
+    scale = np.linspace(0.8, 1.2, 1000)
+    W = raymer_bwb(**dict((k, v*scale) for k, v in inputs.items()))
+    assert W["W_{operating-empty}"].shape == (1000,)
+
+if __name__ == "__main__":
+    test()
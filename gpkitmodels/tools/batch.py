@@ -0,0 +1,199 @@
+""" solve many independent GPs as one block-diagonal program
+
+    from gpkitmodels.tools.batch import batch_solve, sweep_programs
+    results = batch_solve(sweep_programs(model, [{"W": 50}, {"W": 60}]))
+
+The GPs are stacked into one program, each instance keeping its own
+variables (columns) and constraints (rows), with the sum of their costs
+as cost.  As nothing couples the instances, its optimum is each
+instance's optimum, found with one solver call instead of one each.  An
+instance's duals in the stacked program are its own scaled by its share
+of the summed cost, so they are divided by that share when split out.
+If the stacked program fails, it is bisected until the instances that
+fail on their own are isolated; those get None.
+"""
+import numpy as np
+
+def solver_function(solver=None):
+    " solver function for the solver name (or function), as gpkit's "
+    from gpkit import settings
+    if solver is None:
+        solver = settings["default_solver"]
+    if hasattr(solver, "__call__"):
+        return solver
+    if solver == "cvxopt":
+        from gpkit._cvxopt import cvxoptimize
+        return cvxoptimize
+    if solver == "mosek_cli":
+        from gpkit._mosek import cli_expopt
+        return cli_expopt.imize_fn()
+    if solver == "mosek":
+        from gpkit._mosek import expopt
+        return expopt.imize
+    raise ValueError("unknown solver %r" % solver)
+
+class Stack(object):
+    """ several GPs' monomials, stacked block-diagonally
+
+    Monomials are ordered with every instance's cost monomials first, as
+    the summed cost, then each instance's constraint monomials in turn.
+
+    Attributes
+    ----------
+    cs, A, k, p_idxs : the stacked program, as a GeometricProgram's
+    rows : list of arrays, each instance's monomials in the stack
+    cols : list of slices, each instance's variables in the stack
+    posys : list of arrays, each instance's constraints in the stack
+    """
+    def __init__(self, gps):
+        from gpkit.small_classes import CootMatrix
+        cost = [np.flatnonzero(gp.p_idxs == 0) for gp in gps]
+        ncost = sum(len(c) for c in cost)
+        self.rows, self.cols, self.posys = [], [], []
+        rows, cols, data, k = [], [], [], [ncost]
+        cstart, mstart, col = 0, ncost, 0
+        for gp, head in zip(gps, cost):
+            nmon, nvar = len(gp.cs), len(gp.varlocs)
+            newrow = np.empty(nmon, dtype=int)
+            newrow[head] = cstart + np.arange(len(head))
+            tail = np.flatnonzero(gp.p_idxs != 0)
+            newrow[tail] = mstart + np.arange(len(tail))
+            cstart += len(head)
+            mstart += len(tail)
+            self.rows.append(newrow)
+            self.cols.append(slice(col, col + nvar))
+            self.posys.append(len(k) - 1 + np.arange(1, len(gp.k)))
+            rows.append(newrow[np.asarray(gp.A.row, dtype=int)])
+            cols.append(col + np.asarray(gp.A.col, dtype=int))
+            data.append(np.asarray(gp.A.data, dtype=float))
+            k.extend(gp.k[1:])
+            col += nvar
+        cs = np.empty(mstart)
+        for gp, newrow in zip(gps, self.rows):
+            cs[newrow] = gp.cs
+        self.gps = gps
+        self.cs = cs
+        self.k = k
+        self.p_idxs = np.repeat(np.arange(len(k)), k)
+        self.A = CootMatrix(np.concatenate(rows).tolist(),
+                            np.concatenate(cols).tolist(),
+                            np.concatenate(data).tolist())
+
+    def monomials(self, primal):
+        " value of each stacked monomial at the log-space point primal "
+        logs = np.zeros(len(self.cs))
+        np.add.at(logs, np.asarray(self.A.row),
+                  np.asarray(self.A.data)*primal[np.asarray(self.A.col)])
+        return self.cs*np.exp(logs)
+
+    def split(self, solver_out):
+        " each instance's solver output, from the stacked solver_out "
+        primal = np.ravel(solver_out["primal"])
+        values = self.monomials(primal)
+        total = values[:self.k[0]].sum()
+        outs = []
+        for i, gp in enumerate(self.gps):
+            rows = self.rows[i]
+            cost = values[rows[gp.p_idxs == 0]].sum()
+            share = cost/total
+            out = {"status": solver_out["status"],
+                   "primal": primal[self.cols[i]], "objective": cost}
+            if "nu" in solver_out:
+                out["nu"] = np.ravel(solver_out["nu"])[rows]/share
+            if "la" in solver_out:
+                la = np.ravel(solver_out["la"])
+                if len(la) == len(self.k) - 1:
+                    la = np.hstack([[1.], la])  # without the cost's
+                out["la"] = np.hstack([[1.], la[self.posys[i]]/share])
+            outs.append(out)
+        return outs
+
+    def solve(self, solver=None):
+        " the stacked program's solver output "
+        return solver_function(solver)(c=self.cs, A=self.A,
+                                       p_idxs=self.p_idxs, k=self.k)
+
+def _solve(gps, solver):
+    " solver outputs of gps, None for failing ones, bisecting on failure "
+    stack = Stack(gps)
+    try:
+        out = stack.solve(solver)
+        ok = out.get("status") == "optimal"
+    except Exception:  #pylint: disable=broad-except
+        ok = False
+    if ok:
+        return stack.split(out)
+    if len(gps) == 1:
+        return [None]
+    half = len(gps)//2
+    return _solve(gps[:half], solver) + _solve(gps[half:], solver)
+
+def batch_solve(gps, solver=None, size=None):
+    """ solve independent GeometricPrograms together
+
+    Arguments
+    ---------
+    gps : list of GeometricProgram
+        e.g. from model.gp() or sweep_programs
+    solver : str or function
+        as for Model.solve
+    size : int
+        maximum number of programs stacked together, default all
+
+    Returns
+    -------
+    list with each program's result, as its own solve would give, or None
+    for programs without an optimal solution
+    """
+    size = size or len(gps) or 1
+    results = []
+    for start in range(0, len(gps), size):
+        chunk = gps[start:start+size]
+        for gp, out in zip(chunk, _solve(chunk, solver)):
+            #pylint: disable=protected-access
+            results.append(None if out is None else gp._compile_result(out))
+    return results
+
+def sweep_programs(model, substitutions):
+    """ model's GeometricProgram for each dict of substitutions
+
+    model.substitutions is restored afterwards.
+    """
+    saved = dict(model.substitutions)
+    gps = []
+    try:
+        for subs in substitutions:
+            model.substitutions.update(subs)
+            gps.append(model.gp())
+            model.substitutions.clear()
+            model.substitutions.update(saved)
+    finally:
+        model.substitutions.clear()
+        model.substitutions.update(saved)
+    return gps
+
+def test():
+    " a fuselage sweep with an infeasible instance, batched and serial "
+    from gpkit import Model, Variable
+    from gpkitmodels.GP.aircraft.fuselage.elliptical_fuselage import Fuselage
+    from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+    f = Fuselage()
+    fs = FlightState()
+    faero = f.flight_model(f, fs)
+    Wmax = Variable("W_{max}", 100, "lbf", "maximum fuselage weight")
+    m = Model(f.W*faero.Cd, [f, fs, faero, f.W <= Wmax])
+    subs = [{f.Vol: 1.}, {f.Vol: 2., fs.V: 40}, {f.Vol: 1., Wmax: 1e-3},
+            {f.Vol: 3.}]
+    gps = sweep_programs(m, subs)
+    assert m.substitutions[Wmax] == 100
+    results = batch_solve(gps)
+    assert results[2] is None
+    for gp, res in zip(gps, results):
+        if res is None:
+            continue
+        sol = gp.solve(verbosity=0)
+        assert abs(res["cost"]/sol["cost"] - 1) < 1e-5
+        sens = sol["sensitivities"]["constants"]
+        for key, value in res["sensitivities"]["constants"].items():
+            assert abs(value - sens[key]) < 1e-5, key
+    assert batch_solve(gps, size=2)[1]["cost"] == results[1]["cost"]
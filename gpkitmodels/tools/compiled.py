@@ -0,0 +1,524 @@
+""" a model's GP compiled once, re-solved for new constants
+
+    from gpkitmodels.tools.compiled import CompiledGP
+    cgp = CompiledGP(m)
+    costs = [cgp.resolve({"W": W})["cost"] for W in range(40, 60)]
+
+The cost and posynomial constraints of a model are compiled, with their
+substitutions left out, into one sparse exponent matrix over all of its
+variables, free and fixed.  For any constants q the program given to the
+solver is then
+
+    log c_i' = log c_i + sum_j E_ij log q_j     (fixed columns j)
+    A_i = E_i                                   (free columns)
+
+so a new set of substitutions only changes the coefficient vector, and
+no constraint tree is walked or nomial built again.  Linked constants
+(substitutions that are functions, like Planform.return_c) are evaluated
+again for each set of substitutions, and differentiated with the ad
+package where it is installed, so that, as in gpkit, their sensitivities
+are carried over to the constants they are computed from.  Signomial
+programs are not supported, as their GP approximation changes every
+iteration.
+"""
+import json
+import numpy as np
+from .batch import solver_function
+from .result_store import unitstr
+from .varindex import STRING_TYPES
+
+def _magnitude(value, units):
+    " value as a float array in units "
+    if hasattr(value, "to"):
+        value = value.to(units).magnitude if units else value.magnitude
+    return np.asarray(value, dtype=float)
+
+def _unitstr(vk):
+    " units of vk as a string "
+    if vk.units is None or isinstance(vk.units, STRING_TYPES):
+        return vk.units or ""
+    return unitstr(vk.units)
+
+def _linked(fn, subs, kdc):
+    """ (value, {key: d log value / d log key}) of a linked constant
+
+    kdc holds subs as ad numbers, or is None without the ad package; the
+    gradients are empty then, or if fn cannot be differentiated.  Raises
+    KeyError if fn needs a constant not yet in subs.
+    """
+    if kdc is not None:
+        kdc.logged_gets = set()
+        try:
+            out = fn(kdc)
+            value = out.x
+            grads = {}
+            for key in kdc.logged_gets:
+                inputs = kdc[key]
+                if getattr(key, "shape", None):
+                    dv = np.array(out.gradient(list(np.ravel(inputs))))
+                    x = np.array([i.x for i in np.ravel(inputs)])
+                    grads[key] = (dv*x/value).reshape(np.shape(inputs))
+                else:
+                    grads[key] = out.d(inputs)*inputs.x/value
+            return float(value), grads
+        except Exception:  #pylint: disable=broad-except
+            pass
+    return fn(subs), {}
+
+def _ad_keydict(subs):
+    " subs as a KeyDict of ad numbers logging its gets, or None without ad "
+    try:
+        from ad import adnumber
+    except ImportError:
+        return None
+    from gpkit.keydict import KeyDict
+    from gpkit.small_scripts import maybe_flatten
+    kdc = KeyDict()
+    for k, v in subs.items():
+        try:
+            kdc[k] = adnumber(maybe_flatten(v))
+        except NotImplementedError:  # linked, added once evaluated
+            continue
+    kdc.log_gets = True
+    return kdc
+
+class SavedKey(object):
+    """ a VarKey as loaded from a saved program
+
+    Has a VarKey's name, units (as a string), veckey and idx, and prints as
+    the VarKey did.
+    """
+    def __init__(self, name, label, units="", veckey=None, idx=None):
+        self.name = name
+        self.label = label
+        self.units = units or None
+        self.veckey = veckey
+        self.idx = idx
+
+    def __str__(self):
+        return self.label
+
+    __repr__ = __str__
+
+class CompiledGP(object):
+    """ a GP with its constants as parameters of its coefficients
+
+    Arguments
+    ---------
+    model : Model
+        a geometric program, with its cost set
+
+    Attributes
+    ----------
+    varkeys : list of VarKey
+        one per column of the exponent matrix
+    fixed : bool array
+        which varkeys are substituted
+    cs, p_idxs : arrays
+        coefficient and posynomial (0 for the cost) of each monomial
+    rows, cols, exps : arrays
+        the exponent matrix's nonzeros
+    values : float array
+        each fixed varkey's value in its units, NaN for free ones
+    gradients : list
+        (linked constant, {key: d log value / d log key}) at values, in
+        the order they were evaluated
+    """
+    def __init__(self, model):
+        from gpkit.small_scripts import mag
+        posys = [model.cost] + list(model.as_posyslt1())
+        if any(mag(c) < 0 for p in posys for c in p.cs):
+            raise ValueError("CompiledGP takes geometric programs only")
+        self._compile(posys, model)
+
+    def _compile(self, posys, model):
+        " fill the arrays from posys, with model's substitutions "
+        from gpkit.small_scripts import mag
+        from gpkit.keydict import KeyDict
+        from gpkit.nomials import parse_subs
+        varkeys, column = [], {}
+        cs, p_idxs, rows, cols, exps = [], [], [], [], []
+        for i, p in enumerate(posys):
+            for exp, c in zip(p.exps, p.cs):
+                for vk, x in exp.items():
+                    if vk not in column:
+                        column[vk] = len(varkeys)
+                        varkeys.append(vk)
+                    rows.append(len(cs))
+                    cols.append(column[vk])
+                    exps.append(x)
+                cs.append(mag(c))
+                p_idxs.append(i)
+        self.varkeys = varkeys
+        self.column = column
+        self.cs = np.array(cs, dtype=float)
+        self.p_idxs = np.array(p_idxs, dtype=int)
+        self.rows = np.array(rows, dtype=int)
+        self.cols = np.array(cols, dtype=int)
+        self.exps = np.array(exps, dtype=float)
+        self.substitutions = KeyDict(model.substitutions)
+        # linked constants by VarKey, with vectors' by element, as gpkit's
+        self.linked = parse_subs(model.varkeys, model.substitutions)[2]
+        self.fixed = np.array([vk in model.substitutions for vk in varkeys])
+        self.gradients = []
+        self.values = self.constants(gradients=self.gradients)
+        self._structure()
+
+    kind = "gp"
+
+    def save(self, path):
+        """ write the compiled program to the .npz file at path
+
+        The exponent matrix, coefficients, variable names and units and
+        the constants' values (linked ones as evaluated) are saved as
+        arrays, so load(path) needs no model.
+        """
+        veckeys, vecindex, vec, idx = [], {}, [], []
+        for vk in self.varkeys:
+            v = getattr(vk, "veckey", None)
+            if v is None:
+                vec.append(-1)
+                idx.append("")
+            else:
+                if v not in vecindex:
+                    vecindex[v] = len(veckeys)
+                    veckeys.append(v)
+                vec.append(vecindex[v])
+                idx.append(json.dumps([int(i) for i in vk.idx]))
+        arrays = {"kind": np.array(self.kind),
+                  "cs": self.cs, "p_idxs": self.p_idxs, "rows": self.rows,
+                  "cols": self.cols, "exps": self.exps, "fixed": self.fixed,
+                  "values": self.values,
+                  "names": np.array([vk.name for vk in self.varkeys]),
+                  "labels": np.array([str(vk) for vk in self.varkeys]),
+                  "units": np.array([_unitstr(vk) for vk in self.varkeys]),
+                  "vec": np.array(vec, dtype=int), "idx": np.array(idx),
+                  "vecnames": np.array([v.name for v in veckeys] or [""]),
+                  "veclabels": np.array([str(v) for v in veckeys] or [""]),
+                  "vecunits": np.array([_unitstr(v) for v in veckeys]
+                                       or [""])}
+        arrays.update(self._saved())
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    def _saved(self):
+        " further arrays to save, for subclasses "
+        return {}
+
+    def _load(self, data):
+        " set up from the arrays of a saved program "
+        veckeys = [SavedKey(str(n), str(l), str(u)) for n, l, u in
+                   zip(data["vecnames"], data["veclabels"], data["vecunits"])]
+        self.varkeys = [
+            SavedKey(str(n), str(l), str(u), veckeys[v] if v >= 0 else None,
+                     tuple(json.loads(str(i))) if v >= 0 else None)
+            for n, l, u, v, i in zip(data["names"], data["labels"],
+                                     data["units"], data["vec"], data["idx"])]
+        self.column = dict((vk, j) for j, vk in enumerate(self.varkeys))
+        for name in ["cs", "p_idxs", "rows", "cols", "exps", "fixed",
+                     "values"]:
+            setattr(self, name, data[name])
+        self.substitutions = None
+        self.linked = {}
+        self.gradients = []
+        self._structure()
+
+    def _structure(self):
+        " index arrays derived from the compiled arrays "
+        self.nposys = int(self.p_idxs.max()) + 1
+        self.elements = {}
+        for j, vk in enumerate(self.varkeys):
+            if getattr(vk, "veckey", None) is not None:
+                self.elements.setdefault(vk.veckey, []).append(j)
+        self.free = np.flatnonzero(~self.fixed)
+        freecol = -np.ones(len(self.varkeys), dtype=int)
+        freecol[self.free] = np.arange(len(self.free))
+        onfree = ~self.fixed[self.cols]
+        self._A = (self.rows[onfree], freecol[self.cols[onfree]],
+                   self.exps[onfree])
+        self._P = (self.rows[~onfree], self.cols[~onfree],
+                   self.exps[~onfree])
+        # posynomials without free variables only check the constants
+        hasfree = np.zeros(self.nposys, dtype=bool)
+        hasfree[self.p_idxs[self._A[0]]] = True
+        self.active = hasfree[self.p_idxs]
+        self.checks = np.flatnonzero(~hasfree)
+
+    def key(self, key):
+        " the compiled VarKey (or vector VarKey) key, a name or variable "
+        if hasattr(key, "key"):
+            key = key.key
+        if not isinstance(key, STRING_TYPES):
+            return key
+        matches = set(vk.veckey or vk for vk in self.varkeys
+                      if key in (vk.name, str(vk)))
+        if len(matches) != 1:
+            raise KeyError("%r matches %d variables" % (key, len(matches)))
+        return matches.pop()
+
+    def constants(self, substitutions=None, gradients=None):
+        """ values of the fixed varkeys with substitutions applied
+
+        Returns a float array over varkeys, NaN where free.  If gradients
+        is a list, the (key, log gradients) of each linked constant
+        evaluated are appended to it.
+        """
+        if substitutions is not None and not self.linked:
+            values = self.values.copy()
+            for key, value in substitutions.items():
+                self._assign(values, self.key(key), value)
+            return values
+        subs = self.substitutions
+        if substitutions or (substitutions is None and self.linked):
+            from gpkit.keydict import KeyDict
+            subs = KeyDict(self.substitutions)
+            given = dict((self.key(k), v)
+                         for k, v in (substitutions or {}).items())
+            for key in given:  # a KeyDict cannot overwrite linked vectors
+                if key in subs and key.shape and key.veckey is None:
+                    del subs[key]
+            subs.update(given)
+            pending = dict((k, fn) for k, fn in self.linked.items()
+                           if k not in given
+                           and getattr(k, "veckey", None) not in given)
+            kdc = _ad_keydict(subs) if gradients is not None else None
+            while pending:
+                done = []
+                for k, fn in pending.items():
+                    try:
+                        subs[k], grads = _linked(fn, subs, kdc)
+                    except KeyError:
+                        continue
+                    if kdc is not None:  # later ones may depend on it
+                        from ad import adnumber
+                        kdc[k] = adnumber(subs[k])
+                    if gradients is not None:
+                        gradients.append((k, grads))
+                    done.append(k)
+                if not done:
+                    raise KeyError("unresolvable linked constants %s"
+                                   % list(pending))
+                for k in done:
+                    del pending[k]
+        values = np.full(len(self.varkeys), np.nan)
+        for j in np.flatnonzero(self.fixed):
+            vk = self.varkeys[j]
+            values[j] = _magnitude(subs[vk], vk.units)
+        return values
+
+    def _assign(self, values, key, value):
+        " put the value of constant (or vector of constants) key in values "
+        columns = self.elements.get(key, [self.column.get(key)])
+        if None in columns or not self.fixed[columns].all():
+            raise KeyError("%s is not a constant of the program" % key)
+        value = _magnitude(value, key.units)
+        for j in columns:
+            idx = self.varkeys[j].idx if key not in self.column else None
+            values[j] = value[tuple(idx)] if idx is not None else value
+
+    def coefficients(self, values):
+        " effective coefficients of the monomials at constant values "
+        logs = np.zeros(len(self.cs))
+        rows, cols, exps = self._P
+        with np.errstate(divide="ignore"):
+            np.add.at(logs, rows, exps*np.log(values[cols]))
+        return self.cs*np.exp(logs)
+
+    def program(self, values):
+        """ (c, A, p_idxs, k, monomials) of the solver program at values
+
+        Monomials whose coefficient is zero are dropped; monomials is the
+        index of each remaining one.  Raises ValueError if a constraint
+        without free variables is violated.
+        """
+        from gpkit.small_classes import CootMatrix
+        c = self.coefficients(values)
+        for p in self.checks:
+            if c[self.p_idxs == p].sum() > 1 + 1e-9:
+                raise ValueError("constraint %d is violated by the"
+                                 " substituted constants" % p)
+        keep = self.active & (c > 0)
+        monomials = np.flatnonzero(keep)
+        newrow = -np.ones(len(c), dtype=int)
+        newrow[monomials] = np.arange(len(monomials))
+        rows, cols, exps = self._A
+        inrow = keep[rows]
+        posys, p_idxs = np.unique(self.p_idxs[monomials], return_inverse=True)
+        k = np.bincount(p_idxs, minlength=len(posys)).tolist()
+        A = CootMatrix(newrow[rows[inrow]].tolist(), cols[inrow].tolist(),
+                       exps[inrow].tolist())
+        return c[monomials], A, p_idxs, k, monomials
+
+    def resolve(self, substitutions=None, solver=None):
+        """ solve with substitutions changed from the model's
+
+        Returns a dict with "status", "cost", "freevariables" and
+        "constants" (dicts by VarKey, with vectors as arrays by their
+        vector VarKey, as in gpkit), and "sensitivities" of the cost to
+        each constant, or the failing status and no solution.
+        """
+        gradients = self.gradients
+        if substitutions:
+            gradients = [] if self.linked else None
+            values = self.constants(substitutions, gradients)
+        else:
+            values = self.values
+        try:
+            c, A, p_idxs, k, monomials = self.program(values)
+        except ValueError as e:
+            return {"status": "infeasible", "error": str(e)}
+        out = solver_function(solver)(c=c, A=A, p_idxs=p_idxs, k=k)
+        if out.get("status") != "optimal":
+            return {"status": out.get("status")}
+        return self.result(out, values, c, A, p_idxs, monomials, gradients)
+
+    def _by_veckey(self, values):
+        " {VarKey: value} with the elements of vectors as arrays by veckey "
+        out = {}
+        for vk, value in values.items():
+            veckey = getattr(vk, "veckey", None)
+            if veckey is None or vk.idx is None:
+                out[vk] = value
+                continue
+            if veckey not in out:
+                idxs = [self.varkeys[j].idx for j in self.elements[veckey]]
+                out[veckey] = np.full(np.max(idxs, axis=0) + 1, np.nan)
+            out[veckey][tuple(vk.idx)] = value
+        return out
+
+    def result(self, out, values, c, A, p_idxs, monomials, gradients=()):
+        """ solution dict of a solver output of the program at values
+
+        The sensitivity of each linked constant of gradients is carried
+        over to the constants it is computed from, as gpkit does.
+        """
+        x = np.ravel(out["primal"])
+        logs = np.zeros(len(c))
+        np.add.at(logs, np.asarray(A.row), np.asarray(A.data)
+                  * x[np.asarray(A.col)])
+        terms = c*np.exp(logs)
+        if "nu" in out:
+            nu = np.ravel(out["nu"])
+        else:
+            la = np.ravel(out["la"])
+            la = np.hstack([[1.], la]) if len(la) < p_idxs.max() + 1 else la
+            nu = la[p_idxs]*terms/np.bincount(p_idxs, terms)[p_idxs]
+        # d log(cost) / d log(q_j) = sum_i nu_i E_ij over monomials i
+        full = np.zeros(len(self.cs))
+        full[monomials] = nu
+        sens = np.zeros(len(self.varkeys))
+        rows, cols, exps = self._P
+        np.add.at(sens, cols, full[rows]*exps)
+        fixed = np.flatnonzero(self.fixed)
+        senss = dict((self.varkeys[j], sens[j]) for j in fixed)
+        for v, grads in reversed(gradients or []):
+            if not grads:
+                continue
+            dlogcost_dlogv = senss.pop(v, 0.)
+            for key, dlogv_dlogc in grads.items():
+                if key in self.elements:
+                    for j in self.elements[key]:
+                        vk = self.varkeys[j]
+                        senss[vk] = (senss.get(vk, 0.) + dlogcost_dlogv
+                                     * dlogv_dlogc[tuple(vk.idx)])
+                else:
+                    senss[key] = (senss.get(key, 0.)
+                                  + dlogcost_dlogv*dlogv_dlogc)
+        return {"status": "optimal",
+                "cost": float(terms[p_idxs == 0].sum()),
+                "freevariables": self._by_veckey(dict(zip(
+                    [self.varkeys[j] for j in self.free], np.exp(x)))),
+                "constants": self._by_veckey(dict(
+                    (self.varkeys[j], values[j]) for j in fixed)),
+                "sensitivities": {"constants": self._by_veckey(senss)}}
+
+def load(path):
+    """ the CompiledGP (or Screener) saved at path
+
+    It can be resolved (or screened) with new substitutions as before it
+    was saved, except that linked constants keep their saved values.
+    """
+    with np.load(path) as data:
+        cls = CompiledGP
+        if str(data["kind"]) == "screen":
+            from .screen import Screener
+            cls = Screener
+        obj = cls.__new__(cls)
+        obj._load(data)  #pylint: disable=protected-access
+    return obj
+
+def resolve(model, substitutions=None, solver=None):
+    """ CompiledGP(model).resolve(substitutions), compiling model once
+
+    The compiled program is kept on the model, so changes to its
+    constraints after the first call are not seen.
+    """
+    cgp = model.__dict__.get("_compiled")
+    if cgp is None:
+        cgp = model.__dict__["_compiled"] = CompiledGP(model)
+    return cgp.resolve(substitutions, solver)
+
+def resolve_test():
+    " resolve against solve, with linked and vector constants "
+    from gpkit import Variable, VectorVariable, Model
+    x = VectorVariable(3, "x")
+    a = Variable("a", 2)
+    b = VectorVariable(3, "b", [1, 2, 3])
+    d = Variable("d", lambda c: c[a]**2 + 1)
+    e = VectorVariable(3, "e", lambda c: c[a]*np.array([1., 2, 3]))
+    m = Model(x.sum(), [x >= b*d, x >= e, x[0]*x[1] >= a])
+    cgp = CompiledGP(m)
+    subs = {}
+    for change in [{}, {a: 3}, {b: [2, 1, 1]}]:
+        subs.update(change)
+        m.substitutions.update(change)
+        sol = m.solve(verbosity=0)
+        res = cgp.resolve(subs)
+        assert abs(res["cost"]/sol["cost"] - 1) < 1e-5
+        senss = res["sensitivities"]["constants"]
+        assert set(senss) == set(sol["sensitivities"]["constants"])
+        assert d.key not in senss  # carried over to a
+        for key, value in sol["sensitivities"]["constants"].items():
+            assert np.allclose(senss[key], value, atol=1e-5), key
+        assert np.allclose(res["freevariables"][x.key], sol(x).magnitude)
+        assert np.allclose(res["constants"][b.key], m.substitutions[b])
+
+def save_load_test():
+    " a loaded program resolves as the compiled one did "
+    import os
+    from tempfile import mkdtemp
+    from gpkit import Variable, VectorVariable, Model, units, ureg
+    x = VectorVariable(3, "x", "m")
+    a = Variable("a", 2, "m^2")
+    b = VectorVariable(3, "b", [1, 2, 3], "m")
+    k = Variable("k", 1.5)
+    d = Variable("d", lambda c: c[k]**2)
+    m = Model(x.sum()/units.m, [x >= b*d, x[0]*x[1] >= a,
+                                 x[2] >= 10*k*units.m])
+    cgp = CompiledGP(m)
+    path = os.path.join(mkdtemp(), "m.npz")
+    cgp.save(path)
+    loaded = load(path)
+    for subs in [{}, {"b": [2, 1, 1]}, {"a": 3e4*ureg.cm**2}]:
+        res, saved = cgp.resolve(subs), loaded.resolve(subs)
+        assert abs(saved["cost"]/res["cost"] - 1) < 1e-8
+        for kind in ["freevariables", "constants"]:
+            values = dict((str(key), v) for key, v in saved[kind].items())
+            for key, value in res[kind].items():
+                assert np.allclose(values.pop(str(key)), value), key
+            assert not values
+        senss = dict((str(key), v) for key, v
+                     in saved["sensitivities"]["constants"].items())
+        # the loaded d keeps its saved value and its own sensitivity
+        assert np.allclose(senss.pop("k") + 2*senss.pop("d"),
+                           res["sensitivities"]["constants"][k.key])
+        for key, value in res["sensitivities"]["constants"].items():
+            if key != k.key:
+                assert np.allclose(senss.pop(str(key)), value), key
+        assert not senss
+    assert _unitstr(loaded.key("x")) == "m"
+
+def test():
+    " tests "
+    resolve_test()
+    save_load_test()
@@ -0,0 +1,370 @@
+""" sweep job queue in a shared directory, for workers on several nodes
+
+    from gpkitmodels.tools.filequeue import FileQueue
+    q = FileQueue("/shared/sweep")
+    q.submit("gpkitmodels.SP.SimPleAC.SimPleAC_offdesign:mission_model(4)",
+             substitutions, variables=["W_{f_m}"], localsolve=True)
+    # on each node:  python -m gpkitmodels.tools.filequeue work /shared/sweep
+    q.wait()
+    q.results()["W_{f_m}"]
+
+Each job is a json file holding the model to build (a footprint.build
+"module:expression"), its substitutions by name in the variables' units
+and its solve options.  It moves between directories by rename, which is
+atomic on a shared filesystem:
+
+    pending/  -> claimed/  by the one worker whose rename succeeds
+    claimed/  -> done/     once its results are in the ResultStore store/
+    claimed/  -> failed/   with the error, if the solve raised
+    claimed/  -> pending/  by requeue_stale, if its worker stopped
+                           touching it (its heartbeat) for stale seconds
+
+A worker whose job was requeued while it was still solving may also write
+its results, so results() keeps the first row of each job.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import errno
+import socket
+import argparse
+import threading
+import traceback
+from time import time, sleep
+from uuid import uuid4
+from multiprocessing import Process
+import numpy as np
+from .footprint import build
+from .result_store import ResultStore
+from .slim import slim_solve
+
+STATES = ["pending", "claimed", "done", "failed"]
+
+def _moved(src, dst):
+    " rename src to dst; False if src is gone, e.g. claimed by another "
+    try:
+        os.rename(src, dst)
+        return True
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return False
+        raise
+
+class FileQueue(object):
+    """ Directory of sweep jobs and their results
+
+    Arguments
+    ---------
+    path : str
+        queue directory, created if needed; every node must see it
+    stale : float
+        seconds without a heartbeat after which a claimed job is requeued
+    """
+    def __init__(self, path, stale=60.):
+        self.path = path
+        self.stale = stale
+        for state in STATES:
+            if not os.path.isdir(self._dir(state)):
+                try:
+                    os.makedirs(self._dir(state))
+                except OSError as e:  # made by another node meanwhile
+                    if e.errno != errno.EEXIST:
+                        raise
+        self.store = ResultStore(os.path.join(path, "store"))
+
+    def _dir(self, state, name=""):
+        return os.path.join(self.path, state, name)
+
+    def jobs(self, state):
+        " names of the job files in state, oldest submitted first "
+        return sorted(f for f in os.listdir(self._dir(state))
+                      if f.endswith(".json"))
+
+    def status(self):
+        " number of jobs in each state "
+        return dict((state, len(self.jobs(state))) for state in STATES)
+
+    def submit(self, factory, substitutions, variables=(), sensitivities=(),
+               localsolve=False, **solveargs):
+        """ queue a job for each dict of substitutions; returns their ids
+
+        factory is the footprint.build spec of the model; variables and
+        sensitivities (names) are the slim_solve results kept, and the
+        cost is always kept.
+        """
+        ids = []
+        stamp = int(time()*1e6)
+        for i, subs in enumerate(substitutions):
+            job = {"id": uuid4().int >> 76,  # exact as a float column
+                   "factory": factory, "substitutions": subs,
+                   "variables": list(variables),
+                   "sensitivities": list(sensitivities),
+                   "localsolve": localsolve, "solveargs": solveargs}
+            name = "%017d-%08d-%016d.json" % (stamp, i, job["id"])
+            tmp = self._dir("pending", "." + name)
+            with open(tmp, "w") as f:
+                json.dump(job, f, default=_jsonable)
+            os.rename(tmp, self._dir("pending", name))
+            ids.append(job["id"])
+        return ids
+
+    def claim(self):
+        """ (name, job) of a pending job now claimed by the caller
+
+        None if no job is pending.
+        """
+        for name in self.jobs("pending"):
+            src = self._dir("pending", name)
+            try:  # rename keeps mtime; start the heartbeat before it
+                os.utime(src, None)
+            except OSError:
+                continue
+            if _moved(src, self._dir("claimed", name)):
+                with open(self._dir("claimed", name)) as f:
+                    return name, json.load(f)
+        return None
+
+    def heartbeat(self, name):
+        " mark a claimed job alive; False if it is no longer claimed "
+        try:
+            os.utime(self._dir("claimed", name), None)
+            return True
+        except OSError:
+            return False
+
+    def finish(self, name, error=None):
+        """ move a claimed job to done, or to failed with error
+
+        False if it is no longer claimed, e.g. requeued as stale.
+        """
+        if error is None:
+            return _moved(self._dir("claimed", name), self._dir("done", name))
+        src = self._dir("claimed", name)
+        try:
+            with open(src) as f:
+                job = json.load(f)
+        except (IOError, OSError):
+            return False
+        job["error"] = error
+        tmp = self._dir("claimed", ".%s" % uuid4().hex)
+        with open(tmp, "w") as f:
+            json.dump(job, f, default=_jsonable)
+        if not _moved(src, self._dir("failed", name)):
+            os.remove(tmp)
+            return False
+        os.rename(tmp, self._dir("failed", name))
+        return True
+
+    def requeue_stale(self, stale=None):
+        " move claimed jobs without a recent heartbeat back to pending "
+        stale = self.stale if stale is None else stale
+        requeued = []
+        for name in self.jobs("claimed"):
+            src = self._dir("claimed", name)
+            try:
+                if time() - os.path.getmtime(src) < stale:
+                    continue
+            except OSError:
+                continue
+            if _moved(src, self._dir("pending", name)):
+                requeued.append(name)
+        return requeued
+
+    def wait(self, timeout=None, poll=1.):
+        """ wait until no job is pending or claimed, requeueing stale ones
+
+        Returns the final status; raises RuntimeError on timeout.
+        """
+        start = time()
+        while True:
+            self.requeue_stale()
+            status = self.status()
+            if not status["pending"] and not status["claimed"]:
+                return status
+            if timeout is not None and time() - start > timeout:
+                raise RuntimeError("jobs unfinished after %gs: %s"
+                                   % (timeout, status))
+            sleep(poll)
+
+    def results(self):
+        """ {column: array} with one row per finished job
+
+        Rows are in the order the jobs finished, with the job ids that
+        submit returned under "job".  Failed jobs have an "ok" of 0 and
+        NaN results.
+        """
+        if not self.store.chunks():
+            return {}
+        _, first = np.unique(np.asarray(self.store["job"]),
+                             return_index=True)
+        first.sort()
+        return dict((name, np.asarray(self.store[name])[first])
+                    for name in self.store.columns())
+
+def _jsonable(value):
+    " numpy arrays and numbers in job descriptors as lists and floats "
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError("%r is not json serializable" % (value,))
+
+class _Heartbeat(threading.Thread):
+    " touches a claimed job every interval seconds until stopped "
+    def __init__(self, queue, name, interval):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.queue, self.job, self.interval = queue, name, interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if not self.queue.heartbeat(self.job):
+                return
+
+_MODELS = {}
+
+def solve(job):
+    """ slim_solve results of a job, with its model built once per process
+
+    Substitutions are restored after the solve, so the next job on the
+    same model starts from its built state.
+    """
+    if job["factory"] not in _MODELS:
+        _MODELS[job["factory"]] = build(job["factory"])
+    m = _MODELS[job["factory"]]
+    old = dict((k, m.substitutions[k]) for k in job["substitutions"]
+               if k in m.substitutions)
+    m.substitutions.update(job["substitutions"])
+    try:
+        return slim_solve(m, job["variables"], job["sensitivities"],
+                          localsolve=job["localsolve"], **job["solveargs"])
+    finally:
+        for k in job["substitutions"]:
+            if k in old:
+                m.substitutions[k] = old[k]
+            else:
+                del m.substitutions[k]
+
+def work(path, wait=0., poll=1., heartbeat=5., max_jobs=None, stale=60.):
+    """ claim and solve jobs of the queue at path; returns the number done
+
+    Exits once no job is pending or claimed and none has been for wait
+    seconds, or after max_jobs jobs.  While other workers finish their
+    jobs it polls, requeueing and then taking over their stale claims.
+    """
+    queue = FileQueue(path, stale)
+    done, idle = 0, time()
+    while max_jobs is None or done < max_jobs:
+        claimed = queue.claim()
+        if claimed is None:
+            if queue.requeue_stale():
+                continue
+            if queue.jobs("claimed"):
+                idle = time()
+            elif time() - idle >= wait:
+                return done
+            sleep(poll)
+            continue
+        name, job = claimed
+        beat = _Heartbeat(queue, name, heartbeat)
+        beat.start()
+        try:
+            row, error = solve(job), None
+        except Exception:  #pylint: disable=broad-except
+            row, error = {}, traceback.format_exc()
+        finally:
+            beat.stopped.set()
+        row.update({"job": job["id"], "ok": float(error is None)})
+        queue.store.append_rows([row])
+        queue.finish(name, error)
+        done += 1
+        idle = time()
+    return done
+
+def run_local(path, processes=2, **kwargs):
+    """ run work(path, **kwargs) in several processes, as if on several
+    nodes, and wait for them; returns the number of jobs each did
+    """
+    from multiprocessing import Queue
+    counts = Queue()
+    workers = [Process(target=_work, args=(path, kwargs, counts))
+               for _ in range(processes)]
+    for p in workers:
+        p.start()
+    out = [counts.get() for _ in workers]
+    for p in workers:
+        p.join()
+    return out
+
+def _work(path, kwargs, counts):
+    counts.put(work(path, **kwargs))
+
+def _fuselage():
+    " a quick fuselage model with a weight limit, for test() "
+    from gpkit import Model, Variable
+    from gpkitmodels.GP.aircraft.fuselage.elliptical_fuselage import Fuselage
+    from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+    f = Fuselage()
+    fs = FlightState()
+    faero = f.flight_model(f, fs)
+    Wmax = Variable("W_{max}", 100, "lbf", "maximum fuselage weight")
+    return Model(f.W*faero.Cd, [f, fs, faero, f.W <= Wmax])
+
+def test():
+    " two workers, one of them taking over a stale claim, and a failure "
+    from tempfile import mkdtemp
+    path = mkdtemp()
+    queue = FileQueue(path, stale=0.5)
+    subs = [{"Vol": 1.}, {"Vol": 2., "V": 40}, {"Vol": 1., "W_{max}": 1e-3},
+            {"Vol": 3.}]
+    ids = queue.submit("gpkitmodels.tools.filequeue:_fuselage()", subs,
+                       variables=["l"], sensitivities=["Vol"])
+    name, _ = queue.claim()  # by a worker that stops
+    assert queue.status()["claimed"] == 1
+    sleep(0.6)
+    counts = run_local(path, 2, poll=0.1, heartbeat=0.1, stale=0.5)
+    assert sum(counts) == 4
+    assert queue.status() == {"pending": 0, "claimed": 0, "done": 3,
+                              "failed": 1}
+    assert name in queue.jobs("done") + queue.jobs("failed")
+    with open(os.path.join(path, "failed", queue.jobs("failed")[0])) as f:
+        failed = json.load(f)
+    assert failed["id"] == ids[2] and "RuntimeWarning" in failed["error"]
+    res = queue.results()
+    assert sorted(res["job"]) == sorted(ids)
+    for i, job in enumerate(ids):
+        row = list(res["job"]).index(job)
+        if i == 2:
+            assert res["ok"][row] == 0 and np.isnan(res["cost"][row])
+            continue
+        m = _fuselage()
+        m.substitutions.update(subs[i])
+        sol = m.solve(verbosity=0)
+        assert res["ok"][row] == 1
+        assert abs(res["cost"][row]/sol["cost"].magnitude - 1) < 1e-5
+        assert abs(res["l"][row]/sol("l").magnitude - 1) < 1e-5
+        assert abs(res["sens:Vol"][row]
+                   - sol["sensitivities"]["constants"]["Vol"]) < 1e-5
+
+def main(argv=None):
+    " command line entry point "
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["work", "status", "requeue"])
+    parser.add_argument("path")
+    parser.add_argument("--wait", type=float, default=0.,
+                        help="seconds to wait for new jobs before exiting")
+    parser.add_argument("--stale", type=float, default=60.,
+                        help="seconds without a heartbeat before requeueing")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args(argv)
+    if args.command == "work":
+        counts = run_local(args.path, args.processes, wait=args.wait,
+                           stale=args.stale)
+        print("%s: %d jobs" % (socket.gethostname(), sum(counts)))
+    elif args.command == "requeue":
+        print("\n".join(FileQueue(args.path).requeue_stale(args.stale)))
+    else:
+        print(json.dumps(FileQueue(args.path).status(), sort_keys=True))
+
+if __name__ == "__main__":
+    sys.exit(main())
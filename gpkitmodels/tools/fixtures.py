@@ -0,0 +1,152 @@
+""" component models and solved test models shared between tests
+
+    from gpkitmodels.tools.fixtures import wing, flight_state, solved
+    W = wing()          # a copy of a Wing() built once per process
+    m, sol = solved(Motor_P_Test)   # built and solved once per process
+
+Components are built once per process and each use gets an independent
+copy, loaded from the pickle (serialization.dumps) taken when it was
+built; deepcopy cannot copy gpkit's VarKeys.  Copies of one build share
+their variables, so a test should not put two copies of the same
+component in one model.  The builders keep class-level choices, such as
+Wing.sparModel, out of the models other tests build.
+
+Set the GPKITMODELS_FIXTURE_REPORT environment variable to print how much
+construction time the solved fixtures saved when the process exits.
+"""
+from __future__ import print_function
+import os
+import atexit
+from time import time
+from functools import wraps
+
+_BUILT = {}
+_SOLVED = {}
+STATS = {}
+
+def _stats(name):
+    return STATS.setdefault(name, {"builds": 0, "uses": 0, "build": 0.,
+                                   "copy": 0.})
+
+def fixture(builder):
+    """ decorator building builder(*args) once per args and process
+
+    The first call returns the built model and later ones copies of it
+    as it was built, so a test may change the model it gets freely.
+    """
+    @wraps(builder)
+    def get(*args):
+        from .serialization import enable, dumps, loads
+        enable()
+        stats = _stats(builder.__name__)
+        stats["uses"] += 1
+        key = (builder, args)
+        start = time()
+        if key not in _BUILT:
+            model = builder(*args)
+            _BUILT[key] = dumps(model)
+            stats["build"] += time() - start
+            stats["builds"] += 1
+            return model
+        model = loads(_BUILT[key])
+        stats["copy"] += time() - start
+        return model
+    return get
+
+def solved(factory, *args, **solveargs):
+    """ factory(*args) and its solution, solved once per process
+
+    Shared between tests, so treat both as read-only.  Pass
+    localsolve=True for signomial programs.
+    """
+    key = (factory, args, tuple(sorted(solveargs.items())))
+    if key not in _SOLVED:
+        stats = _stats("solved " + factory.__name__)
+        start = time()
+        model = factory(*args)
+        solveargs.setdefault("verbosity", 0)
+        if solveargs.pop("localsolve", False):
+            sol = model.localsolve(**solveargs)
+        else:
+            sol = model.solve(**solveargs)
+        _SOLVED[key] = model, sol
+        stats["build"] += time() - start
+        stats["builds"] += 1
+    _stats("solved " + factory.__name__)["uses"] += 1
+    return _SOLVED[key]
+
+def saved():
+    " {fixture: seconds saved by sharing or copying instead of rebuilding} "
+    return dict((name, s["build"]/s["builds"]*s["uses"] - s["build"]
+                 - s["copy"]) for name, s in STATS.items() if s["builds"])
+
+def report():
+    " text table of fixture use and construction time saved "
+    lines = ["%-30s %6s %6s %8s %8s %8s" % ("fixture", "builds", "uses",
+                                             "build", "copy", "saved")]
+    for name, sec in sorted(saved().items()):
+        s = STATS[name]
+        lines.append("%-30s %6d %6d %8.3f %8.3f %8.3f" % (
+            name, s["builds"], s["uses"], s["build"], s["copy"], sec))
+    lines.append("total saved %.3f s" % sum(saved().values()))
+    return "\n".join(lines)
+
+if os.environ.get("GPKITMODELS_FIXTURE_REPORT"):
+    atexit.register(lambda: print(report()))
+
+# models are imported when first built, so that test modules defining them
+# (e.g. wing_test's FlightState) can import these fixtures
+
+@fixture
+def flight_state():
+    " wing_test.FlightState() "
+    from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+    return FlightState()
+
+@fixture
+def wing(sparModel=None):
+    " Wing(), with a different sparModel if given "
+    from gpkitmodels.GP.aircraft.wing.wing import Wing
+    if sparModel is None:
+        return Wing()
+    default, Wing.sparModel = Wing.sparModel, sparModel
+    try:
+        return Wing()
+    finally:
+        Wing.sparModel = default
+
+@fixture
+def horizontal_tail():
+    " HorizontalTail() "
+    from gpkitmodels.GP.aircraft.tail.horizontal_tail import HorizontalTail
+    return HorizontalTail()
+
+@fixture
+def vertical_tail():
+    " VerticalTail() "
+    from gpkitmodels.GP.aircraft.tail.vertical_tail import VerticalTail
+    return VerticalTail()
+
+@fixture
+def empennage():
+    " Empennage() "
+    from gpkitmodels.GP.aircraft.tail.empennage import Empennage
+    return Empennage()
+
+@fixture
+def propulsor(prop_flight_model=None):
+    """ Propulsor() whose propeller flies prop_flight_model
+
+    The propeller's flight model is fixed on the model, so it does not
+    depend on the Propeller.flight_model set by later Propulsor builds.
+    """
+    from gpkitmodels.GP.aircraft.motor.motor import Propulsor
+    default = Propulsor.prop_flight_model
+    if prop_flight_model is not None:
+        Propulsor.prop_flight_model = prop_flight_model
+    try:
+        p = Propulsor()
+        p.prop.flight_model = Propulsor.prop_flight_model
+        return p
+    finally:
+        Propulsor.prop_flight_model = default
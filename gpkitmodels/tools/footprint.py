@@ -0,0 +1,179 @@
+""" GP size of a model, attributed to its submodels
+
+    python -m gpkitmodels.tools.footprint [--by class|instance|wrapper]
+        "gpkitmodels.GP.aircraft.wing.wing:Wing(N=5)"
+        ["gpkitmodels.GP.aircraft.wing.wing:Wing(N=20)"]
+
+Walks a built model's constraint tree and counts, for each leaf constraint,
+its posynomial constraints, monomial terms, nonzeros of the exponent matrix
+and signomial constraints, and the variables it uses.  Each leaf counts
+towards the innermost Model holding it (by class and by instance path) and
+the innermost other ConstraintSet class wrapping it (e.g. FitCS, Tight).
+Counts are taken before substitution, so constants count as variables.
+Given two models, the second is reported as a difference from the first.
+"""
+from __future__ import print_function
+import sys
+import argparse
+import importlib
+from collections import defaultdict
+
+METRICS = ["variables", "constraints", "terms", "nonzeros", "signomials"]
+
+def _leaves(cset, path, cls, wrapper, counts):
+    " walk cset, yielding (path, Model class name, wrapper, leaf) "
+    from gpkit import Model
+    from gpkit.constraints.set import ConstraintSet
+    for item in cset:
+        if isinstance(item, Model):
+            name = type(item).__name__
+            counts[(path, name)] += 1
+            child = path + ("%s%d" % (name, counts[(path, name)]),)
+            for leaf in _leaves(item, child, name, None, counts):
+                yield leaf
+        elif isinstance(item, ConstraintSet):
+            name = type(item).__name__
+            inner = wrapper if name in ("ConstraintSet",
+                                        "ArrayConstraint") else name
+            for leaf in _leaves(item, path, cls, inner, counts):
+                yield leaf
+        elif isinstance(item, list):
+            for leaf in _leaves(item, path, cls, wrapper, counts):
+                yield leaf
+        else:
+            yield path, cls, wrapper, item
+
+def _sizes(constraint):
+    " (varkeys, constraints, terms, nonzeros, signomials) of a leaf "
+    posys = getattr(constraint, "unsubbed", None) or []
+    varkeys = set()
+    terms = nonzeros = signomials = 0
+    for p in posys:
+        terms += len(p.exps)
+        for exp in p.exps:
+            nonzeros += len(exp)
+            varkeys.update(exp)
+        if any(c < 0 for c in getattr(p, "cs", [])):
+            signomials += 1
+    return varkeys, len(posys), terms, nonzeros, signomials
+
+def footprint(model):
+    """ sizes of model by submodel
+
+    Returns {"class": ..., "instance": ..., "wrapper": ..., "total": ...},
+    each but total a {name: {metric: count}} dict.  Instances are named
+    by their path of numbered classes from the root, e.g.
+    Mission1/Aircraft1/Wing1; instance sizes include their submodels'.
+    """
+    root = (type(model).__name__ + "1",)
+    groups = dict((by, defaultdict(lambda: defaultdict(int)))
+                  for by in ["class", "instance", "wrapper"])
+    varkeys = dict((by, defaultdict(set)) for by in groups)
+    for path, cls, wrapper, leaf in _leaves(model, root, type(model).__name__,
+                                            None, defaultdict(int)):
+        vks, ncons, terms, nonzeros, signomials = _sizes(leaf)
+        names = {"class": [cls],
+                 "instance": ["/".join(path[:i+1]) for i in range(len(path))],
+                 "wrapper": [wrapper or "-"]}
+        for by, keys in names.items():
+            for key in keys:
+                g = groups[by][key]
+                g["constraints"] += ncons
+                g["terms"] += terms
+                g["nonzeros"] += nonzeros
+                g["signomials"] += signomials
+                varkeys[by][key].update(vks)
+    out = {}
+    for by in groups:
+        for key, vks in varkeys[by].items():
+            groups[by][key]["variables"] = len(vks)
+        out[by] = dict((k, dict(v)) for k, v in groups[by].items())
+    out["total"] = dict(out["instance"][root[0]])
+    return out
+
+def report(fp, by="class"):
+    " text table of a footprint grouped by class, instance or wrapper "
+    rows = sorted(fp[by].items(), key=lambda kv: -kv[1]["nonzeros"])
+    width = max([len(by)] + [len(k) for k, _ in rows])
+    lines = ["%-*s" % (width, by) + "".join("%12s" % m for m in METRICS)]
+    for key, sizes in rows + [("total", fp["total"])]:
+        lines.append("%-*s" % (width, key) + "".join(
+            "%12d" % sizes.get(m, 0) for m in METRICS))
+    return "\n".join(lines)
+
+def diff(fp0, fp1, by="class"):
+    " text table of the change from footprint fp0 to fp1 "
+    keys = sorted(set(fp0[by]) | set(fp1[by]), key=lambda k: -(
+        fp1[by].get(k, {}).get("nonzeros", 0)
+        - fp0[by].get(k, {}).get("nonzeros", 0)))
+    width = max([len(by)] + [len(k) for k in keys])
+    lines = ["%-*s" % (width, by) + "".join("%18s" % m for m in METRICS)]
+    for key, a, b in [(k, fp0[by].get(k, {}), fp1[by].get(k, {}))
+                      for k in keys] + [("total", fp0["total"],
+                                         fp1["total"])]:
+        cells = []
+        for m in METRICS:
+            old, new = a.get(m, 0), b.get(m, 0)
+            if not old and not new:
+                cells.append("%18s" % "-")
+                continue
+            ratio = "x%.1f" % (float(new)/old) if old else "new"
+            cells.append("%18s" % ("%+d %s" % (new - old, ratio)))
+        lines.append("%-*s" % (width, key) + "".join(cells))
+    return "\n".join(lines)
+
+def build(spec):
+    " the model built by 'module:expression', e.g. 'pkg.wing:Wing(N=5)' "
+    module, expression = spec.split(":", 1)
+    namespace = vars(importlib.import_module(module))
+    return eval(expression, dict(namespace))  #pylint: disable=eval-used
+
+def main(argv=None):
+    " command line entry point "
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("models", nargs="+", help="module:expression")
+    parser.add_argument("--by", default="class",
+                        choices=["class", "instance", "wrapper"])
+    args = parser.parse_args(argv)
+    fps = [footprint(build(spec)) for spec in args.models[:2]]
+    if len(fps) == 1:
+        print(report(fps[0], args.by))
+    else:
+        print(diff(fps[0], fps[1], args.by))
+
+def test():
+    " footprints of Wing(N=5) and the change to Wing(N=10) "
+    from gpkit import Model, Variable
+    from gpkitmodels.GP.aircraft.wing.wing import Wing
+    m = Wing(N=5)
+    fp = footprint(m)
+    posys = [p for c in m.flat(constraintsets=False) for p in c.unsubbed]
+    assert fp["total"] == {
+        "variables": len(set(vk for p in posys for exp in p.exps
+                             for vk in exp)),
+        "constraints": len(posys),
+        "terms": sum(len(p.exps) for p in posys),
+        "nonzeros": sum(len(exp) for p in posys for exp in p.exps),
+        "signomials": 0}
+    for by in ["class", "wrapper"]:  # each leaf counts once
+        for metric in ["constraints", "terms", "nonzeros"]:
+            assert sum(g[metric] for g in fp[by].values()) == \
+                fp["total"][metric]
+    assert fp["instance"]["Wing1/CapSpar1"] == fp["class"]["CapSpar"]
+
+    class Spar2(Model):
+        " a class name ending in a digit "
+        def setup(self):
+            x = Variable("x")
+            return [x >= 1]
+    assert list(footprint(Spar2())["class"]) == ["Spar2"]
+
+    fp10 = footprint(Wing(N=10))
+    assert fp10["total"]["nonzeros"] > fp["total"]["nonzeros"]
+    total = diff(fp, fp10).splitlines()[-1].split()
+    assert total[0] == "total" and total[-1] == "-"  # no signomials
+    assert "%+d" % (fp10["total"]["constraints"]
+                    - fp["total"]["constraints"]) in total
+
+if __name__ == "__main__":
+    sys.exit(main())
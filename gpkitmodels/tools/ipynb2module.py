@@ -2,12 +2,13 @@
 "tool for importing ipython notebooks as modules"
 
 
-import io, os, sys, types
+import io, os, sys, types, marshal
 
-# Import Modules
-from IPython import get_ipython
-from nbformat import read
-from IPython.core.interactiveshell import InteractiveShell
+# IPython and nbformat are only imported when a notebook has to be compiled,
+# or when its code uses get_ipython (e.g. for magics)
+
+CACHE_DIR = "__pycache__"
+CACHE_TAG = "ipynb-py%d%d" % sys.version_info[:2]
 
 
 def find_notebook(fullname, path=None):
@@ -30,10 +31,70 @@ def find_notebook(fullname, path=None):
             return nb_path
 
 
+def cache_path(path):
+    """compiled code cache file of the notebook at path"""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIR,
+                        "%s.%s.marshal" % (name, CACHE_TAG))
+
+
+def get_shell():
+    """the IPython shell used to transform and run notebook cells"""
+    from IPython.core.interactiveshell import InteractiveShell
+    return InteractiveShell.instance()
+
+
+def compile_notebook(path):
+    """code objects of the notebook's code cells, transformed by IPython"""
+    from nbformat import read
+    with io.open(path, 'r', encoding='utf-8') as f:
+        nb = read(f, 4)
+    shell = get_shell()
+    return [compile(shell.input_transformer_manager.transform_cell(
+        cell.source), path, "exec")
+            for cell in nb.cells if cell.cell_type == 'code']
+
+
+def notebook_code(path):
+    """compiled code cells of a notebook, cached by path and mtime
+
+    The cache is written next to the notebook, in __pycache__; if that is
+    not writable the cells are compiled on every import.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+    cache = cache_path(path)
+    try:
+        with open(cache, 'rb') as f:
+            cached_key, codes = marshal.load(f)
+        if tuple(cached_key) == key:
+            return codes
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        pass
+    codes = compile_notebook(path)
+    try:
+        if not os.path.isdir(os.path.dirname(cache)):
+            os.makedirs(os.path.dirname(cache))
+        tmp = "%s.%d" % (cache, os.getpid())
+        with open(tmp, 'wb') as f:
+            marshal.dump((key, codes), f)
+        os.rename(tmp, cache)
+    except (IOError, OSError):
+        pass
+    return codes
+
+
+def uses_shell(code):
+    """whether compiled code calls get_ipython, anywhere in it"""
+    if "get_ipython" in code.co_names:
+        return True
+    return any(uses_shell(c) for c in code.co_consts
+               if isinstance(c, types.CodeType))
+
+
 class NotebookLoader(object):
     """Module Loader for Jupyter Notebooks"""
     def __init__(self, path=None):
-        self.shell = InteractiveShell.instance()
         self.path = path
 
     def load_module(self, fullname):
@@ -42,10 +103,7 @@ class NotebookLoader(object):
 
         print ("importing Jupyter notebook from %s" % path)
 
-        # load the notebook object
-        with io.open(path, 'r', encoding='utf-8') as f:
-            nb = read(f, 4)
-
+        codes = notebook_code(path)
 
         # create the module and add it to sys.modules
         # if name in sys.modules:
@@ -53,23 +111,27 @@ class NotebookLoader(object):
         mod = types.ModuleType(fullname)
         mod.__file__ = path
         mod.__loader__ = self
-        mod.__dict__['get_ipython'] = get_ipython
         sys.modules[fullname] = mod
 
+        if not any(uses_shell(code) for code in codes):
+            for code in codes:
+                exec(code, mod.__dict__)
+            return mod
+
         # extra work to ensure that magics that would affect the user_ns
         # actually affect the notebook module's ns
-        save_user_ns = self.shell.user_ns
-        self.shell.user_ns = mod.__dict__
+        from IPython import get_ipython
+        shell = get_shell()
+        mod.__dict__['get_ipython'] = get_ipython
+        save_user_ns = shell.user_ns
+        shell.user_ns = mod.__dict__
 
         try:
-          for cell in nb.cells:
-            if cell.cell_type == 'code':
-                # transform the input to executable Python
-                code = self.shell.input_transformer_manager.transform_cell(cell.source)
-                # run the code in themodule
+            for code in codes:
+                # run the code in the module
                 exec(code, mod.__dict__)
         finally:
-            self.shell.user_ns = save_user_ns
+            shell.user_ns = save_user_ns
         return mod
 
 class NotebookFinder(object):
@@ -95,3 +157,60 @@ class NotebookFinder(object):
 # Register the hook
 def enable():
     sys.meta_path.append(NotebookFinder())
+
+
+def test():
+    """cache hits, invalidation by mtime and size, and a corrupt cache
+
+    The cells are compiled from the notebook's json here, without IPython's
+    transforms, so that only the cache is tested.
+    """
+    import json
+    import shutil
+    from tempfile import mkdtemp
+
+    calls = []
+
+    def compile_cells(path):
+        calls.append(path)
+        with io.open(path, 'r', encoding='utf-8') as f:
+            nb = json.load(f)
+        return [compile("".join(cell["source"]), path, "exec")
+                for cell in nb["cells"] if cell["cell_type"] == "code"]
+
+    def write(path, source, mtime):
+        with open(path, 'w') as f:
+            json.dump({"cells": [
+                {"cell_type": "markdown", "source": ["# x"]},
+                {"cell_type": "code", "source": [source]}]}, f)
+        os.utime(path, (mtime, mtime))
+
+    def value(codes):
+        namespace = {}
+        for code in codes:
+            exec(code, namespace)
+        return namespace["x"]
+
+    global compile_notebook  # pylint: disable=global-statement
+    directory = mkdtemp()
+    real, compile_notebook = compile_notebook, compile_cells
+    try:
+        path = os.path.join(directory, "Cached Notebook.ipynb")
+        write(path, "x = 1", 1e9)
+        assert value(notebook_code(path)) == 1 and len(calls) == 1
+        assert os.path.isfile(cache_path(path))
+        assert value(notebook_code(path)) == 1 and len(calls) == 1
+        write(path, "x = 22", 1e9)  # same mtime, new size
+        assert value(notebook_code(path)) == 22 and len(calls) == 2
+        write(path, "x = 33", 1e9 + 10)  # same size, new mtime
+        assert value(notebook_code(path)) == 33 and len(calls) == 3
+        with open(cache_path(path), 'wb') as f:
+            f.write(b"\x00corrupt")
+        assert value(notebook_code(path)) == 33 and len(calls) == 4
+        assert value(notebook_code(path)) == 33 and len(calls) == 4
+        mod = NotebookLoader([directory]).load_module("Cached_Notebook")
+        assert mod.x == 33 and len(calls) == 4
+        del sys.modules["Cached_Notebook"]
+    finally:
+        compile_notebook = real
+        shutil.rmtree(directory)
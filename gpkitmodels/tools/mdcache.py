@@ -0,0 +1,179 @@
+""" cached code extraction and incremental builds of GPkit MarkDown reports
+
+mdexec runs the python blocks of a markdown file from a compiled cache,
+keyed by the hash of the file, so gpkit's markdown parser only runs when
+the file changes.  Run as a script to rebuild the misc reports whose
+README.md or template changed since their last build, in parallel:
+
+    python -m gpkitmodels.tools.mdcache [-j 4] [--force] [DIR:NAME ...]
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import marshal
+import hashlib
+import argparse
+import subprocess
+from multiprocessing import Pool
+
+CACHE_DIR = "__pycache__"
+CACHE_TAG = "md-py%d%d" % sys.version_info[:2]
+MISC = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "misc")
+TEMPLATE = os.path.join(MISC, "default.latex")
+REPORTS = {"Net Present Value": "npv",
+           "Moment of Inertia (cylindrical beam)": "moi",
+           "Economic Order Quantity": "eoq"}
+STAMP = ".gpmd.json"
+
+def file_hash(*paths):
+    " sha1 of the contents of the files at paths "
+    sha = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+def mdcode(path):
+    """ code object of the python blocks of the markdown file at path
+
+    Cached in __pycache__ next to the file, keyed by its hash.
+    """
+    path = os.path.abspath(path)
+    directory, name = os.path.split(path)
+    key = file_hash(path)
+    cache = os.path.join(directory, CACHE_DIR, "%s.%s.%s.marshal"
+                         % (name, key[:16], CACHE_TAG))
+    try:
+        with open(cache, "rb") as f:
+            return marshal.load(f)
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        pass
+    from gpkit.tools import mdparse
+    code = compile(mdparse(path), path, "exec")
+    try:
+        if not os.path.isdir(os.path.dirname(cache)):
+            os.makedirs(os.path.dirname(cache))
+        tmp = "%s.%d" % (cache, os.getpid())
+        with open(tmp, "wb") as f:
+            marshal.dump(code, f)
+        os.rename(tmp, cache)
+    except (IOError, OSError):
+        pass
+    return code
+
+def mdexec(path, namespace):
+    " run the python blocks of the markdown file at path in namespace "
+    exec(mdcode(path), namespace)  #pylint: disable=exec-used
+
+def stale(directory):
+    """ whether the report in directory needs rebuilding
+
+    Its README.md and the latex template are hashed and compared to the
+    hash saved by the last build.
+    """
+    inputs = [os.path.join(directory, "README.md"), TEMPLATE]
+    try:
+        with open(os.path.join(directory, STAMP)) as f:
+            return json.load(f)["hash"] != file_hash(*inputs)
+    except (IOError, OSError, ValueError, KeyError):
+        return True
+
+def build(args):
+    """ make the report NAME.pdf from directory/README.md, as make_gpmd
+
+    Returns (directory, error message or None).
+    """
+    directory, name = args
+    commands = [
+        [sys.executable, "-c", "from gpkit.tools import mdmake; "
+         "exec(mdmake('README.md').read())"],
+        ["pandoc", "README.md.tex.md", "--template", TEMPLATE,
+         "-o", name + ".pdf"]]
+    for command in commands:
+        proc = subprocess.Popen(command, cwd=directory,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        out = proc.communicate()[0]
+        if proc.returncode:
+            return directory, out.decode("utf-8", "replace")
+    inputs = [os.path.join(directory, "README.md"), TEMPLATE]
+    with open(os.path.join(directory, STAMP), "w") as f:
+        json.dump({"hash": file_hash(*inputs), "pdf": name + ".pdf"}, f)
+    return directory, None
+
+def build_all(reports, processes=None, force=False):
+    """ rebuild the stale reports of {directory: name} in a process pool
+
+    Returns {directory: error message or None} for the reports built.
+    """
+    todo = [(d, name) for d, name in sorted(reports.items())
+            if force or stale(d)]
+    if not todo:
+        return {}
+    pool = Pool(min(processes or len(todo), len(todo)))
+    try:
+        return dict(pool.map(build, todo, 1))
+    finally:
+        pool.close()
+        pool.join()
+
+def main(argv=None):
+    " command line entry point; returns the number of failed reports "
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("reports", nargs="*",
+                        help="DIR:NAME pairs, default the misc reports")
+    parser.add_argument("-j", "--processes", type=int, default=None)
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild even unchanged reports")
+    args = parser.parse_args(argv)
+    if args.reports:
+        reports = dict(r.rsplit(":", 1) for r in args.reports)
+    else:
+        reports = dict((os.path.join(MISC, d), name)
+                       for d, name in REPORTS.items())
+    results = build_all(reports, args.processes, args.force)
+    for directory in sorted(reports):
+        if directory not in results:
+            print("up to date  %s" % directory)
+        elif results[directory] is None:
+            print("built       %s" % directory)
+        else:
+            print("FAILED      %s\n%s" % (directory, results[directory]))
+    return sum(err is not None for err in results.values())
+
+def test():
+    " run a markdown file from its cache, and check report staleness "
+    import shutil
+    from tempfile import mkdtemp
+    directory = mkdtemp()
+    try:
+        readme = os.path.join(directory, "README.md")
+        with open(readme, "w") as f:
+            f.write("A report.\n\n```python\nx = 2*21\n```\n")
+        namespace = {}
+        mdexec(readme, namespace)
+        assert namespace["x"] == 42
+        cached = os.listdir(os.path.join(directory, CACHE_DIR))
+        assert len(cached) == 1 and CACHE_TAG in cached[0]
+        namespace = {}
+        mdexec(readme, namespace)  # from the cache
+        assert namespace["x"] == 42
+
+        assert stale(directory)
+        with open(os.path.join(directory, STAMP), "w") as f:
+            json.dump({"hash": file_hash(readme, TEMPLATE)}, f)
+        assert not stale(directory)
+        with open(readme, "a") as f:
+            f.write("\n```python\ny = x + 1\n```\n")
+        assert stale(directory)
+        namespace = {}
+        mdexec(readme, namespace)
+        assert namespace["y"] == 43
+        assert len(os.listdir(os.path.join(directory, CACHE_DIR))) == 2
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+""" memory used building and solving models, per submodel and against N
+
+    python -m gpkitmodels.tools.memprofile [--case wing|tailboom|mission]
+        [--N 5 10 20 40 80] [--by-class]
+
+While a model is built, every Model.__init__ is wrapped to record the
+growth of resident memory and the net growth of gc-tracked objects
+(VarKeys, Monomials, NomialArrays, dicts, ...) it causes, less that of the
+submodels it builds, so each submodel class is charged for its own
+constraints.  The garbage collector is paused during the build, so garbage
+in reference cycles counts until the collection after it.  The solve is
+measured as a whole, with its peak memory.  Each case and N is run in a
+fresh process; the exponent of the fitted power law in N flags
+super-linear growth.  Memory is read from /proc (linux), and peaks are
+reset between build and solve through /proc/self/clear_refs.
+"""
+from __future__ import print_function
+import os
+import gc
+import sys
+import argparse
+from collections import defaultdict
+from multiprocessing import Pool
+import numpy as np
+
+#pylint: disable=invalid-name
+
+TRACKED = ["VarKey", "Monomial", "Posynomial", "NomialArray", "dict", "list",
+           "tuple"]
+
+def rss():
+    " resident memory of this process [MB] (linux) "
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")/1e6
+
+def peak_rss():
+    " peak resident memory of this process since reset_peak [MB] (linux) "
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])*1024/1e6
+    return float("nan")
+
+def reset_peak():
+    """ restart peak_rss from the current resident memory (linux >= 4.0)
+
+    Returns False if this kernel does not allow it, leaving the peak of
+    the process's lifetime.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except (IOError, OSError):
+        return False
+
+def object_counts():
+    " {type name: count} of the gc-tracked objects of TRACKED types "
+    counts = dict.fromkeys(TRACKED, 0)
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        if name in counts:
+            counts[name] += 1
+    return counts
+
+class BuildProfile(object):
+    """ context manager charging the memory of Model builds to their class
+
+    Within it every Model.__init__ records its own growth of resident
+    memory [MB] and net growth of gc-tracked objects, excluding the
+    submodels it builds; these accumulate in .classes, by class name.
+    The garbage collector is paused within it, and runs once on exit.
+    """
+    def __init__(self):
+        self.classes = defaultdict(lambda: defaultdict(float))
+        self._stack = []
+        self._init = None
+
+    def __enter__(self):
+        from gpkit import Model
+        self._init = init = Model.__init__
+        profile = self
+
+        def __init__(model, *args, **kwargs):
+            start = (rss(), len(gc.get_objects()))
+            profile._stack.append([0., 0])
+            try:
+                init(model, *args, **kwargs)
+            finally:
+                mem = rss() - start[0]
+                objects = len(gc.get_objects()) - start[1]
+                children = profile._stack.pop()
+                sizes = profile.classes[type(model).__name__]
+                sizes["instances"] += 1
+                sizes["rss"] += mem - children[0]
+                sizes["net objects"] += objects - children[1]
+                if profile._stack:
+                    profile._stack[-1][0] += mem
+                    profile._stack[-1][1] += objects
+        Model.__init__ = __init__
+        gc.collect()
+        gc.disable()
+        return self
+
+    def __exit__(self, *exc):
+        from gpkit import Model
+        Model.__init__ = self._init
+        gc.enable()
+        gc.collect()
+
+def profile(factory, N, by_class=False):
+    """ memory of building factory(N) and solving the result
+
+    factory returns (model, localsolve).  Returns a dict of resident
+    memory grown during build and solve and the peak during each [MB]
+    (NaN if peaks cannot be reset), the net growth in gc-tracked objects
+    of each TRACKED type during each, and, if by_class, the BuildProfile
+    sizes of each Model class.
+    """
+    gc.collect()
+    counts, base = object_counts(), rss()
+    resets = reset_peak()
+    if by_class:
+        with BuildProfile() as build:
+            m, localsolve = factory(N)
+    else:
+        m, localsolve = factory(N)
+    gc.collect()
+    built, after = object_counts(), rss()
+    res = {"N": N, "build": after - base,
+           "build peak": peak_rss() - base if resets else float("nan")}
+    for name in TRACKED:
+        res["build net " + name] = built[name] - counts[name]
+    reset_peak()
+    (m.localsolve if localsolve else m.solve)(verbosity=0)
+    solve_peak = peak_rss() - after if resets else float("nan")
+    gc.collect()
+    solved = object_counts()
+    res["solve"] = rss() - after
+    res["solve peak"] = max(solve_peak, res["solve"])
+    for name in TRACKED:
+        res["solve net " + name] = solved[name] - built[name]
+    if by_class:
+        res["classes"] = dict((k, dict(v)) for k, v in build.classes.items())
+    return res
+
+def _profile(args):
+    return profile(*args)
+
+def scaling(factory, Ns, by_class=False):
+    " profile(factory, N) for each N, each in a fresh process "
+    rows = []
+    for N in Ns:
+        pool = Pool(1, maxtasksperchild=1)
+        try:
+            rows.append(pool.apply(_profile, ((factory, N, by_class),)))
+        finally:
+            pool.close()
+            pool.join()
+    return rows
+
+def exponent(rows, column):
+    """ exponent p of the power law column ~ N**p fitted to rows
+
+    Above about 1, memory grows faster than the discretization.
+    """
+    Ns = np.array([r["N"] for r in rows], dtype=float)
+    values = np.array([r[column] for r in rows], dtype=float)
+    keep = values > 0
+    if keep.sum() < 2:
+        return float("nan")
+    return float(np.polyfit(np.log(Ns[keep]), np.log(values[keep]), 1)[0])
+
+# cases, each returning (model, localsolve); imports are deferred so that
+# only the profiled case's modules are loaded in its process
+
+def wing(N):
+    " wing_test's Wing(N) with spar loading and gust loading "
+    from gpkit import Model
+    from gpkitmodels.GP.aircraft.wing.wing import Wing
+    from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+    W = Wing(N=N)
+    W.substitutions[W.W] = 50
+    W.substitutions[W.planform.tau] = 0.115
+    fs = FlightState()
+    perf = W.flight_model(W, fs)
+    loading = W.spar.loading(W, fs)
+    loading.substitutions["W"] = 100
+    gust = W.spar.gustloading(W, fs)
+    gust.substitutions["W"] = 100
+    return Model(perf.Cd, [
+        gust.v == fs.V, gust.cl == perf.CL, gust.Ww == W.W,
+        gust.Ww <= 0.5*fs.rho*fs.V**2*perf.CL*W.planform.S,
+        W, fs, perf, loading, gust]), False
+
+def tailboom(N):
+    " tail_tests' test_emp with N tail boom nodes, with its bending loads "
+    from gpkit import Model, Variable
+    from gpkitmodels.GP.aircraft.tail.empennage import Empennage
+    from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
+    Sw = Variable("S_w", 50, "ft**2", "wing area")
+    bw = Variable("b_w", 20, "ft", "wing span")
+    cmac = Variable("cmac", 15, "in", "wing MAC")
+    emp = Empennage(N=N)
+    fs = FlightState()
+    htail, vtail = emp.htail, emp.vtail
+    emp.substitutions.update({
+        emp.W: 10, emp.tailboom.l: 5, htail.planform.AR: 4,
+        vtail.planform.AR: 4, htail.planform.tau: 0.08,
+        vtail.planform.tau: 0.08, vtail.Vv: 0.04, htail.Vh: 0.4,
+        htail.mh: 0.01})
+    htperf = htail.flight_model(htail, fs)
+    vtperf = vtail.flight_model(vtail, fs)
+    tbperf = emp.tailboom.flight_model(emp.tailboom, fs)
+    hbend = emp.tailboom.tailLoad(emp.tailboom, htail, fs)
+    vbend = emp.tailboom.tailLoad(emp.tailboom, vtail, fs)
+    return Model(htperf.Cd + vtperf.Cd + tbperf.Cf, [
+        vtail.lv == emp.tailboom.l, htail.lh == emp.tailboom.l,
+        htail.Vh <= htail.planform.S*htail.lh/Sw/cmac,
+        vtail.Vv <= vtail.planform.S*vtail.lv/Sw/bw,
+        emp, fs, htperf, vtperf, tbperf, hbend, vbend]), False
+
+def mission(N):
+    " SimPleAC flying N segments "
+    from gpkitmodels.SP.SimPleAC.SimPleAC_offdesign import (
+        mission_model, mission_substitutions)
+    m = mission_model(N)
+    m.substitutions.update(mission_substitutions(3000, 6250, 5000,
+                                                 Nsegments=N))
+    return m, True
+
+CASES = {"wing": (wing, [5, 10, 20, 40, 80]),
+         "tailboom": (tailboom, [5, 10, 20, 40, 80]),
+         "mission": (mission, [4, 8, 16, 32, 64])}
+
+COLUMNS = ["N", "build", "build peak", "build net VarKey",
+           "build net NomialArray", "build net dict", "solve", "solve peak",
+           "solve net dict"]
+
+def report(name, rows):
+    " text table of a case's scaling rows, with fitted exponents "
+    from gpkitmodels.benchmarks.timing import table
+    lines = ["%s (memory [MB], net growth of objects [count])" % name,
+             table(rows, COLUMNS), "exponent of N:"]
+    for column in COLUMNS[1:]:
+        p = exponent(rows, column)
+        lines.append("  %-20s %6.2f%s" % (column, p, "  super-linear"
+                                            if p > 1.2 else ""))
+    if "classes" in rows[-1]:
+        lines.append("by class at N=%d (build, excluding submodels):"
+                     % rows[-1]["N"])
+        lines.append("  %-28s %10s %10s %12s" % ("class", "instances",
+                                                   "rss", "net objects"))
+        classes = rows[-1]["classes"]
+        for cls in sorted(classes, key=lambda c: -classes[c]["net objects"]):
+            s = classes[cls]
+            lines.append("  %-28s %10d %10.2f %12d" % (
+                cls, s["instances"], s["rss"], s["net objects"]))
+    return "\n".join(lines)
+
+def main(argv=None):
+    " command line entry point "
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--case", choices=sorted(CASES), action="append")
+    parser.add_argument("--N", type=int, nargs="+",
+                        help="discretizations, default per case")
+    parser.add_argument("--by-class", action="store_true",
+                        help="charge build memory to each Model class")
+    args = parser.parse_args(argv)
+    for name in args.case or sorted(CASES):
+        factory, Ns = CASES[name]
+        print(report(name, scaling(factory, args.N or Ns, args.by_class)))
+        print()
+
+def test():
+    " profile a small mission in this process "
+    res = profile(mission, 4, by_class=True)
+    assert gc.isenabled()
+    assert res["build net VarKey"] > 0 and res["build net Monomial"] > 0
+    if reset_peak():
+        assert res["build peak"] >= res["build"] >= 0
+        assert res["solve peak"] >= res["solve"]
+    classes = res["classes"]
+    assert classes["Mission"]["instances"] == 1
+    assert classes["SimPleAC"]["instances"] == 1
+    assert all(s["net objects"] > 0 for s in classes.values())
+    assert report("mission", [res]).count("\n") > len(COLUMNS)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+" append-only columnar store for sweep results "
+import os
+import re
+import json
+import errno
+import shutil
+import hashlib
+from time import time
+from uuid import uuid4
+import numpy as np
+
+#pylint: disable=invalid-name
+
+META = "meta.json"
+CHUNKS = "chunks"
+INDEX = "index.json"
+
+def model_hash(model):
+    """ sha1 of a model's cost and constraints
+
+    Instance numbers (the .1 of Mission.1 and the _1 of a submodel's
+    SimPleAC_1 heading) are left out, so that every build of the same
+    model has the same hash.
+    """
+    text = str(model.cost) + "\n" + str(model)
+    text = re.sub(r"(?<=[A-Za-z}])\.\d+|(?<=[A-Za-z}])_\d+$", "", text,
+                  flags=re.M)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def unitstr(units):
+    " gpkit's string of units, '' if dimensionless "
+    try:
+        from gpkit.repr_conventions import unitstr as _unitstr
+    except ImportError:  # gpkit 0.7
+        from gpkit.small_scripts import unitstr as _unitstr
+    return _unitstr(units)
+
+def solution_columns(sol, variables=None, sensitivities=True):
+    """ columns for one gpkit solution, as ({name: value}, {name: units})
+
+    Variables are named "var:<varkey>" and constant sensitivities
+    "sens:<varkey>"; the cost is "cost".  If variables is given, only
+    those varkeys (or names) are kept.
+    """
+    cols, units = {"cost": np.asarray(float(sol["cost"]))}, {}
+    sens = sol["sensitivities"]["constants"] if sensitivities else {}
+    for prefix, values in [("var:", sol["variables"]), ("sens:", sens)]:
+        keys = values if variables is None else [
+            values.keymap[v] if hasattr(values, "keymap") else v
+            for v in variables]
+        for vk in keys:
+            if hasattr(vk, "__iter__") and not hasattr(vk, "descr"):
+                vk, = vk
+            cols[prefix + str(vk)] = np.asarray(values[vk], dtype=float)
+            units[prefix + str(vk)] = (unitstr(vk.units) if prefix == "var:"
+                                       else "-")
+    return cols, units
+
+class ResultStore(object):
+    """ Directory of append-only column chunks, read by memory-mapping
+
+    Each append writes one immutable chunk holding a raw binary file per
+    column, so any number of processes can append at once and a reader
+    only opens the files of the columns it asks for.  compact() merges
+    the chunks so that every column is a single memory-mapped file.
+
+    Arguments
+    ---------
+    path : str
+        store directory, created if needed
+    metadata : dict
+        written to meta.json when the store is created, e.g. the sweep's
+        fixed substitutions; model_hash and units are kept there too
+
+    """
+    def __init__(self, path, model_hash=None, units=None, metadata=None):
+        self.path = path
+        if not os.path.isdir(os.path.join(path, CHUNKS)):
+            try:
+                os.makedirs(os.path.join(path, CHUNKS))
+            except OSError as e:  # made by another process meanwhile
+                if e.errno != errno.EEXIST:
+                    raise
+        if not os.path.exists(os.path.join(path, META)):
+            self._write_json(META, {"model_hash": model_hash,
+                                    "units": units or {},
+                                    "metadata": metadata or {}})
+        self.meta = self._read_json(META)
+        if model_hash and self.meta["model_hash"] not in (None, model_hash):
+            raise ValueError("store %s holds results of model %s, not %s"
+                             % (path, self.meta["model_hash"], model_hash))
+
+    def _read_json(self, *parts):
+        with open(os.path.join(self.path, *parts)) as f:
+            return json.load(f)
+
+    def _write_json(self, name, obj, directory=None):
+        directory = directory or self.path
+        tmp = os.path.join(directory, ".%s.%s" % (name, uuid4().hex))
+        with open(tmp, "w") as f:
+            json.dump(obj, f, indent=1, sort_keys=True)
+        os.rename(tmp, os.path.join(directory, name))
+
+    def chunks(self):
+        " chunk directory names, in the order they were written "
+        return sorted(c for c in os.listdir(os.path.join(self.path, CHUNKS))
+                      if not c.startswith("."))
+
+    def append(self, columns, units=None):
+        """ write a chunk of rows given as {name: array}
+
+        Every array's first axis is the row; all must have the same number
+        of rows.  Returns the chunk name.
+        """
+        columns = dict((k, np.asarray(v)) for k, v in columns.items())
+        nrows = set(len(v) for v in columns.values())
+        if len(nrows) != 1:
+            raise ValueError("columns have different numbers of rows: %s"
+                             % sorted(nrows))
+        name = "%019d-%s" % (int(time()*1e9), uuid4().hex)
+        tmp = os.path.join(self.path, CHUNKS, "." + name)
+        os.makedirs(tmp)
+        index = {"nrows": nrows.pop(), "columns": {}}
+        for i, (col, arr) in enumerate(sorted(columns.items())):
+            dtype = arr.dtype.newbyteorder("<").str
+            fname = "c%05d.bin" % i
+            arr.astype(dtype).tofile(os.path.join(tmp, fname))
+            index["columns"][col] = {"file": fname, "dtype": dtype,
+                                     "shape": list(arr.shape[1:])}
+            if units and col in units:
+                index["columns"][col]["units"] = units[col]
+        self._write_json(INDEX, index, tmp)
+        os.rename(tmp, os.path.join(self.path, CHUNKS, name))
+        return name
+
+    def append_rows(self, rows, units=None):
+        """ write a chunk from a list of {name: value} dicts
+
+        Missing values are NaN; rows that are None (e.g. failed solves)
+        are all NaN.
+        """
+        rows = [r or {} for r in rows]
+        names = set(k for r in rows for k in r) or ["cost"]
+        shapes = dict((k, np.shape(r[k])) for r in rows for k in r)
+        return self.append(dict(
+            (k, np.array([r.get(k, np.full(shapes.get(k, ()), np.nan))
+                          for r in rows], dtype=float))
+            for k in names), units)
+
+    def _indices(self):
+        return [(c, self._read_json(CHUNKS, c, INDEX)) for c in self.chunks()]
+
+    def __len__(self):
+        return sum(index["nrows"] for _, index in self._indices())
+
+    def columns(self):
+        " names of all columns in the store "
+        return sorted(set(col for _, index in self._indices()
+                          for col in index["columns"]))
+
+    def units(self, name):
+        " units of column name "
+        for _, index in self._indices():
+            if "units" in index["columns"].get(name, {}):
+                return index["columns"][name]["units"]
+        return self.meta["units"].get(name)
+
+    def __getitem__(self, name):
+        """ column name across every chunk
+
+        Returns a read-only memory map when the store has a single chunk
+        (e.g. after compact()); otherwise the chunks are concatenated.
+        Rows of chunks without the column are NaN.
+        """
+        parts = []
+        shape = None
+        for c, index in self._indices():
+            col = index["columns"].get(name)
+            if col is None:
+                parts.append(index["nrows"])
+                continue
+            shape = tuple(col["shape"])
+            parts.append(np.memmap(
+                os.path.join(self.path, CHUNKS, c, col["file"]),
+                dtype=col["dtype"], mode="r",
+                shape=(index["nrows"],) + shape) if index["nrows"]
+                         else np.zeros((0,) + shape))
+        if shape is None:
+            raise KeyError(name)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([np.full((p,) + shape, np.nan)
+                               if isinstance(p, int) else p for p in parts])
+
+    def compact(self):
+        """ merge all chunks into one
+
+        Not safe while other processes are appending.
+        """
+        old = self.chunks()
+        if len(old) < 2:
+            return
+        columns = dict((name, np.asarray(self[name]))
+                       for name in self.columns())
+        units = dict((name, self.units(name)) for name in columns)
+        self.append(columns, dict((k, v) for k, v in units.items() if v))
+        for c in old:
+            shutil.rmtree(os.path.join(self.path, CHUNKS, c))
+
+def test():
+    " appends with disjoint columns, compaction and a model mismatch "
+    from tempfile import mkdtemp
+    path = mkdtemp()
+    try:
+        store = ResultStore(path, "abc", {"x": "m"}, {"sweep": 1})
+        store.append({"x": [1., 2.], "y": [[1., 2.]]*2}, {"y": "s"})
+        store.append_rows([{"x": 3., "z": 5.}, None])
+        assert len(store) == 4 and len(store.chunks()) == 2
+        assert store.columns() == ["x", "y", "z"]
+        assert store.units("x") == "m" and store.units("y") == "s"
+        assert not isinstance(store["x"], np.memmap)
+        assert np.array_equal(store["x"][:3], [1., 2., 3.])
+        assert np.isnan(store["x"][3])
+        assert store["y"].shape == (4, 2) and np.isnan(store["y"][2:]).all()
+        assert np.isnan(store["z"][[0, 1, 3]]).all() and store["z"][2] == 5
+        before = dict((name, np.asarray(store[name]))
+                      for name in store.columns())
+        store.compact()
+        assert len(store.chunks()) == 1
+        for name, values in before.items():
+            assert isinstance(store[name], np.memmap)
+            np.testing.assert_array_equal(store[name], values)
+        assert store.units("y") == "s"
+        reopened = ResultStore(path, "abc")
+        assert reopened.meta["metadata"] == {"sweep": 1} and len(reopened) == 4
+        try:
+            ResultStore(path, "def")
+        except ValueError as e:
+            assert "abc" in str(e)
+        else:
+            raise AssertionError("opened a store of another model")
+    finally:
+        shutil.rmtree(path)
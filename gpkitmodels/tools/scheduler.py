@@ -0,0 +1,300 @@
+""" sweep scheduling by predicted solve time, longest first
+
+    from gpkitmodels.tools.scheduler import Scheduler, job
+    s = Scheduler(processes=4)
+    res = s.run([job("gpkitmodels.tools.memprofile:wing(50)[0]"),
+                 job("gpkitmodels.benchmarks.bench_prop:"
+                     "blade_element_prop(20)", localsolve=True), ...])
+    print(s.report())
+
+Jobs are filequeue job dicts, solved by filequeue.solve in worker
+processes that keep each built model.  Each job's solve time is
+predicted by a CostModel from its model's footprint (variables,
+nonzeros and signomial constraints) and from the times
+already observed for its model.  Jobs are dealt longest first to
+per-worker deques, each to the worker with the least predicted work, and
+a worker whose deque runs out steals the longest job waiting in the
+deque with the most predicted work.  Each finished job's time updates
+the CostModel, and the waiting jobs are reordered by the new
+predictions.
+
+The report compares the makespan with that of FIFO order (as a Pool
+would run the jobs) given the observed times, and gives the time spent
+building models in the parent to size them.
+"""
+from __future__ import print_function
+import os
+import traceback
+from collections import deque
+from time import time
+from multiprocessing import Process, Queue
+try:
+    from Queue import Empty
+except ImportError:
+    from queue import Empty
+import numpy as np
+from .footprint import build, footprint
+from .filequeue import solve
+
+def job(factory, substitutions=None, variables=(), sensitivities=(),
+        localsolve=False, **solveargs):
+    " a filequeue job dict "
+    return {"factory": factory, "substitutions": substitutions or {},
+            "variables": list(variables),
+            "sensitivities": list(sensitivities),
+            "localsolve": localsolve, "solveargs": solveargs}
+
+def size(model):
+    " footprint totals of model used to predict its solve time "
+    return footprint(model)["total"]
+
+class CostModel(object):
+    """ solve seconds of a model, predicted from its size and learned online
+
+    log(seconds) is fit by ridge regression to log(1 + variables),
+    log(1 + nonzeros) and whether the model has signomials (and so needs
+    several GP solves), pulled towards prior weights until enough times
+    are observed.  Models with observed times are predicted by the mean
+    log of their own times instead.
+
+    Arguments
+    ---------
+    prior : list
+        weights of [1, log variables, log nonzeros, signomial]
+    strength : float
+        weight of the prior, in observations
+    """
+    def __init__(self, prior=(np.log(2e-5), 0., 1., np.log(10.)),
+                 strength=4.):
+        self.prior = np.array(prior, dtype=float)
+        self.A = strength*np.eye(len(prior))
+        self.b = self.A.dot(self.prior)
+        self.weights = self.prior
+        self.history = {}
+
+    @staticmethod
+    def features(sizes):
+        " regression features of a size dict "
+        return np.array([1., np.log1p(sizes.get("variables", 0)),
+                         np.log1p(sizes.get("nonzeros", 0)),
+                         float(sizes.get("signomials", 0) > 0)])
+
+    def predict(self, key, sizes):
+        " predicted seconds of the model key of size sizes "
+        if key in self.history:
+            return float(np.exp(np.mean(self.history[key])))
+        return float(np.exp(self.features(sizes).dot(self.weights)))
+
+    def observe(self, key, sizes, seconds):
+        " learn from a solve of the model key taking seconds "
+        x = self.features(sizes)
+        y = np.log(max(seconds, 1e-6))
+        self.history.setdefault(key, []).append(y)
+        self.A += np.outer(x, x)
+        self.b += x*y
+        self.weights = np.linalg.solve(self.A, self.b)
+
+def list_makespan(seconds, order, processes):
+    " makespan of running jobs in order, each on the first free worker "
+    free = np.zeros(processes)
+    for i in order:
+        w = np.argmin(free)
+        free[w] += seconds[i]
+    return float(free.max())
+
+def _worker(w, tasks, done):
+    """ solve jobs from tasks until None, putting (w, i, result, error,
+    seconds), with the traceback as error and a None result if it raised
+    """
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        i, j = task
+        start = time()
+        try:
+            res, error = solve(j), None
+        except Exception:  #pylint: disable=broad-except
+            res, error = None, traceback.format_exc()
+        done.put((w, i, res, error, time() - start))
+
+class Scheduler(object):
+    """ runs jobs in worker processes, longest predicted first
+
+    Arguments
+    ---------
+    processes : int
+        number of worker processes
+    costs : CostModel
+        shared between runs, so later sweeps start from what was learned
+    """
+    def __init__(self, processes=2, costs=None):
+        self.processes = processes
+        self.costs = costs or CostModel()
+        self._sizes = {}
+        self._predicted = {}
+        self.last = None
+
+    def sizes(self, factory):
+        " size of the model of factory, built once "
+        if factory not in self._sizes:
+            start = time()
+            self._sizes[factory] = size(build(factory))
+            if self.last is not None:
+                self.last["sizing"] += time() - start
+        return self._sizes[factory]
+
+    def _update_predictions(self, jobs):
+        " predict each factory of jobs once, with the current CostModel "
+        self._predicted = dict(
+            (factory, self.costs.predict(factory, self.sizes(factory)))
+            for factory in set(j["factory"] for j in jobs))
+
+    def _predict(self, j):
+        return self._predicted[j["factory"]]
+
+    def _deal(self, jobs):
+        " per-worker deques of job indices, longest first, balanced "
+        queues = [deque() for _ in range(self.processes)]
+        load = np.zeros(self.processes)
+        self._update_predictions(jobs)
+        predicted = [self._predict(j) for j in jobs]
+        for i in sorted(range(len(jobs)), key=lambda i: -predicted[i]):
+            w = int(np.argmin(load))
+            queues[w].append(i)
+            load[w] += predicted[i]
+        return queues
+
+    def _next(self, w, queues, jobs):
+        " index of w's next job, stolen if its own deque is empty "
+        if not queues[w]:
+            loads = [sum(self._predict(jobs[i]) for i in q) for q in queues]
+            victim = int(np.argmax(loads))
+            if not queues[victim]:
+                return None
+            self.last["stolen"] += 1
+            return queues[victim].popleft()
+        return queues[w].popleft()
+
+    def run(self, jobs, timeout=None, poll=1.):
+        """ results of filequeue.solve for each job, None where it failed
+
+        The run's timings, and the traceback of each failed job by index
+        under "errors", are kept for report().  Raises RuntimeError if a
+        worker exits while solving, or if no job finishes for timeout
+        seconds; the workers are checked every poll seconds.
+        """
+        self.last = {"seconds": np.zeros(len(jobs)), "stolen": 0,
+                     "sizing": 0., "errors": {}}
+        queues = self._deal(jobs)
+        results = [None]*len(jobs)
+        tasks = [Queue() for _ in range(self.processes)]
+        done = Queue()
+        workers = [Process(target=_worker, args=(w, tasks[w], done))
+                   for w in range(self.processes)]
+        for p in workers:
+            p.start()
+        start, running = time(), {}
+        try:
+            for w in range(self.processes):
+                i = self._next(w, queues, jobs)
+                if i is not None:
+                    tasks[w].put((i, jobs[i]))
+                    running[w] = i
+            waited = time()
+            while running:
+                try:
+                    w, i, res, error, seconds = done.get(timeout=poll)
+                except Empty:
+                    for w, i in running.items():
+                        if not workers[w].is_alive():
+                            raise RuntimeError(
+                                "worker %d exited (code %s) solving job %d"
+                                % (w, workers[w].exitcode, i))
+                    if timeout is not None and time() - waited > timeout:
+                        raise RuntimeError("no job finished in %gs; jobs %s"
+                                           " running" % (timeout, running))
+                    continue
+                waited = time()
+                del running[w]
+                results[i] = res
+                if error is not None:
+                    self.last["errors"][i] = error
+                self.last["seconds"][i] = seconds
+                self.costs.observe(jobs[i]["factory"],
+                                   self.sizes(jobs[i]["factory"]), seconds)
+                self._update_predictions(jobs)
+                for q in queues:  # reorder by the updated predictions
+                    order = sorted(q, key=lambda k: -self._predict(jobs[k]))
+                    q.clear()
+                    q.extend(order)
+                i = self._next(w, queues, jobs)
+                if i is not None:
+                    tasks[w].put((i, jobs[i]))
+                    running[w] = i
+            self.last["makespan"] = time() - start
+        finally:
+            for t in tasks:
+                t.put(None)
+            for p in workers:
+                if running:  # stopped by an error; don't wait on the jobs
+                    p.terminate()
+                p.join()
+        return results
+
+    def report(self):
+        """ makespans of the last run [s]
+
+        "makespan" is as run; "fifo" and "lpt" are of list scheduling
+        the observed times in submission order and longest first, and
+        "bound" is the larger of the longest job and the average load.
+        "sizing" is the time spent building models to predict their
+        solve times, in the parent before and while the jobs ran.
+        """
+        seconds = self.last["seconds"]
+        n = len(seconds)
+        return {"makespan": self.last["makespan"],
+                "fifo": list_makespan(seconds, range(n), self.processes),
+                "lpt": list_makespan(seconds, np.argsort(-seconds),
+                                     self.processes),
+                "bound": float(max(seconds.max() if n else 0.,
+                                   seconds.sum()/self.processes)),
+                "stolen": self.last["stolen"],
+                "sizing": self.last["sizing"]}
+
+def _exit(*args, **kwargs):  #pylint: disable=unused-argument
+    " a solver that kills its process, for test() "
+    os._exit(1)  #pylint: disable=protected-access
+
+def test():
+    " a fuselage sweep with a failure, against serial solves, and a crash "
+    from .filequeue import _fuselage
+    factory = "gpkitmodels.tools.filequeue:_fuselage()"
+    subs = [{"Vol": 1.}, {"Vol": 2., "V": 40}, {"Vol": 1., "W_{max}": 1e-3},
+            {"Vol": 3.}, {"Vol": 1.5}]
+    s = Scheduler(processes=2)
+    results = s.run([job(factory, sub, sensitivities=["Vol"])
+                     for sub in subs], timeout=300.)
+    assert results[2] is None and list(s.last["errors"]) == [2]
+    assert "RuntimeWarning" in s.last["errors"][2]
+    for sub, res in zip(subs, results):
+        if res is None:
+            continue
+        m = _fuselage()
+        m.substitutions.update(sub)
+        sol = m.solve(verbosity=0)
+        assert abs(res["cost"]/sol["cost"].magnitude - 1) < 1e-5
+    report = s.report()
+    assert report["sizing"] > 0 and report["makespan"] >= report["bound"]
+    # one prediction per factory, from the last observation
+    #pylint: disable=protected-access
+    assert s._predicted == {factory: s.costs.predict(factory,
+                                                     s.sizes(factory))}
+    # the model is already sized; a worker that dies is reported
+    crash = [job(factory, subs[0], solver=_exit)] + [job(factory, subs[0])]*2
+    try:
+        s.run(crash, timeout=300., poll=0.1)
+        raise AssertionError("a crashed worker went unnoticed")
+    except RuntimeError as e:
+        assert "exited" in str(e)
+    assert s.last["sizing"] == 0
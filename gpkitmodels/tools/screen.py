@@ -0,0 +1,169 @@
+""" constraint slacks of many fully specified designs, without a solver
+
+    from gpkitmodels.tools.screen import Screener
+    s = Screener(model)
+    res = s.screen({"W": W, "S": S, ...})     # arrays of n designs
+    designs = designs[res["feasible"]]
+
+Every constraint of a built model, posynomial or signomial, is compiled
+with CompiledGP's arrays.  For n designs, given as values of its free
+variables (and optionally of its constants), the log of each monomial is
+a row of the exponent matrix times the log of the design, and each
+constraint's slack is
+
+    log(sum of its positive terms) - log(sum of its negative terms)
+
+for signomials (s <= 0) and log(sum of its terms) for posynomials
+(p <= 1), taken with a stable log-sum-exp, so 0 is on the constraint and
+positive violates it.  The cost is evaluated too, to screen out
+dominated designs.  Designs are evaluated in chunks as dense products.
+"""
+import numpy as np
+from .compiled import CompiledGP, _magnitude
+
+def _logsumexp(terms, groups, ngroups):
+    """ log(sum(exp(terms))) over columns in each group, for each row
+
+    groups is each column's group, nondecreasing; groups without columns
+    give -inf.
+    """
+    out = np.full((terms.shape[0], ngroups), -np.inf)
+    if not terms.shape[1]:
+        return out
+    present, starts, counts = np.unique(groups, return_index=True,
+                                        return_counts=True)
+    peak = np.maximum.reduceat(terms, starts, axis=1)
+    total = np.add.reduceat(np.exp(terms - np.repeat(peak, counts, axis=1)),
+                            starts, axis=1)
+    out[:, present] = peak + np.log(total)
+    return out
+
+class _NoCost(object):
+    " stands in for the cost of models without one "
+    cs = [1.]
+    exps = [{}]
+
+class Screener(CompiledGP):
+    """ feasibility screening of designs against a model's constraints
+
+    Arguments
+    ---------
+    model : Model
+        any built model; its cost, if it has one, is evaluated too
+
+    Attributes
+    ----------
+    constraints : list
+        the constraint each slack is of (its str, if loaded)
+    signomial : bool array
+        which slacks are of signomial (s <= 0) constraints
+    """
+    def __init__(self, model):
+        cost = getattr(model, "cost", None)
+        self.hascost = hasattr(cost, "exps")
+        posys = [cost if self.hascost else _NoCost]
+        self.constraints = []
+        for leaf in model.flat(constraintsets=False):
+            for p in getattr(leaf, "unsubbed", None) or []:
+                posys.append(p)
+                self.constraints.append(leaf)
+        self._compile(posys, model)
+        self._prepare()
+
+    kind = "screen"
+
+    def _saved(self):
+        return {"constraints": np.array([str(c) for c in self.constraints]
+                                        or [""])[:len(self.constraints)],
+                "hascost": np.array(self.hascost)}
+
+    def _load(self, data):
+        super(Screener, self)._load(data)
+        self.constraints = [str(c) for c in data["constraints"]]
+        self.hascost = bool(data["hascost"])
+        self._prepare()
+
+    def _prepare(self):
+        " arrays for evaluating slacks "
+        ncons = len(self.constraints)
+        negative = self.cs < 0
+        self.signomial = np.bincount(self.p_idxs[negative] - 1,
+                                     minlength=ncons)[:ncons] > 0
+        self.logcs = np.log(np.abs(self.cs))
+        self.dense = np.zeros((len(self.cs), len(self.varkeys)))
+        np.add.at(self.dense, (self.rows, self.cols), self.exps)
+        self._positive = np.flatnonzero(~negative)
+        self._negative = np.flatnonzero(negative)
+
+    @property
+    def names(self):
+        " str of each free variable, in design column order "
+        return [str(self.varkeys[j]) for j in self.free]
+
+    def design_matrix(self, designs):
+        """ (n, nvarkeys) array of the log values of designs
+
+        designs maps variables, names or VarKeys to arrays of n values
+        (n by the vector's shape for vector variables) in the variable's
+        units; constants default to the model's substitutions.
+        """
+        given = {}
+        n = None
+        for key, value in designs.items():
+            key = self.key(key)
+            value = np.atleast_1d(_magnitude(value, getattr(key, "units",
+                                                            None)))
+            n = len(value) if n is None else n
+            given[key] = value
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logs = np.log(np.tile(self.values, (n or 1, 1)))
+        missing = []
+        for j, vk in enumerate(self.varkeys):
+            if vk in given:
+                logs[:, j] = np.log(given[vk])
+            elif getattr(vk, "veckey", None) in given:
+                value = given[vk.veckey]
+                logs[:, j] = np.log(value[(slice(None),) + tuple(vk.idx)])
+            elif not self.fixed[j]:
+                missing.append(str(vk))
+        if missing:
+            raise KeyError("designs lack free variables %s" % missing)
+        return logs
+
+    def slacks(self, logs):
+        " (n, nconstraints) slacks, and n costs, of log design values "
+        terms = self.logcs + logs.dot(self.dense.T)
+        ngroups = len(self.constraints) + 1
+        pos = _logsumexp(terms[:, self._positive],
+                         self.p_idxs[self._positive], ngroups)
+        neg = _logsumexp(terms[:, self._negative],
+                         self.p_idxs[self._negative], ngroups)
+        slack = pos[:, 1:] - np.where(self.signomial, neg[:, 1:], 0.)
+        return slack, np.exp(pos[:, 0])
+
+    def screen(self, designs, tol=1e-6, chunk=4096, keep_slacks=False):
+        """ feasibility of each of n designs
+
+        Returns a dict of n-arrays: "feasible" (every slack <= tol),
+        "worst" slack, the index of its "constraint" in .constraints and
+        "cost" (if the model has one), plus the (n, nconstraints)
+        "slacks" if keep_slacks.
+        """
+        logs = self.design_matrix(designs)
+        n = logs.shape[0]
+        out = {"worst": np.empty(n), "constraint": np.empty(n, dtype=int)}
+        if self.hascost:
+            out["cost"] = np.empty(n)
+        if keep_slacks:
+            out["slacks"] = np.empty((n, len(self.constraints)))
+        for start in range(0, n, chunk):
+            part = slice(start, start + chunk)
+            slack, cost = self.slacks(logs[part])
+            out["constraint"][part] = np.argmax(slack, axis=1)
+            out["worst"][part] = slack.max(axis=1)
+            if self.hascost:
+                out["cost"][part] = cost
+            if keep_slacks:
+                out["slacks"][part] = slack
+        out["feasible"] = out["worst"] <= tol
+        return out
@@ -0,0 +1,212 @@
+""" pickling of built models, for sending them to other processes
+
+    from gpkitmodels.tools import serialization
+    serialization.enable()      # before building the models to pickle
+    W = serialization.loads(serialization.dumps(Wing()))
+
+enable() registers reducers with copy_reg for the rest of the process,
+so that pickle, cPickle and multiprocessing can send built models:
+
+    bound methods, like the linked substitutions Planform.return_c and
+    TubeSpar.minusk2, pickle as their lookup on the (pickled) model, as
+    python 3 does already;
+
+    VarKeys pickle as their description, as gpkit's __getstate__ gives
+    but keeping linked functions, since pickle's own lookup of their
+    special methods goes through VarKey.__getattr__;
+
+    KeyDicts, like substitutions, pickle with their attributes restored
+    before their items, which KeyDict.__setitem__ needs;
+
+    NomialArrays, like vector variables, pickle with their attributes
+    (e.g. the .key of their vector VarKey), which numpy leaves out;
+
+    ad numbers, like those of GustL.return_cosm1, pickle as their value,
+    without the derivatives (which hold references to every number they
+    were computed from); and
+
+    gpkit's units and quantities pickle as their magnitude and units
+    string, so that they load into gpkit's unit registry rather than
+    pint's default one.
+
+The functions gpkit makes to take each element of a vector linked
+substitution are closures, which pickle cannot name and copy_reg cannot
+reduce, so enable() also makes gpkit build IndexedLinks instead, for the
+models built after it is called.  As these change how objects pickle
+throughout the process (ad numbers lose their derivatives anywhere),
+nothing is registered until enable() is called.  dumps also leaves out
+the solutions and programs kept by solved models.
+"""
+import sys
+import zlib
+import types
+import numpy as np
+try:
+    import copy_reg as copyreg
+    import cPickle as pickle
+except ImportError:
+    import copyreg
+    import pickle
+
+def _reduce_method(method):
+    " a bound method as the attribute lookup that gives it "
+    owner = method.__self__
+    if owner is None:  # unbound
+        owner = method.im_class
+    return getattr, (owner, method.__func__.__name__)
+
+class IndexedLink(object):
+    " element idx of the vector linked substitution linkedfn, picklable "
+    def __init__(self, linkedfn, idx):
+        self.linkedfn = linkedfn
+        self.idx = idx
+
+    def __call__(self, c):
+        return np.array(self.linkedfn(c))[self.idx]
+
+def _varkey(descr):
+    " VarKey of descr "
+    from gpkit.varkey import VarKey
+    return VarKey(**descr)
+
+def _reduce_varkey(vk):
+    descr = dict((k, v) for k, v in vk.descr.items()
+                 if k != "units")  # restored from unitrepr
+    return _varkey, (descr,)
+
+def _keydict(cls, state):
+    " empty KeyDict of class cls with the attributes state "
+    kd = dict.__new__(cls)
+    kd.__dict__.update(state)
+    return kd
+
+def _reduce_keydict(kd):
+    return _keydict, (type(kd), kd.__dict__), None, None, iter(dict.items(kd))
+
+def _nomialarray(cls, array, attributes):
+    " array as a cls, with attributes "
+    obj = array.view(cls)
+    obj.__dict__.update(attributes)
+    return obj
+
+def _reduce_nomialarray(array):
+    return _nomialarray, (type(array), array.view(np.ndarray), array.__dict__)
+
+def _reduce_ad(number):
+    " an ad number as its value "
+    return float, (number.x,)
+
+def _registry():
+    " gpkit's pint unit registry "
+    import gpkit
+    return getattr(gpkit, "ureg", gpkit.units)  # gpkit.units before 0.8
+
+def _quantity(magnitude, unitstr):
+    " gpkit quantity of magnitude in the units of unitstr "
+    return _registry().Quantity(magnitude, unitstr)
+
+def _unit(unitstr):
+    " gpkit unit of unitstr "
+    return _registry().Unit(unitstr)
+
+def _reduce_quantity(quantity):
+    return _quantity, (quantity.magnitude, str(quantity.units))
+
+def _reduce_unit(unit):
+    return _unit, (str(unit),)
+
+_ENABLED = []
+
+def enable():
+    """ register the reducers pickling built models, for this process
+
+    Models built before the first call may hold closures that cannot be
+    pickled.  Calling it again does nothing.
+    """
+    if _ENABLED:
+        return
+    _ENABLED.append(True)
+    if sys.version_info[0] == 2:
+        copyreg.pickle(types.MethodType, _reduce_method)
+    try:
+        copyreg.pickle(_registry().Quantity, _reduce_quantity)
+        copyreg.pickle(_registry().Unit, _reduce_unit)
+    except (ImportError, AttributeError):  # gpkit without pint
+        pass
+    try:
+        from gpkit.varkey import VarKey
+        from gpkit.keydict import KeyDict, KeySet
+        from gpkit.nomials import variables
+        from gpkit.nomials.array import NomialArray
+        copyreg.pickle(VarKey, _reduce_varkey)
+        copyreg.pickle(KeyDict, _reduce_keydict)
+        copyreg.pickle(KeySet, _reduce_keydict)
+        copyreg.pickle(NomialArray, _reduce_nomialarray)
+        copyreg.pickle(variables.ArrayVariable, _reduce_nomialarray)
+        if hasattr(variables, "veclinkedfn"):
+            variables.veclinkedfn = IndexedLink
+    except ImportError:
+        pass
+    try:
+        from ad import ADF, ADV
+        copyreg.pickle(ADF, _reduce_ad)
+        copyreg.pickle(ADV, _reduce_ad)  # adnumber()s; pickled by exact type
+    except ImportError:
+        pass
+
+def _models(cset, seen=None):
+    " the Models in the constraint tree of cset "
+    from gpkit import Model
+    seen = set() if seen is None else seen
+    if isinstance(cset, Model) and id(cset) not in seen:
+        seen.add(id(cset))
+        yield cset
+    if isinstance(cset, list):
+        for item in cset:
+            for model in _models(item, seen):
+                yield model
+
+def dumps(model, compress=False, protocol=pickle.HIGHEST_PROTOCOL):
+    """ pickled model, without the solutions and programs of its models
+
+    The model itself keeps them.  If compress, the pickle is compressed
+    with zlib, which loads detects.  Needs enable() to have been called.
+    """
+    if not _ENABLED:
+        raise RuntimeError("call gpkitmodels.tools.serialization.enable()"
+                           " before building the models to pickle")
+    dropped = []
+    for m in _models(model):
+        for attr in ("solution", "program"):
+            if m.__dict__.get(attr) is not None:
+                dropped.append((m, attr, m.__dict__[attr]))
+                setattr(m, attr, None)
+    try:
+        data = pickle.dumps(model, protocol)
+    finally:
+        for m, attr, value in dropped:
+            setattr(m, attr, value)
+    return zlib.compress(data) if compress else data
+
+def loads(data):
+    " model pickled by dumps "
+    if data[:1] == b"x":  # zlib header
+        data = zlib.decompress(data)
+    return pickle.loads(data)
+
+def test():
+    " a Wing, with vector linked constants and units, and an ad number "
+    from gpkitmodels.GP.aircraft.wing.wing import Wing
+    enable()
+    W = Wing(N=4)
+    for protocol in [0, pickle.HIGHEST_PROTOCOL]:
+        loaded = loads(dumps(W, compress=True, protocol=protocol))
+        assert set(map(str, loaded.varkeys)) == set(map(str, W.varkeys))
+        # linked constants, like the planform's cbar, evaluate the same
+        gp, loadedgp = [m.gp(allow_missingbounds=True) for m in (W, loaded)]
+        assert np.allclose(sorted(gp.cs), sorted(loadedgp.cs))
+    try:
+        from ad import adnumber
+    except ImportError:
+        return
+    assert loads(dumps(adnumber(2.)*3)) == 6.
@@ -0,0 +1,257 @@
+""" worker results returned through shared memory instead of pipes
+
+    from gpkitmodels.tools.shm import BlockPool, map_shared
+    with BlockPool(nblocks=8, size=1 << 24) as blocks:
+        for i, arrays in map_shared(solve_point, points, blocks):
+            store.append(arrays)    # views, valid until the next item
+
+A BlockPool is a fixed set of shared memory blocks.  A worker takes a free
+block, writes its result's arrays into it and sends back only a small
+descriptor of names, dtypes, shapes and offsets; the parent gets numpy
+views of the block, and the block goes back to the free list when the
+parent moves on, to be reused by later jobs.  Results too big for a block
+are sent through the pipe as usual.
+
+Blocks are multiprocessing.shared_memory blocks where available (python
+3.8), and otherwise memory-mapped files in /dev/shm (or the temporary
+directory).
+"""
+import os
+import mmap
+import uuid
+import tempfile
+from multiprocessing import Pool, Queue, Event
+import numpy as np
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+ALIGN = 64
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+class _Block(object):
+    " a named shared memory block of size bytes, created or attached "
+    def __init__(self, name, size, create=False):
+        self.name = name
+        self.size = size
+        if shared_memory is not None:
+            self._shm = shared_memory.SharedMemory(name, create, size)
+            if not create:
+                _untrack(self._shm)
+            self.buf = self._shm.buf
+        else:
+            self._shm = None
+            path = os.path.join(SHM_DIR, name)
+            with open(path, "w+b" if create else "r+b") as f:
+                if create:
+                    f.truncate(size)
+                self.buf = mmap.mmap(f.fileno(), size)
+
+    def close(self):
+        " detach from the block "
+        if self._shm is not None:
+            self.buf = None
+            self._shm.close()
+        else:
+            self.buf.close()
+
+    def unlink(self):
+        " free the block; call once, from its creator "
+        if self._shm is not None:
+            self._shm.unlink()
+        else:
+            os.remove(os.path.join(SHM_DIR, self.name))
+
+def _untrack(shm):
+    " stop an attaching process's resource tracker from freeing shm "
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")  #pylint: disable=protected-access
+    except (ImportError, AttributeError, KeyError):
+        pass
+
+class BlockPool(object):
+    """ shared memory blocks recycled between worker results
+
+    Arguments
+    ---------
+    nblocks : int
+        number of blocks, at least 2: the parent holds one while it reads
+        a result, so each worker writing at once needs another
+    size : int
+        bytes per block
+
+    Can be passed to worker processes (e.g. as a Pool initializer
+    argument); workers attach to the blocks when they first write.
+    """
+    def __init__(self, nblocks=8, size=1 << 24):
+        if nblocks < 2:
+            raise ValueError("a BlockPool needs at least 2 blocks, not %d;"
+                             " one is held by the result being read"
+                             % nblocks)
+        prefix = "gpkm-%s" % uuid.uuid4().hex[:12]
+        self.names = ["%s-%d" % (prefix, i) for i in range(nblocks)]
+        self.size = size
+        self.free = Queue()
+        self._blocks = dict((i, _Block(name, size, create=True))
+                            for i, name in enumerate(self.names))
+        self._owner = os.getpid()
+        for i in range(nblocks):
+            self.free.put(i)
+
+    def __getstate__(self):
+        return {"names": self.names, "size": self.size, "free": self.free,
+                "_owner": self._owner}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._blocks = {}
+
+    def _block(self, i):
+        if i not in self._blocks:
+            self._blocks[i] = _Block(self.names[i], self.size)
+        return self._blocks[i]
+
+    def write(self, arrays):
+        """ a descriptor of arrays, written into a free block
+
+        arrays is a dict of arrays, or None.  Waits for a free block; if
+        they do not fit in one, the descriptor holds the arrays themselves.
+        """
+        if arrays is None:
+            return (None, None)
+        arrays = dict((k, np.ascontiguousarray(v)) for k, v in arrays.items())
+        layout, offset = [], 0
+        for name, a in sorted(arrays.items()):
+            layout.append((name, a.dtype.str, a.shape, offset))
+            offset += -(-a.nbytes//ALIGN)*ALIGN
+        if offset > self.size or any(a.dtype.hasobject
+                                     for a in arrays.values()):
+            return (None, arrays)
+        i = self.free.get()
+        buf = self._block(i).buf
+        for name, dtype, shape, start in layout:
+            view = np.ndarray(shape, dtype, buffer=buf, offset=start)
+            view[...] = arrays[name]
+        return (i, layout)
+
+    def read(self, descriptor):
+        " the arrays of a descriptor, as views of its block "
+        i, layout = descriptor
+        if i is None:
+            return layout
+        buf = self._block(i).buf
+        return dict((name, np.ndarray(shape, dtype, buffer=buf, offset=start))
+                    for name, dtype, shape, start in layout)
+
+    def release(self, descriptor):
+        " return a descriptor's block to the free list "
+        if descriptor[0] is not None:
+            self.free.put(descriptor[0])
+
+    def close(self):
+        " detach, and in the creating process free, every block "
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except (BufferError, ValueError):
+                pass  # views still exported; freed with the process
+            if os.getpid() == self._owner:
+                block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_BLOCKS = None
+_STOPPED = None
+
+def _init(blocks, stopped, initializer, initargs):
+    global _BLOCKS, _STOPPED  #pylint: disable=global-statement
+    _BLOCKS, _STOPPED = blocks, stopped
+    if initializer is not None:
+        initializer(*initargs)
+
+def _run(args):
+    i, fn, job = args
+    if _STOPPED.is_set():  # the parent stopped reading; skip the rest
+        return i, (None, None)
+    return i, _BLOCKS.write(fn(job))
+
+def map_shared(fn, jobs, blocks, processes=None, initializer=None,
+               initargs=()):
+    """ (index, arrays) of fn(job) for each job, as the jobs finish
+
+    fn runs in a pool of worker processes and returns a dict of arrays
+    (e.g. the solution_columns of a solution) or None, and the arrays
+    reach the parent through blocks.  The arrays yielded are views into
+    shared memory, valid until the next item is requested; copy them to
+    keep them.  Jobs finish out of order, so a worker waiting for a free
+    block never waits on a result the parent has not yet asked for.
+    initializer(*initargs) is called in each worker, as for a Pool.
+
+    If the caller stops early (a break or an exception), the jobs not
+    yet started are skipped and the results not read are released, so
+    that every block is free again for the next map.
+    """
+    stopped = Event()
+    pool = Pool(processes, _init, (blocks, stopped, initializer, initargs))
+    results = pool.imap_unordered(
+        _run, [(i, fn, job) for i, job in enumerate(jobs)])
+    held = None
+    try:
+        for i, descriptor in results:
+            if held is not None:
+                blocks.release(held)
+            held = descriptor
+            yield i, blocks.read(descriptor)
+    finally:
+        stopped.set()
+        if held is not None:
+            blocks.release(held)
+        while True:  # workers may be waiting for the blocks of these
+            try:
+                blocks.release(next(results)[1])
+            except StopIteration:
+                break
+            except Exception:  #pylint: disable=broad-except
+                pass  # fn raised; it holds no block
+        pool.close()
+        pool.join()
+
+def _arange(n):
+    " a small array job: arrays of n "
+    return {"n": np.arange(n), "square": np.arange(n, dtype=float)**2}
+
+def test():
+    " map a small job through two blocks, and reject a pool of one "
+    try:
+        BlockPool(nblocks=1)
+        raise AssertionError("BlockPool accepted one block")
+    except ValueError:
+        pass
+    with BlockPool(nblocks=2, size=1 << 12) as blocks:
+        got = {}
+        for i, arrays in map_shared(_arange, range(1, 20), blocks, 2):
+            got[i] = dict((k, v.copy()) for k, v in arrays.items())
+        assert sorted(got) == list(range(19))
+        for i, arrays in got.items():
+            assert (arrays["n"] == np.arange(i + 1)).all()
+            assert (arrays["square"] == arrays["n"]**2).all()
+        # too big for a block, so sent through the pipe
+        (i, arrays), = list(map_shared(_arange, [1000], blocks, 1))
+        assert i == 0 and (arrays["n"] == np.arange(1000)).all()
+        # stopping early releases every block for the next map
+        for i, arrays in map_shared(_arange, range(1, 40), blocks, 3):
+            break
+        got = [i for i, _ in map_shared(_arange, range(1, 10), blocks, 2)]
+        assert sorted(got) == list(range(9))
+        # every block is back on the free list
+        assert sorted(blocks.free.get(timeout=1) for _ in range(2)) == [0, 1]
+        assert blocks.free.empty()
+    assert not any(os.path.exists(os.path.join(SHM_DIR, name))
+                   for name in blocks.names)
@@ -0,0 +1,73 @@
+" solve a model keeping only a few numbers of the solution "
+import numpy as np
+from .varindex import STRING_TYPES
+
+def label(var):
+    " name under which slim_solve returns var "
+    return var if isinstance(var, STRING_TYPES) else str(var)
+
+def slim_solve(model, variables, sensitivities=(), units=None,
+               localsolve=False, keep=False, **solveargs):
+    """ solve model and return only the declared results as float arrays
+
+    Arguments
+    ---------
+    model : Model
+        model to solve, with its cost set
+    variables : list
+        variables (or names) whose values are kept
+    sensitivities : list
+        constants (or names) whose sensitivities are kept
+    units : dict
+        units to convert values to, by entry of variables; by default
+        values are in the variable's own units
+    localsolve : bool
+        solve as a signomial program
+    keep : bool
+        if False, the solution and program are dropped from model as soon
+        as the results are extracted
+
+    Returns
+    -------
+    dict of float arrays: "cost", one per variable under label(variable),
+    and one per sensitivity under "sens:" + label(constant)
+    """
+    units = units or {}
+    solveargs.setdefault("verbosity", 0)
+    sol = (model.localsolve if localsolve else model.solve)(**solveargs)
+    out = {"cost": np.float64(sol["cost"])}
+    for v in variables:
+        if v in units:
+            val = sol(v).to(units[v]).magnitude
+        else:
+            val = sol["variables"][v]
+        out[label(v)] = np.array(val, dtype=float)
+    for v in sensitivities:
+        out["sens:" + label(v)] = np.array(
+            sol["sensitivities"]["constants"][v], dtype=float)
+    del sol
+    if not keep:
+        for attr in ("solution", "program"):
+            if attr in model.__dict__:
+                setattr(model, attr, None)
+    return out
+
+def test():
+    " slim_solve's results against a full solve of the same model "
+    from .filequeue import _fuselage
+    m = _fuselage()
+    m.substitutions.update({"Vol": 2.})
+    sol = m.solve(verbosity=0)
+    l, W = m["l"], m["W_{max}"]
+    out = slim_solve(m, ["l", W], ["Vol", W], units={W: "N"})
+    assert set(out) == set(["cost", "l", label(W), "sens:Vol",
+                            "sens:" + label(W)])
+    assert abs(out["cost"]/sol["cost"].magnitude - 1) < 1e-5
+    assert abs(out["l"]/sol["variables"][l] - 1) < 1e-5
+    assert abs(out[label(W)]/sol(W).to("N").magnitude - 1) < 1e-5
+    consts = sol["sensitivities"]["constants"]
+    assert np.allclose(out["sens:Vol"], consts["Vol"], atol=1e-5)
+    assert np.allclose(out["sens:" + label(W)], consts[W], atol=1e-5)
+    assert m.solution is None and m.program is None
+    slim_solve(m, ["l"], keep=True)
+    assert m.solution is not None
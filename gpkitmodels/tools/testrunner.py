@@ -0,0 +1,270 @@
+""" run the TESTS suite's test functions in parallel, with a timing report
+
+    python -m gpkitmodels.tools.testrunner [-j 4] [--timeout 600]
+        [--baseline .benchmarks/tests.json] [--update] [TESTS]
+
+Each module's test() is split into the module level functions it calls
+(e.g. wing_test's wing_test and box_spar) when it only calls them, plus
+any other test* functions of the module, and every one is run in its own
+process.  Model.solve and Model.localsolve are timed, so each test's time
+is split into build and solve.  Tests slower than in the baseline file are
+flagged.
+"""
+from __future__ import print_function
+import os
+import sys
+import ast
+import json
+import argparse
+import imp
+import importlib
+from time import time, sleep
+from multiprocessing import Process, Pipe
+
+#pylint: disable=broad-except
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+BASELINE = os.path.join(ROOT, ".benchmarks", "tests.json")
+
+def read_tests(path=os.path.join(ROOT, "TESTS")):
+    " paths of the test modules listed in a TESTS file "
+    with open(path) as f:
+        return [os.path.join(os.path.dirname(os.path.abspath(path)), l.strip())
+                for l in f if l.strip()]
+
+def test_functions(path):
+    """ names of the test functions of the module at path
+
+    A test() whose body only calls module level functions, like
+    wing_test's, is split into those functions; otherwise test() is run
+    whole.  Other test* functions of the module that take no arguments
+    are added after them.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    functions = [node.name for node in tree.body
+                 if isinstance(node, ast.FunctionDef)
+                 and len(node.args.args) == len(node.args.defaults)]
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "test":
+            body = [stmt for stmt in node.body
+                    if not (isinstance(stmt, ast.Expr)
+                            and isinstance(stmt.value, ast.Str))]
+            calls = [stmt.value.func.id for stmt in body
+                     if isinstance(stmt, ast.Expr)
+                     and isinstance(stmt.value, ast.Call)
+                     and isinstance(stmt.value.func, ast.Name)
+                     and stmt.value.func.id in functions]
+            names = calls if len(calls) == len(body) else ["test"]
+    names += [name for name in functions if name.startswith("test")
+              and name != "test" and name not in names]
+    return names
+
+def module_name(path):
+    """ dotted name of the module at path, relative to the repository
+
+    Scripts outside the packages (e.g. under gpkitmodels/misc) are named by
+    their path, and loaded from it.
+    """
+    rel = os.path.relpath(path, ROOT)
+    folder = os.path.dirname(path)
+    while folder not in (ROOT, os.path.dirname(folder)):
+        if not os.path.exists(os.path.join(folder, "__init__.py")):
+            return rel
+        folder = os.path.dirname(folder)
+    return os.path.splitext(rel)[0].replace(os.path.sep, ".")
+
+def load(module):
+    " the module named by module_name "
+    if module.endswith(".py"):
+        name = os.path.splitext(os.path.basename(module))[0]
+        return imp.load_source(name, os.path.join(ROOT, module))
+    return importlib.import_module(module)
+
+def discover(paths):
+    " (module, function) pairs of every test in the modules at paths "
+    return [(module_name(path), name) for path in paths
+            for name in test_functions(path)]
+
+def _timed_solves(timings):
+    " wrap Model.solve and Model.localsolve to add their time to timings "
+    from gpkit import Model
+
+    def wrap(method):
+        def timed(self, *args, **kwargs):
+            start = time()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                timings["solve"] += time() - start
+        return timed
+    Model.solve = wrap(Model.solve)
+    Model.localsolve = wrap(Model.localsolve)
+
+def _run(conn, module, function):
+    " child process: run one test and send its timings "
+    timings = {"solve": 0.}
+    start = time()
+    try:
+        mod = load(module)
+        _timed_solves(timings)
+        start = time()
+        getattr(mod, function)()
+        timings["status"] = "ok"
+    except Exception as e:
+        timings["status"] = "failed"
+        timings["error"] = "%s: %s" % (type(e).__name__, e)
+    timings["total"] = time() - start
+    timings["build"] = timings["total"] - timings["solve"]
+    conn.send(timings)
+    conn.close()
+
+def run(tests, processes=4, timeout=600.):
+    """ run (module, function) tests in up to `processes` processes
+
+    Returns {"module:function": result}, each result a dict of status
+    ("ok", "failed" or "timeout"), total, build and solve times [s] and
+    an error message for failed tests.
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    pending = list(tests)
+    running = {}
+    results = {}
+    while pending or running:
+        while pending and len(running) < processes:
+            test = pending.pop(0)
+            parent, child = Pipe(False)
+            proc = Process(target=_run, args=(child,) + test)
+            proc.start()
+            running[test] = (proc, parent, time())
+        for test, (proc, conn, start) in list(running.items()):
+            key = "%s:%s" % test
+            if conn.poll():
+                results[key] = conn.recv()
+            elif not proc.is_alive():
+                # the child may have sent its result just before exiting
+                if conn.poll():
+                    results[key] = conn.recv()
+                else:
+                    results[key] = {"status": "failed", "error":
+                                    "exit code %s" % proc.exitcode,
+                                    "total": time() - start}
+            elif time() - start > timeout:
+                proc.terminate()
+                results[key] = {"status": "timeout", "total": time() - start}
+            else:
+                continue
+            proc.join()
+            del running[test]
+        sleep(0.01)
+    return results
+
+def regressions(results, baseline, tolerance=0.2, min_delta=0.5):
+    """ tests slower than baseline by more than tolerance and min_delta [s]
+
+    Returns {"module:function": (baseline time, time)}.
+    """
+    slow = {}
+    for key, res in results.items():
+        if key in baseline and res["status"] == "ok":
+            old, new = baseline[key]["total"], res["total"]
+            if new > old*(1 + tolerance) and new - old > min_delta:
+                slow[key] = (old, new)
+    return slow
+
+def report(results, slow=None, wall=None):
+    " text table of results, slowest first "
+    slow = slow or {}
+    lines = ["%-60s %8s %8s %8s  %s" % ("test", "total", "build", "solve",
+                                         "status")]
+    for key, res in sorted(results.items(), key=lambda kv: -kv[1]["total"]):
+        status = res["status"]
+        if key in slow:
+            status += " (was %.2f s)" % slow[key][0]
+        if "error" in res:
+            status += " " + res["error"].splitlines()[0]
+        lines.append("%-60s %8.2f %8s %8s  %s" % (
+            key, res["total"], "%.2f" % res["build"] if "build" in res
+            else "", "%.2f" % res["solve"] if "solve" in res else "", status))
+    if wall is not None:
+        lines.append("wall time %.2f s, sum of test times %.2f s" % (
+            wall, sum(res["total"] for res in results.values())))
+    return "\n".join(lines)
+
+def update_baseline(path, results, baseline=None):
+    """ save the times of the passing results into the baseline at path
+
+    Failed and timed out tests keep their earlier baseline times, if any.
+    """
+    baseline = dict(baseline or {})
+    baseline.update((key, res) for key, res in results.items()
+                    if res["status"] == "ok")
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+    return baseline
+
+def main(argv=None):
+    " command line entry point; returns the number of failed tests "
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tests", nargs="?", default=os.path.join(ROOT,
+                                                                 "TESTS"))
+    parser.add_argument("-j", "--processes", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=600.)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update", action="store_true",
+                        help="save these timings as the baseline")
+    args = parser.parse_args(argv)
+
+    start = time()
+    results = run(discover(read_tests(args.tests)), args.processes,
+                  args.timeout)
+    wall = time() - start
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    slow = regressions(results, baseline)
+    print(report(results, slow, wall))
+    if args.update:
+        update_baseline(args.baseline, results, baseline)
+    return sum(res["status"] != "ok" for res in results.values())
+
+def test():
+    " discover, run and baseline a passing and a failing test "
+    from tempfile import mkdtemp
+    wing = os.path.join(ROOT, "gpkitmodels", "GP", "aircraft", "wing",
+                        "wing_test.py")
+    assert test_functions(wing) == ["wing_test", "box_spar", "pickle_test"]
+    assert test_functions(__file__.replace(".pyc", ".py")) == ["test"]
+    raymer = os.path.join(ROOT, "gpkitmodels", "misc", "Raymer Weights",
+                          "raymer_vectorized.py")
+    assert module_name(raymer) == os.path.relpath(raymer, ROOT)
+    assert load(module_name(raymer)).raymer_bwb
+    fuselage = os.path.join(ROOT, "gpkitmodels", "GP", "aircraft",
+                            "fuselage", "test_fuselage.py")
+    tests = discover([fuselage])
+    assert tests == [("gpkitmodels.GP.aircraft.fuselage.test_fuselage",
+                      "test_ellp")]
+    tests.append(("gpkitmodels.GP.aircraft.fuselage.test_fuselage",
+                  "test_missing"))
+    results = run(tests, processes=2, timeout=300.)
+    ok, missing = ["%s:%s" % t for t in tests]
+    assert results[ok]["status"] == "ok"
+    assert results[missing]["status"] == "failed"
+    assert "AttributeError" in results[missing]["error"]
+    assert not regressions(results, results)
+    path = os.path.join(mkdtemp(), "tests.json")
+    update_baseline(path, results, {missing: {"total": 1.}})
+    with open(path) as f:
+        saved = json.load(f)
+    assert set(saved) == set([ok, missing])
+    assert saved[missing] == {"total": 1.}
+    assert saved[ok]["status"] == "ok"
+
+if __name__ == "__main__":
+    sys.exit(main())
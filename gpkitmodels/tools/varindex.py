@@ -0,0 +1,68 @@
+" name and lineage index of a model's variables "
+from collections import defaultdict
+from gpkit import Model
+
+try:
+    STRING_TYPES = (basestring,)  #pylint: disable=undefined-variable
+except NameError:
+    STRING_TYPES = (str,)
+
+class VarIndex(object):
+    """ Variables of a model by name, gathered once and reused
+
+    Arguments
+    ---------
+    model : Model
+        model to index; get indices through var_index so that each model
+        is only indexed once
+
+    """
+    def __init__(self, model):
+        self.model = model
+        self.byname = defaultdict(list)
+        for vk in model.varkeys:
+            self.byname[vk.name].append(vk)
+        self._summed = None
+        self._keys = {}
+        self._vars = {}
+
+    @property
+    def summed(self):
+        " varkeys summed by SummingConstraintSets anywhere in the model "
+        if self._summed is None:
+            self._summed = set()
+            for constraint in self.model.flat():
+                if hasattr(constraint, "summedvars"):
+                    self._summed.update(constraint.summedvars)
+        return self._summed
+
+    def varkeys(self, name):
+        " list(model.varkeys[name]), memoized "
+        if name not in self._keys:
+            self._keys[name] = list(self.model.varkeys[name])
+        return self._keys[name]
+
+    def __getitem__(self, name):
+        " model[name], memoized "
+        if name not in self._vars:  # Model's own lookup, not IndexedModel's
+            self._vars[name] = Model.__getitem__(self.model, name)
+        return self._vars[name]
+
+def var_index(model):
+    " the VarIndex of model, built on first use and cached on the model "
+    index = model.__dict__.get("_varindex")
+    if index is None:
+        index = model._varindex = VarIndex(model)  #pylint: disable=protected-access
+    return index
+
+class IndexedModel(object):
+    """ Model mixin resolving model["name"] through the model's VarIndex
+
+    Use as `class Mission(IndexedModel, Model)`.  Repeated lookups of a
+    name, e.g. of a shared aircraft by every mission that flies it, are
+    resolved once.  Only look up names once the model is fully built.
+    """
+    def __getitem__(self, key):
+        if isinstance(key, STRING_TYPES):
+            return var_index(self)[key]
+        return super(IndexedModel, self).__getitem__(key)